@@ -0,0 +1,14 @@
+###
+# ASGI interface: the read-heavy routes served asynchronously (see backend/asgi.py)
+#
+#   uvicorn asgi:app --host 0.0.0.0 --port 4000
+#   GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn --config gunicorn.conf.py asgi:app
+#
+# Run several workers through gunicorn, whose config checks the settings they
+# need (see gunicorn.conf.py) and exports SERVER_WORKERS.
+###
+
+from backend.asgi import create_asgi_app
+
+# create the ASGI app object
+app = create_asgi_app()
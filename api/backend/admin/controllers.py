@@ -0,0 +1,70 @@
+import hmac
+from typing import Optional
+from flask import Blueprint, current_app, request, jsonify, Response
+from backend.utilities.errors import ForbiddenError, handle_error
+from backend.utilities.profiler import profiler
+from backend.validators.profiler import ProfilerSessionSchema
+from http import HTTPStatus
+
+admin = Blueprint('admin', __name__)
+
+#------------------------------------------------------------
+# Every admin route needs `Authorization: Bearer <ADMIN_TOKEN>`; without ADMIN_TOKEN they are disabled
+@admin.before_request
+def require_admin() -> Optional[tuple[Response, int]]:
+    token = current_app.config.get('ADMIN_TOKEN')
+    given = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+    if not token:
+        return handle_error(ForbiddenError("Admin routes are disabled (ADMIN_TOKEN is not set)"))
+    if not hmac.compare_digest(given.encode(), token.encode()):
+        return handle_error(ForbiddenError("Admin token required"))
+    return None
+
+#------------------------------------------------------------
+# Sampling profiler of this worker; sessions only start on single-worker servers (see backend/utilities/profiler.py)
+@admin.route('/profiler', methods=['POST'])
+def start_profiler() -> tuple[Response, int]:
+    try:
+        data = ProfilerSessionSchema().load(request.get_json(silent=True) or {})
+        session = profiler.start(**data)
+        return jsonify(session.status()), HTTPStatus.CREATED
+    except Exception as e:
+        return handle_error(e)
+
+@admin.route('/profiler', methods=['GET'])
+def get_profiler() -> tuple[Response, int]:
+    try:
+        return jsonify(profiler.last().status()), HTTPStatus.OK
+    except Exception as e:
+        return handle_error(e)
+
+@admin.route('/profiler', methods=['DELETE'])
+def stop_profiler() -> tuple[Response, int]:
+    try:
+        return jsonify(profiler.stop().status()), HTTPStatus.OK
+    except Exception as e:
+        return handle_error(e)
+
+@admin.route('/profiler/collapsed', methods=['GET'])
+def download_collapsed_stacks() -> tuple[Response, int]:
+    """Collapsed stacks of the last session, for flamegraph.pl or speedscope."""
+    try:
+        session = profiler.last()
+        return Response(
+            session.collapsed(),
+            mimetype='text/plain',
+            headers={'Content-Disposition': f'attachment; filename="profile-{int(session.started_at)}.collapsed"'}
+        ), HTTPStatus.OK
+    except Exception as e:
+        return handle_error(e)
+
+@admin.route('/profiler/summary', methods=['GET'])
+def download_summary() -> tuple[Response, int]:
+    """Per-function self and total samples of the last session."""
+    try:
+        session = profiler.last()
+        response = jsonify({**session.status(), 'functions': session.summary()})
+        response.headers['Content-Disposition'] = f'attachment; filename="profile-{int(session.started_at)}.json"'
+        return response, HTTPStatus.OK
+    except Exception as e:
+        return handle_error(e)
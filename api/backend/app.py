@@ -1,15 +1,24 @@
 from flask import Flask, jsonify, Blueprint
 
 from backend.database import db
+from backend.programs.cache import program_cache
+from backend.programs.search_index import program_index
 from backend.config import load_config
+from backend.utilities import json_provider, metrics
+from backend.utilities.profiler import profiler
 from backend.users.controllers import users
 from backend.organizations.controllers import organizations
 from backend.programs.controllers import programs
 from backend.categories.controllers import categories
-from backend.applications.controllers import applications
-from backend.feedbacks.controllers import feedbacks
+from backend.applications.controllers import applications, applications_batch
+from backend.feedbacks.controllers import feedbacks, feedbacks_batch
 from backend.user_profiles.controllers import user_profiles
 from backend.contact.controllers import contact
+from backend.admin.controllers import admin
+from backend.exports.controllers import exports
+from backend.feedbacks.commands import import_feedback_command, rebuild_feedback_stats_command
+from backend.applications.commands import rebuild_application_trends_command
+from backend.users.commands import rebuild_retention_stats_command
 
 def create_app():
     app = Flask(__name__)
@@ -20,14 +29,39 @@ def create_app():
     # Set configuration values
     app.config.update(config)
 
+    # jsonify and request.get_json through orjson (see backend/utilities/json_provider.py)
+    json_provider.init_app(app)
+
     # Initialize the database object with the settings above. 
     app.logger.info('current_app(): starting the database connection')
     db.init_app(app)
 
+    # Load the program search index in the background; searches use SQL until it is ready
+    program_index.init_app(app)
+
+    # Cache of program documents (see backend/programs/cache.py)
+    program_cache.init_app(app)
+
+    # Request latency, error and pool/cache/index metrics (see backend/utilities/metrics.py)
+    metrics.init_app(app, pool=db.pool_stats, cache=program_cache.stats, index=program_index.stats)
+
+    # Sampling profiler, started on demand through /api/v1/admin/profiler (see backend/utilities/profiler.py)
+    profiler.init_app(app)
+
     # Add healthcheck endpoint
     @app.route('/healthcheck')
     def health_check():
-        return jsonify({"status": "healthy"}), 200
+        return jsonify({
+            "status": "healthy",
+            "database_pool": db.pool_stats(),
+            "search_index": program_index.stats(),
+            "program_cache": program_cache.stats()
+        }), 200
+
+    # Prometheus scrape endpoint
+    @app.route('/metrics')
+    def metrics_endpoint():
+        return metrics.render_metrics()
     
     # Create API v1 blueprint
     api_v1 = Blueprint('api_v1', __name__, url_prefix='/api/v1')
@@ -40,10 +74,29 @@ def create_app():
     api_v1.register_blueprint(organizations, url_prefix='/organizations')
     api_v1.register_blueprint(programs, url_prefix='/programs')
     api_v1.register_blueprint(applications, url_prefix='/applications')
+    api_v1.register_blueprint(applications_batch)
     api_v1.register_blueprint(feedbacks, url_prefix='/feedbacks')
+    api_v1.register_blueprint(feedbacks_batch)
     api_v1.register_blueprint(categories, url_prefix='/categories')
+    api_v1.register_blueprint(admin, url_prefix='/admin')
+    api_v1.register_blueprint(exports, url_prefix='/exports')
 
     # Register the API v1 blueprint with the app
     app.register_blueprint(api_v1)
 
+    # Register maintenance commands (run with `flask --app server <command>`)
+    app.cli.add_command(rebuild_feedback_stats_command)
+    app.cli.add_command(import_feedback_command)
+    app.cli.add_command(rebuild_application_trends_command)
+    app.cli.add_command(rebuild_retention_stats_command)
+
     return app
+
+def after_fork() -> None:
+    """
+    Per-worker setup for servers that fork after create_app() (gunicorn with
+    preload_app): a connection pool of its own, and the search index load
+    restarted if the parent had one running.
+    """
+    db.after_fork()
+    program_index.after_fork()
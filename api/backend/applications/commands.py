@@ -0,0 +1,10 @@
+import click
+from flask.cli import with_appcontext
+from backend.applications.transactions import rebuild_program_application_trends
+
+@click.command('rebuild-application-trends')
+@with_appcontext
+def rebuild_application_trends_command() -> None:
+    """Recompute program_application_trends from applications."""
+    rows = rebuild_program_application_trends()
+    click.echo(f"Rebuilt application trends ({rows} program/category/month rows)")
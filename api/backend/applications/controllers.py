@@ -1,18 +1,23 @@
 from typing import Any, Dict, Tuple
-from flask import Blueprint, request, jsonify, Response
+from flask import Blueprint, current_app, request, jsonify, Response
 from marshmallow import ValidationError
-from backend.validators.applications import ApplicationSchema
+from backend.validators.applications import ApplicationBatchItemSchema, ApplicationBatchSchema, ApplicationSchema
 from backend.applications.transactions import (
+    create_applications_batch,
     get_application_by_id,
     update_application,
     delete_application
 )
-from backend.utilities.errors import handle_error
+from backend.database.batch import BatchReport
+from backend.utilities.errors import ValidationError as APIValidationError, handle_error
 from backend.utilities.uuid import validate_uuid
 from http import HTTPStatus
 
 applications = Blueprint('applications', __name__)
 
+# `POST /applications:batch` is not under the /applications prefix, so it gets its own blueprint
+applications_batch = Blueprint('applications_batch', __name__)
+
 @applications.route('/<string:application_id>', methods=['GET'])
 def get_application_route(application_id: str) -> tuple[Response, int]:
     try:
@@ -51,3 +56,36 @@ def delete_application_route(application_id: str) -> tuple[Response, int]:
 
     except Exception as e:
         return handle_error(e)
+
+#------------------------------------------------------------
+# Submit many applications at once
+# Body: {"applications": [{"user_id", "program_id", "status", ...}, ...]}
+# Every item gets a result (created, duplicate, invalid or failed) at its position.
+@applications_batch.route('/applications:batch', methods=['POST'])
+def create_applications_batch_route() -> tuple[Response, int]:
+    try:
+        payload = ApplicationBatchSchema().load(request.json)
+        items = payload['applications']
+        max_items = current_app.config.get('APPLICATION_BATCH_MAX_ITEMS', 1000)
+        if len(items) > max_items:
+            raise APIValidationError(f"A batch holds at most {max_items} applications, got {len(items)}")
+
+        report = BatchReport()
+        schema = ApplicationBatchItemSchema()
+        valid = []
+        for index, item in enumerate(items):
+            try:
+                valid.append((index, schema.load(item)))
+            except ValidationError as ve:
+                report.record(index, 'invalid', errors=ve.messages)
+
+        create_applications_batch(valid, current_app.config.get('APPLICATION_BATCH_CHUNK_SIZE', 250), report)
+        summary = report.summary()
+        current_app.logger.info(
+            f"Application batch: {summary.get('created', 0)} of {summary['received']} created "
+            f"in {summary['elapsed_ms']} ms ({summary['rows_per_second']} rows/s)"
+        )
+        return jsonify(report.as_dict()), HTTPStatus.OK
+
+    except Exception as e:
+        return handle_error(e)
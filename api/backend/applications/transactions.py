@@ -1,8 +1,15 @@
 import uuid
+from backend.applications.trends import change_application_status, rebuild_application_trends, record_applications, retract_application
 from backend.database import db
+from backend.database.batch import BatchReport, chunked, existing_ids, existing_pairs
+from backend.database.instrumentation import repeated_queries_allowed
+from backend.programs.search_index import program_index
+from backend.users.retention import adjust_user_retention, adjust_users_retention
 from backend.utilities.errors import DatabaseError, NotFoundError
 from mysql.connector import Error as MySQLError
-from typing import Dict, Any
+from pymysql import MySQLError as DriverError
+from collections import Counter
+from typing import Dict, Any, List, Set, Tuple
 
 def get_application_by_id(application_id: str) -> Dict[str, Any]:
     cursor = db.get_db().cursor()
@@ -23,6 +30,14 @@ def update_application(application_id: str, data: Dict[str, Any]) -> Dict[str, A
     """
     cursor = db.get_db().cursor()
     try:
+        cursor.execute("START TRANSACTION")
+        application = change_application_status(cursor, application_id, data.get('status'))
+        if not application:
+            raise DatabaseError(f"No application found with id {application_id}")
+        if application['user_id'] != data['user_id']:
+            adjust_user_retention(cursor, application['user_id'], application_delta=-1)
+            adjust_user_retention(cursor, data['user_id'], application_delta=1)
+
         query = """
         UPDATE applications
         SET
@@ -42,12 +57,12 @@ def update_application(application_id: str, data: Dict[str, Any]) -> Dict[str, A
             data.get('decision_notes'),
             application_id
         ))
-        if cursor.rowcount == 0:
-            # no row matched that id
-            raise DatabaseError(f"No application found with id {application_id}")
         db.get_db().commit()
+        if application['user_id'] != data['user_id']:
+            program_index.refresh([application['program_id']])
         return {"message": "Application updated successfully"}
     except Exception as e:
+        db.get_db().rollback()
         raise DatabaseError(str(e))
     finally:
         cursor.close()
@@ -55,11 +70,140 @@ def update_application(application_id: str, data: Dict[str, Any]) -> Dict[str, A
 def delete_application(application_id: str) -> None:
     cursor = db.get_db().cursor()
     try:
+        cursor.execute("START TRANSACTION")
+        application = retract_application(cursor, application_id)
+        if not application:
+            db.get_db().rollback()
+            raise NotFoundError(f"No application with ID {application_id} to delete")
+        adjust_user_retention(cursor, application['user_id'], application_delta=-1)
         cursor.execute('DELETE FROM applications WHERE id = %s', (application_id,))
         db.get_db().commit()
-        if cursor.rowcount == 0:
-            raise NotFoundError(f"No application with ID {application_id} to delete")
+        program_index.refresh([application['program_id']])
     except MySQLError as e:
+        db.get_db().rollback()
         raise DatabaseError(str(e))
     finally:
         cursor.close()
+
+def rebuild_program_application_trends() -> int:
+    """
+    Recompute the program_application_trends cube from scratch in one transaction.
+
+    Returns:
+        int: The number of cube rows written.
+    """
+    cursor = db.get_db().cursor()
+    try:
+        cursor.execute("START TRANSACTION")
+        rows = rebuild_application_trends(cursor)
+        db.get_db().commit()
+        return rows
+    except MySQLError as e:
+        db.get_db().rollback()
+        raise DatabaseError(str(e))
+    finally:
+        cursor.close()
+
+#------------------------------------------------------------
+# Batch submission
+#
+# Each chunk runs in its own transaction: the users, programs and existing
+# (user, program) pairs of the chunk are looked up with one query each, the
+# new rows go in with a single multi-row INSERT, and the rollups are updated
+# once per program and once for all the users of the chunk.
+#------------------------------------------------------------
+APPLICATION_BATCH_COLUMNS = (
+    'id', 'user_id', 'program_id', 'status', 'qualification_status', 'decision_date', 'decision_notes'
+)
+
+def _insert_application_chunk(
+    cursor: Any,
+    chunk: List[Tuple[int, Dict[str, Any]]],
+    seen: Set[Tuple[str, str]],
+    report: BatchReport
+) -> Tuple[Set[str], Set[Tuple[str, str]]]:
+    """Write one chunk; returns the programs that received applications and the (user, program) pairs written."""
+    users = existing_ids(cursor, 'users', {data['user_id'] for _, data in chunk})
+    programs = existing_ids(cursor, 'programs', {data['program_id'] for _, data in chunk})
+    existing = existing_pairs(cursor, 'applications', ('user_id', 'program_id'), {(data['user_id'], data['program_id']) for _, data in chunk})
+
+    rows, pending = [], set()
+    for index, data in chunk:
+        pair = (data['user_id'], data['program_id'])
+        if data['user_id'] not in users:
+            report.record(index, 'invalid', errors={'user_id': [f"User {data['user_id']} not found"]})
+        elif data['program_id'] not in programs:
+            report.record(index, 'invalid', errors={'program_id': [f"Program {data['program_id']} not found"]})
+        elif pair in existing or pair in seen or pair in pending:
+            report.record(index, 'duplicate', error='The user already applied to this program')
+        else:
+            pending.add(pair)
+            rows.append((index, str(uuid.uuid4()), data))
+    if not rows:
+        return set(), set()
+
+    # A row that loses a race on unq_user_program is skipped here instead of
+    # failing the whole statement; it is reported as a duplicate below
+    cursor.executemany(
+        f"INSERT INTO applications ({', '.join(APPLICATION_BATCH_COLUMNS)}) "
+        f"VALUES ({', '.join(['%s'] * len(APPLICATION_BATCH_COLUMNS))}) "
+        f"ON DUPLICATE KEY UPDATE id = id",
+        [
+            (application_id, data['user_id'], data['program_id'], data.get('status'),
+             data.get('qualification_status'), data.get('decision_date'), data.get('decision_notes'))
+            for _, application_id, data in rows
+        ]
+    )
+    inserted = existing_ids(cursor, 'applications', {application_id for _, application_id, _ in rows})
+
+    created = []
+    for index, application_id, data in rows:
+        if application_id in inserted:
+            created.append(data)
+            report.record(index, 'created', id=application_id)
+        else:
+            report.record(index, 'duplicate', error='The user already applied to this program')
+
+    record_applications(cursor, [(data['program_id'], data.get('status')) for data in created])
+    adjust_users_retention(cursor, {
+        user_id: {'application_count': count}
+        for user_id, count in Counter(data['user_id'] for data in created).items()
+    })
+    return {data['program_id'] for data in created}, pending
+
+def create_applications_batch(items: List[Tuple[int, Dict[str, Any]]], chunk_size: int, report: BatchReport) -> BatchReport:
+    """
+    Insert validated applications in chunks of `chunk_size`, one transaction per chunk.
+
+    Args:
+        items: (position in the request, ApplicationBatchItemSchema data) pairs.
+        report: Receives one result per item. A chunk that fails on the database
+            is rolled back and the items it would have created are reported as 'failed';
+            the chunks before and after it are kept.
+    """
+    conn = db.get_db()
+    cursor = conn.cursor()
+    seen: Set[Tuple[str, str]] = set()
+    programs: Set[str] = set()
+    try:
+        # Every chunk runs the same statements; that is not an N+1
+        with repeated_queries_allowed():
+            for chunk in chunked(items, chunk_size):
+                report.chunks += 1
+                try:
+                    cursor.execute("START TRANSACTION")
+                    touched, written = _insert_application_chunk(cursor, chunk, seen, report)
+                    conn.commit()
+                    programs |= touched
+                    seen |= written
+                except (MySQLError, DriverError) as e:
+                    conn.rollback()
+                    for index, _ in chunk:
+                        result = report.results.get(index)
+                        if result is None or result['status'] == 'created':
+                            report.record(index, 'failed', error=str(e))
+    finally:
+        cursor.close()
+        if programs:
+            program_index.refresh(programs)
+    return report.finish()
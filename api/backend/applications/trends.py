@@ -0,0 +1,170 @@
+#------------------------------------------------------------
+# Maintenance of the program_application_trends cube
+#
+# The cube holds (program, category, month) -> application counts by status.
+# Every helper here runs on the caller's cursor and leaves the commit to the
+# caller, so the cube changes in the same transaction as applications.
+#------------------------------------------------------------
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+def _status_counts(status: Optional[str], sign: int) -> tuple[int, int, int]:
+    """Return the (application, approved, rejected) deltas for one application."""
+    return sign, sign if status == 'approved' else 0, sign if status == 'rejected' else 0
+
+def adjust_application_trends(
+    cursor: Any,
+    program_id: str,
+    month: Optional[str],
+    application_delta: int,
+    approved_delta: int,
+    rejected_delta: int
+) -> None:
+    """
+    Add the deltas to every category row of a program for one month.
+
+    `month` is 'YYYY-MM'; None means the current month.
+    """
+    if not (application_delta or approved_delta or rejected_delta):
+        return
+    cursor.execute('''
+        INSERT INTO program_application_trends (
+            program_id,
+            category_id,
+            application_month,
+            application_count,
+            approved_count,
+            rejected_count
+        )
+        SELECT pc.program_id, pc.category_id, COALESCE(%s, DATE_FORMAT(CURRENT_TIMESTAMP, '%%Y-%%m')), %s, %s, %s
+        FROM program_categories pc
+        WHERE pc.program_id = %s
+        ON DUPLICATE KEY UPDATE
+            application_count = application_count + %s,
+            approved_count = approved_count + %s,
+            rejected_count = rejected_count + %s
+    ''', (
+        month, application_delta, approved_delta, rejected_delta,
+        program_id,
+        application_delta, approved_delta, rejected_delta
+    ))
+
+def record_application(cursor: Any, program_id: str, status: Optional[str]) -> None:
+    """Count an application that was just inserted (applied_at defaults to now)."""
+    adjust_application_trends(cursor, program_id, None, *_status_counts(status, 1))
+
+def record_applications(cursor: Any, applications: Iterable[Tuple[str, Optional[str]]]) -> None:
+    """Count a batch of just-inserted (program_id, status) applications, one statement per program."""
+    totals: Dict[str, list] = defaultdict(lambda: [0, 0, 0])
+    for program_id, status in applications:
+        for position, delta in enumerate(_status_counts(status, 1)):
+            totals[program_id][position] += delta
+    for program_id, (application_delta, approved_delta, rejected_delta) in totals.items():
+        adjust_application_trends(cursor, program_id, None, application_delta, approved_delta, rejected_delta)
+
+def _lock_application(cursor: Any, application_id: str) -> Optional[Dict[str, Any]]:
+    cursor.execute('''
+        SELECT program_id, user_id, status, DATE_FORMAT(applied_at, '%%Y-%%m') AS application_month
+        FROM applications
+        WHERE id = %s
+        FOR UPDATE
+    ''', (application_id,))
+    return cursor.fetchone()
+
+def change_application_status(cursor: Any, application_id: str, new_status: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Move an application between status buckets before its status is updated.
+
+    Returns:
+        Optional[Dict[str, Any]]: The locked application row as it was, or None if it does not exist.
+    """
+    application = _lock_application(cursor, application_id)
+    if application and application['status'] != new_status:
+        _, old_approved, old_rejected = _status_counts(application['status'], -1)
+        _, new_approved, new_rejected = _status_counts(new_status, 1)
+        adjust_application_trends(
+            cursor,
+            application['program_id'],
+            application['application_month'],
+            0,
+            old_approved + new_approved,
+            old_rejected + new_rejected
+        )
+    return application
+
+def retract_application(cursor: Any, application_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Uncount an application before it is deleted.
+
+    Returns:
+        Optional[Dict[str, Any]]: The locked application row, or None if it does not exist.
+    """
+    application = _lock_application(cursor, application_id)
+    if application:
+        adjust_application_trends(
+            cursor,
+            application['program_id'],
+            application['application_month'],
+            *_status_counts(application['status'], -1)
+        )
+    return application
+
+def retract_user_applications(cursor: Any, user_id: str) -> None:
+    """Uncount all of a user's applications before the user (and, by cascade, their applications) is deleted."""
+    cursor.execute('''
+        UPDATE program_application_trends t
+        INNER JOIN (
+            SELECT
+                program_id,
+                DATE_FORMAT(applied_at, '%%Y-%%m') AS application_month,
+                COUNT(*) AS application_count,
+                SUM(status = 'approved') AS approved_count,
+                SUM(status = 'rejected') AS rejected_count
+            FROM applications
+            WHERE user_id = %s
+            GROUP BY program_id, DATE_FORMAT(applied_at, '%%Y-%%m')
+        ) a ON t.program_id = a.program_id AND t.application_month = a.application_month
+        SET
+            t.application_count = t.application_count - a.application_count,
+            t.approved_count = t.approved_count - a.approved_count,
+            t.rejected_count = t.rejected_count - a.rejected_count
+    ''', (user_id,))
+
+def rebuild_application_trends(cursor: Any, program_id: Optional[str] = None) -> int:
+    """
+    Recompute the cube from applications, for one program or for all of them.
+
+    Called for a single program whenever its categories change.
+
+    Returns:
+        int: The number of cube rows written.
+    """
+    program_filter = 'WHERE a.program_id = %s' if program_id else ''
+    params = (program_id,) if program_id else ()
+
+    cursor.execute(
+        f"DELETE FROM program_application_trends {'WHERE program_id = %s' if program_id else ''}",
+        params
+    )
+    cursor.execute(f'''
+        INSERT INTO program_application_trends (
+            program_id,
+            category_id,
+            application_month,
+            application_count,
+            approved_count,
+            rejected_count
+        )
+        SELECT
+            a.program_id,
+            pc.category_id,
+            DATE_FORMAT(a.applied_at, '%%Y-%%m'),
+            COUNT(*),
+            SUM(a.status = 'approved'),
+            SUM(a.status = 'rejected')
+        FROM applications a
+        INNER JOIN program_categories pc ON a.program_id = pc.program_id
+        {program_filter}
+        GROUP BY a.program_id, pc.category_id, DATE_FORMAT(a.applied_at, '%%Y-%%m')
+    ''', params)
+    return cursor.rowcount
@@ -0,0 +1,31 @@
+from backend.app import create_app
+from backend.database.aio import aio_db
+from backend.organizations.async_controllers import async_organizations
+from backend.programs.async_controllers import async_programs
+from backend.utilities.asgi import FlaskASGI
+
+def create_asgi_app() -> FlaskASGI:
+    """
+    The API as an ASGI app: program search, program detail, the analytics and
+    organization reads run on the event loop with the async pool; every other
+    route is the Flask app's, run in a thread pool.
+    """
+    app = create_app()
+    app.config.setdefault('ASGI_WSGI_THREADS', 10)
+
+    # The async pool sizes and timeouts come from the same MYSQL_POOL_* settings
+    aio_db.init_app(app)
+
+    async def startup() -> None:
+        await aio_db.start()
+
+    async def shutdown() -> None:
+        await aio_db.close()
+
+    return FlaskASGI(
+        app,
+        [async_programs, async_organizations],
+        startup=startup,
+        shutdown=shutdown,
+        threads=app.config['ASGI_WSGI_THREADS']
+    )
@@ -1,4 +1,4 @@
-from backend.utilities.pagination import validate_pagination
+from backend.utilities.pagination import jsonify_page, validate_cursor, validate_pagination
 from flask import Blueprint, request, jsonify, Response
 from backend.validators.categories import CategorySchema, CategoryUpdateSchema
 from backend.categories.transactions import (
@@ -33,8 +33,8 @@ def create_categories() -> tuple[Response, int]:
 def get_categories() -> tuple[Response, int]:
     try:
         page, limit = validate_pagination()
-        categories = get_all_categories(page=page, limit=limit)
-        return jsonify(categories), HTTPStatus.OK
+        categories = get_all_categories(page=page, limit=limit, page_cursor=validate_cursor())
+        return jsonify_page(categories), HTTPStatus.OK
 
     except Exception as e:
         return handle_error(e)
@@ -1,17 +1,19 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from backend.database import db
+from backend.database.writes import RowWriter
+from backend.programs.cache import program_cache
+from backend.programs.search_index import program_index
 from backend.utilities.errors import DatabaseError, ConflictError, NotFoundError
+from backend.utilities.pagination import Keyset, SortKey
 from mysql.connector import Error as MySQLError
 
+CATEGORIES = RowWriter('categories', columns=('id', 'name'))
+
 def create_category(data: Dict[str, str]) -> Dict[str, Any]:
     cursor = db.get_db().cursor()
     try: 
-        cursor.execute('INSERT INTO categories (name) VALUES (%s)', (data['name'],))
+        result = CATEGORIES.insert(cursor, {'name': data['name']})
         db.get_db().commit()
-        cursor.execute('SELECT * FROM categories WHERE name = %s', (data['name'],))
-        result = cursor.fetchone()
-        if not result:
-            raise DatabaseError("Failed to create category")
         return result
     except MySQLError as e:
         if e.args[0] == 1062:
@@ -21,12 +23,15 @@ def create_category(data: Dict[str, str]) -> Dict[str, Any]:
     finally:
         cursor.close()
 
-def get_all_categories(page: int, limit: int) -> List[Dict[str, Any]]:
+def get_all_categories(page: int, limit: int, page_cursor: Optional[str] = None) -> List[Dict[str, Any]]:
     cursor = db.get_db().cursor()
     try:
-        offset = (page - 1) * limit
-        cursor.execute('SELECT * FROM categories ORDER BY name LIMIT %s OFFSET %s', (limit, offset))
-        return cursor.fetchall()
+        keyset = Keyset('categories', [SortKey('name', 'name'), SortKey('id', 'id')], page_cursor)
+        where, params = keyset.where()
+        order_by, _ = keyset.order_by()
+        limit_clause, limit_params = keyset.limit(page, limit)
+        cursor.execute(f'SELECT * FROM categories WHERE {where}{order_by}{limit_clause}', params + limit_params)
+        return keyset.page(cursor.fetchall(), limit)
     except MySQLError as e:
         raise DatabaseError(str(e))
     finally:
@@ -45,28 +50,39 @@ def get_category_by_id(category_id: str) -> Dict[str, Any]:
     finally:
         cursor.close()
 
+def touch_category_owners(cursor: Any, category_id: str) -> List[str]:
+    """
+    Bump updated_at of the programs and organizations listing a category, whose payloads embed its name.
+
+    Returns:
+        List[str]: The ids of the programs listing it.
+    """
+    cursor.execute('SELECT program_id FROM program_categories WHERE category_id = %s', (category_id,))
+    program_ids = [row['program_id'] for row in cursor.fetchall()]
+    cursor.execute("""
+        UPDATE programs SET updated_at = CURRENT_TIMESTAMP(6)
+        WHERE id IN (SELECT program_id FROM program_categories WHERE category_id = %s)
+    """, (category_id,))
+    cursor.execute("""
+        UPDATE organizations SET updated_at = CURRENT_TIMESTAMP(6)
+        WHERE id IN (SELECT organization_id FROM organization_categories WHERE category_id = %s)
+    """, (category_id,))
+    return program_ids
+
 def update_category(category_id: str, update_data: Dict[str, Any]) -> Dict[str, Any]:
     cursor = db.get_db().cursor()
     try:
-        update_fields = []
-        values = []
-        for key in ['name']:
-            if key in update_data:
-                update_fields.append(f"{key} = %s")
-                values.append(update_data[key])
-        if not update_fields:
+        changes = {key: update_data[key] for key in ['name'] if key in update_data}
+        if not changes:
             raise DatabaseError("No valid fields to update")
-        values.append(category_id)
-        query = f"UPDATE categories SET {', '.join(update_fields)} WHERE id = %s"
-        cursor.execute(query, values)
-        db.get_db().commit()
-        
-        # Fetch the updated category
-        cursor.execute('SELECT * FROM categories WHERE id = %s', (category_id,))
-        result = cursor.fetchone()
-        if not result:
+        update = CATEGORIES.update(cursor, category_id, changes)
+        if not update:
+            db.get_db().rollback()
             raise NotFoundError(f"Category with id {category_id} does not exist")
-        return result
+        program_ids = touch_category_owners(cursor, category_id) if update.changed else []
+        db.get_db().commit()
+        program_cache.invalidate(program_ids)
+        return update.row
     except MySQLError as e:
         if e.args[0] == 1062:
             raise ConflictError(f"Category with name {update_data['name']} already exists")
@@ -78,8 +94,12 @@ def update_category(category_id: str, update_data: Dict[str, Any]) -> Dict[str,
 def delete_category(category_id: str) -> Dict[str, Any]:
     cursor = db.get_db().cursor()
     try:
+        # Before the delete, while the program/organization links still exist
+        program_ids = touch_category_owners(cursor, category_id)
         cursor.execute('DELETE FROM categories WHERE id = %s', (category_id,))
         db.get_db().commit()
+        program_cache.invalidate(program_ids)
+        program_index.refresh_category(category_id)
     except MySQLError as e:
         raise DatabaseError(str(e))
     finally:
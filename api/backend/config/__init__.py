@@ -10,7 +10,32 @@ def load_config():
         'MYSQL_DATABASE_PASSWORD': os.getenv('MYSQL_ROOT_PASSWORD'),
         'MYSQL_DATABASE_HOST': os.getenv('DB_HOST'),
         'MYSQL_DATABASE_PORT': int(os.getenv('DB_PORT')),
-        'MYSQL_DATABASE_DB': os.getenv('DB_NAME')
+        'MYSQL_DATABASE_DB': os.getenv('DB_NAME'),
+        'MYSQL_POOL_MIN_SIZE': int(os.getenv('DB_POOL_MIN_SIZE', 1)),
+        'MYSQL_POOL_MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+        'MYSQL_POOL_MAX_LIFETIME': float(os.getenv('DB_POOL_MAX_LIFETIME', 1800)),
+        'MYSQL_POOL_CHECKOUT_TIMEOUT': float(os.getenv('DB_POOL_CHECKOUT_TIMEOUT', 5)),
+        'MYSQL_POOL_PRE_PING': os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes'),
+        'SEARCH_INDEX_ENABLED': os.getenv('SEARCH_INDEX_ENABLED', 'true').lower() in ('1', 'true', 'yes'),
+        'SEARCH_INDEX_MAX_AGE': float(os.getenv('SEARCH_INDEX_MAX_AGE', 300)),
+        'PROGRAM_CACHE_BACKEND': os.getenv('PROGRAM_CACHE_BACKEND', 'memory'),
+        'PROGRAM_CACHE_SIZE': int(os.getenv('PROGRAM_CACHE_SIZE', 1024)),
+        'PROGRAM_CACHE_TTL': float(os.getenv('PROGRAM_CACHE_TTL', 60)),
+        'PROGRAM_CACHE_URL': os.getenv('PROGRAM_CACHE_URL'),
+        'APPLICATION_BATCH_MAX_ITEMS': int(os.getenv('APPLICATION_BATCH_MAX_ITEMS', 1000)),
+        'APPLICATION_BATCH_CHUNK_SIZE': int(os.getenv('APPLICATION_BATCH_CHUNK_SIZE', 250)),
+        'FEEDBACK_BATCH_MAX_ITEMS': int(os.getenv('FEEDBACK_BATCH_MAX_ITEMS', 50000)),
+        'FEEDBACK_BATCH_CHUNK_SIZE': int(os.getenv('FEEDBACK_BATCH_CHUNK_SIZE', 500)),
+        'QUERY_SERVER_TIMING': os.getenv('QUERY_SERVER_TIMING', 'true').lower() in ('1', 'true', 'yes'),
+        'QUERY_REPEAT_THRESHOLD': int(os.getenv('QUERY_REPEAT_THRESHOLD', 10)),
+        'QUERY_REPEAT_STRICT': os.getenv('QUERY_REPEAT_STRICT', 'false').lower() in ('1', 'true', 'yes'),
+        'ADMIN_TOKEN': os.getenv('ADMIN_TOKEN'),
+        'PROFILER_INTERVAL_MS': float(os.getenv('PROFILER_INTERVAL_MS', 10)),
+        'PROFILER_MAX_SECONDS': float(os.getenv('PROFILER_MAX_SECONDS', 300)),
+        'ASGI_WSGI_THREADS': int(os.getenv('ASGI_WSGI_THREADS', 10)),
+        'JSON_PROVIDER': os.getenv('JSON_PROVIDER', 'orjson'),
+        'STREAM_BATCH_SIZE': int(os.getenv('STREAM_BATCH_SIZE', 500)),
+        'EXPORT_BATCH_SIZE': int(os.getenv('EXPORT_BATCH_SIZE', 5000))
     }
     
     return config
\ No newline at end of file
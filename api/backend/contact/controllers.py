@@ -1,7 +1,8 @@
 from typing import Any, Tuple
 from flask import Blueprint, request, jsonify, Response
-from backend.contact.transactions import delete_point_of_contact, get_point_of_contact_by_id, insert_point_of_contact, update_point_of_contact
+from backend.contact.transactions import delete_point_of_contact, get_point_of_contact_by_id, get_point_of_contact_version, insert_point_of_contact, update_point_of_contact
 from backend.contact.validators import PointOfContactSchema, PointOfContactUpdateSchema
+from backend.utilities.conditional import conditional_get, resource_version
 from backend.utilities.errors import handle_error
 from backend.utilities.uuid import validate_uuid
 from http import HTTPStatus
@@ -26,9 +27,9 @@ def create_point_of_contact() -> Tuple[Any, int]:
 @contact.route('/<string:contact_id>', methods=['GET'], strict_slashes=False)
 def get_point_of_contact(contact_id: str) -> Tuple[Any, int]:
     try:
-        # Fetch the point of contact record using the refactored helper function
-        result = get_point_of_contact_by_id(contact_id)
-        return jsonify(result), HTTPStatus.OK
+        # Answer 304 from the updated_at probe when the client's copy is current
+        version = resource_version(get_point_of_contact_version(contact_id))
+        return conditional_get(version, lambda: jsonify(get_point_of_contact_by_id(contact_id)))
     except Exception as e:
         return handle_error(e)
     
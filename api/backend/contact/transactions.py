@@ -1,11 +1,19 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from unittest import result
 
 from flask import jsonify
 from backend.database import db
+from backend.database.writes import RowWriter
 from backend.utilities.errors import DatabaseError, ConflictError, NotFoundError
 from mysql.connector import Error as MySQLError
 
+POINT_OF_CONTACTS = RowWriter(
+    'point_of_contacts',
+    columns=('id', 'contact_type', 'entity_id', 'description', 'email', 'phone_number', 'created_at', 'updated_at'),
+    created={'created_at': 0},
+    updated={'updated_at': 6}
+)
+
 def insert_point_of_contact(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Insert a new point of contact record into the database.
@@ -62,6 +70,25 @@ def get_point_of_contact_by_id(contact_id: str) -> Dict[str, Any]:
     finally:
         cursor.close()
 
+def get_point_of_contact_version(contact_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch the version probe of a point of contact: its updated_at.
+
+    Args:
+        contact_id (str): The unique identifier of the point of contact.
+
+    Returns:
+        Optional[Dict[str, Any]]: The probe row, or None if the point of contact does not exist.
+    """
+    cursor = db.get_db().cursor()
+    try:
+        cursor.execute("SELECT UNIX_TIMESTAMP(updated_at) AS updated_at FROM point_of_contacts WHERE id = %s", (contact_id,))
+        return cursor.fetchone()
+    except MySQLError as e:
+        raise DatabaseError(f"Error fetching point of contact: {str(e)}")
+    finally:
+        cursor.close()
+
 def update_point_of_contact(contact_id: str, update_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Update an existing point of contact record in the database.
@@ -80,27 +107,20 @@ def update_point_of_contact(contact_id: str, update_data: Dict[str, Any]) -> Dic
     """
     cursor = db.get_db().cursor()
     try:
-        update_fields = []
-        values = []
-        # Loop only over allowed keys according to the PointOfContactUpdateSchema
-        for key in ['contact_type', 'entity_id', 'description', 'email', 'phone_number']:
-            if key in update_data:
-                update_fields.append(f"{key} = %s")
-                values.append(update_data[key])
-        if not update_fields:
+        # Only the keys allowed by the PointOfContactUpdateSchema are written
+        changes = {
+            key: update_data[key]
+            for key in ['contact_type', 'entity_id', 'description', 'email', 'phone_number']
+            if key in update_data
+        }
+        if not changes:
             raise DatabaseError("No valid fields to update")
-        # Append the contact_id for the WHERE clause
-        values.append(contact_id)
-        query = f"UPDATE point_of_contacts SET {', '.join(update_fields)} WHERE id = %s"
-        cursor.execute(query, values)
-        db.get_db().commit()
-        
-        # Fetch the updated point of contact record
-        cursor.execute("SELECT * FROM point_of_contacts WHERE id = %s", (contact_id,))
-        result = cursor.fetchone()
-        if not result:
+        update = POINT_OF_CONTACTS.update(cursor, contact_id, changes)
+        if not update:
+            db.get_db().rollback()
             raise NotFoundError(f"Point of contact with id {contact_id} does not exist")
-        return result
+        db.get_db().commit()
+        return update.row
     except MySQLError as e:
         raise DatabaseError(str(e))
     finally:
@@ -1,10 +1,164 @@
 #------------------------------------------------------------
 # This file creates a shared DB connection resource
 #------------------------------------------------------------
-from flaskext.mysql import MySQL
+from typing import Any, Dict, Iterator, List, Optional, TypeVar
+
+import pymysql
+from flask import Flask, g
+from pymysql import MySQLError as DriverError
 from pymysql import cursors
 
+from backend.database import instrumentation
+from backend.database.pool import ConnectionPool
+from backend.database.reads import Query, Reader, run_reader
+from backend.utilities.errors import DatabaseError
+
+T = TypeVar('T')
+
+# Every session runs in UTC, so TIMESTAMP columns are read and written as UTC:
+# the clock of the timestamps the API writes itself (see writes.py), and the
+# zone the JSON responses give naive datetimes
+SESSION_INIT_COMMAND = "SET time_zone = '+00:00'"
+
+
+class PooledMySQL:
+    """
+    Drop-in replacement for `flaskext.mysql.MySQL` backed by a connection pool.
+
+    `get_db()` checks a connection out of the pool the first time it is called
+    in an app context and hands it back when the context is torn down, so the
+    `*/transactions.py` modules keep calling `db.get_db().cursor()` unchanged.
+    """
+
+    def __init__(self, cursorclass: Any = cursors.Cursor):
+        self.cursorclass = cursorclass
+        self.app: Optional[Flask] = None
+        self.pool: Optional[ConnectionPool] = None
+
+    def init_app(self, app: Flask) -> None:
+        self.app = app
+        app.config.setdefault('MYSQL_DATABASE_HOST', 'localhost')
+        app.config.setdefault('MYSQL_DATABASE_PORT', 3306)
+        app.config.setdefault('MYSQL_DATABASE_USER', None)
+        app.config.setdefault('MYSQL_DATABASE_PASSWORD', None)
+        app.config.setdefault('MYSQL_DATABASE_DB', None)
+        app.config.setdefault('MYSQL_DATABASE_CHARSET', 'utf8mb4')
+        app.config.setdefault('MYSQL_CONNECT_TIMEOUT', 10)
+        app.config.setdefault('MYSQL_POOL_MIN_SIZE', 1)
+        app.config.setdefault('MYSQL_POOL_MAX_SIZE', 10)
+        app.config.setdefault('MYSQL_POOL_MAX_LIFETIME', 1800)
+        app.config.setdefault('MYSQL_POOL_CHECKOUT_TIMEOUT', 5.0)
+        app.config.setdefault('MYSQL_POOL_PRE_PING', True)
+        app.config.setdefault('STREAM_BATCH_SIZE', 500)
+
+        self.pool = self._new_pool()
+        app.teardown_appcontext(self.teardown_request)
+        instrumentation.init_app(app)
+
+    def _new_pool(self) -> ConnectionPool:
+        config = self.app.config
+        return ConnectionPool(
+            self.connect,
+            min_size=config['MYSQL_POOL_MIN_SIZE'],
+            max_size=config['MYSQL_POOL_MAX_SIZE'],
+            max_lifetime=config['MYSQL_POOL_MAX_LIFETIME'],
+            checkout_timeout=config['MYSQL_POOL_CHECKOUT_TIMEOUT'],
+            pre_ping=config['MYSQL_POOL_PRE_PING']
+        )
+
+    def after_fork(self) -> None:
+        """
+        Give a forked worker a pool of its own.
+
+        The connections inherited from the parent are dropped without being
+        closed: their sockets are shared with the parent, and closing them
+        here would end the parent's sessions too.
+        """
+        if self.app is not None:
+            self.pool = self._new_pool()
+
+    def connect(self) -> pymysql.connections.Connection:
+        """Open a brand new connection, bypassing the pool."""
+        config = self.app.config
+        return pymysql.connect(
+            host=config['MYSQL_DATABASE_HOST'],
+            port=config['MYSQL_DATABASE_PORT'],
+            user=config['MYSQL_DATABASE_USER'],
+            password=config['MYSQL_DATABASE_PASSWORD'] or '',
+            database=config['MYSQL_DATABASE_DB'],
+            charset=config['MYSQL_DATABASE_CHARSET'],
+            connect_timeout=config['MYSQL_CONNECT_TIMEOUT'],
+            init_command=SESSION_INIT_COMMAND,
+            cursorclass=self.cursorclass
+        )
+
+    def get_db(self) -> pymysql.connections.Connection:
+        """Return the connection bound to the current app context."""
+        if 'mysql_db' not in g:
+            g.mysql_db = self.pool.acquire()
+        return g.mysql_db
+
+    def read(self, reader: Reader[T]) -> T:
+        """Run a reader (see backend/database/reads.py) on the connection of the current app context."""
+        cursor = self.get_db().cursor()
+        try:
+            return run_reader(reader, cursor)
+        finally:
+            cursor.close()
+
+    def stream(self, query: Query, batch_size: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Run `query` on an unbuffered cursor and iterate its rows in batches
+        of `batch_size` (STREAM_BATCH_SIZE by default).
+
+        The statement runs right away, so its errors are raised here (as
+        DatabaseError) while the response can still report them. The rows
+        are only read from the server as the batches are iterated, so memory
+        holds one batch whatever the size of the result. Until the iteration
+        ends the connection of the app context is busy with the result; keep
+        the app context (stream_with_context) open while iterating.
+        """
+        conn = self.get_db()
+        cursor = conn.cursor(instrumentation.InstrumentedSSCursor)
+        try:
+            cursor.execute(query.sql, query.params)
+        except DriverError as e:
+            cursor.close()
+            raise DatabaseError(str(e))
+        return self._batches(conn, cursor, batch_size or self.app.config['STREAM_BATCH_SIZE'])
+
+    @staticmethod
+    def _batches(conn: pymysql.connections.Connection, cursor: Any, size: int) -> Iterator[List[Dict[str, Any]]]:
+        finished = False
+        try:
+            while True:
+                rows = cursor.fetchmany(size)
+                if not rows:
+                    finished = True
+                    return
+                yield rows
+        finally:
+            if finished:
+                cursor.close()
+            else:
+                # Stopped early (client gone, error): closing the cursor would
+                # read the rest of the result first, so drop the connection
+                # instead; the pool discards it on release
+                try:
+                    conn.close()
+                except DriverError:
+                    pass
+
+    def teardown_request(self, exception: Optional[BaseException]) -> None:
+        conn = g.pop('mysql_db', None)
+        if conn is not None:
+            self.pool.release(conn)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return self.pool.stats() if self.pool else {}
+
 
-# the parameter instructs the connection to return data 
-# as a dictionary object. 
-db = MySQL(cursorclass=cursors.DictCursor)
\ No newline at end of file
+# the parameter instructs the connection to return data
+# as a dictionary object (InstrumentedCursor is a DictCursor that also
+# records each statement for the per-request query report).
+db = PooledMySQL(cursorclass=instrumentation.InstrumentedCursor)
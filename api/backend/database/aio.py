@@ -0,0 +1,104 @@
+#------------------------------------------------------------
+# Async connection pool for the ASGI read path
+#
+# Runs the same readers as db.read (see backend/database/reads.py) on
+# aiomysql connections. The statements of one step of a reader, and of
+# gathered readers, run concurrently, each on its own pooled connection.
+# Their Compute steps run in a thread (asyncio.to_thread), off the event loop.
+# The pool is opened by the ASGI lifespan startup, in the worker process
+# that serves the requests, and sized by MYSQL_POOL_MAX_SIZE.
+#------------------------------------------------------------
+import asyncio
+import time
+from typing import Any, Dict, Optional, TypeVar
+
+from flask import Flask
+from pymysql import MySQLError as DriverError
+
+from backend.database import SESSION_INIT_COMMAND
+from backend.database.instrumentation import record_statement
+from backend.database.reads import Compute, Reader, Step
+from backend.utilities.errors import DatabaseError, PoolTimeoutError
+
+T = TypeVar('T')
+
+class AsyncPooledMySQL:
+    """aiomysql pool that runs readers; the async counterpart of PooledMySQL.read."""
+
+    def __init__(self):
+        self.app: Optional[Flask] = None
+        self.pool: Optional[Any] = None
+        self.checkout_timeout = 5.0
+
+    def init_app(self, app: Flask) -> None:
+        self.app = app
+        self.checkout_timeout = app.config['MYSQL_POOL_CHECKOUT_TIMEOUT']
+
+    async def start(self) -> None:
+        import aiomysql  # only the ASGI entry point needs it
+
+        config = self.app.config
+        self.pool = await aiomysql.create_pool(
+            host=config['MYSQL_DATABASE_HOST'],
+            port=config['MYSQL_DATABASE_PORT'],
+            user=config['MYSQL_DATABASE_USER'],
+            password=config['MYSQL_DATABASE_PASSWORD'] or '',
+            db=config['MYSQL_DATABASE_DB'],
+            charset=config['MYSQL_DATABASE_CHARSET'],
+            connect_timeout=config['MYSQL_CONNECT_TIMEOUT'],
+            init_command=SESSION_INIT_COMMAND,
+            # Connections open on first use, so the server starts while MySQL is still coming up
+            minsize=0,
+            maxsize=config['MYSQL_POOL_MAX_SIZE'],
+            pool_recycle=int(config['MYSQL_POOL_MAX_LIFETIME']) or -1,
+            cursorclass=aiomysql.DictCursor,
+            # Reads only: without autocommit a pooled connection would keep
+            # serving the snapshot of its first read
+            autocommit=True
+        )
+
+    async def close(self) -> None:
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+
+    async def fetch(self, query: Step) -> Any:
+        if isinstance(query, Compute):
+            # to_thread copies the context, so the call still sees the request and app
+            return await asyncio.to_thread(query.function, *query.args)
+        try:
+            conn = await asyncio.wait_for(self.pool.acquire(), self.checkout_timeout)
+        except asyncio.TimeoutError:
+            raise PoolTimeoutError(f"Timed out after {self.checkout_timeout}s waiting for a database connection")
+        started = time.perf_counter()
+        try:
+            async with conn.cursor() as cursor:
+                await cursor.execute(query.sql, query.params)
+                return await (cursor.fetchone() if query.one else cursor.fetchall())
+        finally:
+            self.pool.release(conn)
+            record_statement(query.sql, time.perf_counter() - started)
+
+    async def read(self, reader: Reader[T]) -> T:
+        """Run a reader, the statements of each of its steps concurrently, and return its result."""
+        try:
+            step = next(reader)
+            while True:
+                if isinstance(step, list):
+                    result = list(await asyncio.gather(*(self.fetch(query) for query in step)))
+                else:
+                    result = await self.fetch(step)
+                step = reader.send(result)
+        except StopIteration as done:
+            return done.value
+        except DriverError as e:
+            raise DatabaseError(str(e))
+
+    def stats(self) -> Dict[str, Any]:
+        if self.pool is None:
+            return {}
+        return {'size': self.pool.size, 'idle': self.pool.freesize, 'max_size': self.pool.maxsize}
+
+
+aio_db = AsyncPooledMySQL()
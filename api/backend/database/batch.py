@@ -0,0 +1,94 @@
+#------------------------------------------------------------
+# Helpers for batch writes: chunking and per-item reports
+#------------------------------------------------------------
+import time
+from collections import Counter
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, TypeVar
+
+T = TypeVar('T')
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Yield lists of at most `size` items; `items` is consumed lazily."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def existing_ids(cursor: Any, table: str, ids: Set[str], column: str = 'id') -> Set[str]:
+    """The subset of `ids` present in `table`, in one query."""
+    if not ids:
+        return set()
+    cursor.execute(f"SELECT {column} FROM {table} WHERE {column} IN ({', '.join(['%s'] * len(ids))})", list(ids))
+    return {row[column] for row in cursor.fetchall()}
+
+def existing_pairs(cursor: Any, table: str, columns: Sequence[str], pairs: Set[Tuple[Any, ...]]) -> Set[Tuple[Any, ...]]:
+    """The subset of `pairs` (values of `columns`, e.g. a unique key) present in `table`, in one query."""
+    if not pairs:
+        return set()
+    row = f"({', '.join(['%s'] * len(columns))})"
+    cursor.execute(
+        f"SELECT {', '.join(columns)} FROM {table} WHERE ({', '.join(columns)}) IN ({', '.join([row] * len(pairs))})",
+        [value for pair in pairs for value in pair]
+    )
+    return {tuple(found[column] for column in columns) for found in cursor.fetchall()}
+
+class BatchReport:
+    """
+    Outcome of every item of a batch, keyed by its position in the input,
+    and the throughput of the rows written.
+
+    Statuses are free-form ('created', 'duplicate', 'invalid', ...); the
+    summary counts each of them. `written` is the status that counts as a
+    row written for rows_per_second.
+    """
+
+    def __init__(self, written: str = 'created'):
+        self.written = written
+        self.results: Dict[int, Dict[str, Any]] = {}
+        self.chunks = 0
+        self.started = time.perf_counter()
+        self.elapsed: Optional[float] = None
+        # Set when the input was cut short: {'after': items read, 'reason': ...}
+        self.truncated: Optional[Dict[str, Any]] = None
+
+    def record(self, index: int, status: str, **detail: Any) -> None:
+        self.results[index] = {'index': index, 'status': status, **detail}
+
+    def truncate(self, after: int, reason: str) -> None:
+        """Record that the items after the first `after` were not read."""
+        self.truncated = {'after': after, 'reason': reason}
+
+    def finish(self) -> 'BatchReport':
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        return dict(Counter(result['status'] for result in self.results.values()))
+
+    @property
+    def rows_per_second(self) -> Optional[float]:
+        elapsed = self.elapsed if self.elapsed is not None else time.perf_counter() - self.started
+        written = self.counts.get(self.written, 0)
+        return round(written / elapsed, 1) if elapsed > 0 else None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'received': len(self.results),
+            **self.counts,
+            'chunks': self.chunks,
+            'elapsed_ms': round((self.elapsed or 0) * 1000, 1),
+            'rows_per_second': self.rows_per_second
+        }
+
+    def as_dict(self) -> Dict[str, Any]:
+        report = {
+            'summary': self.summary(),
+            'results': [self.results[index] for index in sorted(self.results)]
+        }
+        if self.truncated:
+            report['truncated'] = self.truncated
+        return report
@@ -0,0 +1,198 @@
+#------------------------------------------------------------
+# Per-request query instrumentation
+#
+# Every statement run through InstrumentedCursor (the cursor class of `db`)
+# is recorded in the QueryLog of the current app context: how many
+# statements ran, the time spent in them and the slowest one. At the end of
+# a request the totals go out as a Server-Timing header and as one JSON log
+# line.
+#
+# Statements are also counted by shape (whitespace collapsed, string and
+# number literals replaced by ?, IN-lists and VALUES lists folded), and a shape that runs QUERY_REPEAT_THRESHOLD times
+# within one request is reported as a likely N+1. With QUERY_REPEAT_STRICT
+# the statement that crosses the threshold raises RepeatedQueryError, so a
+# test run fails instead of logging. Code that repeats statements on
+# purpose (batch chunks) runs them under repeated_queries_allowed().
+#------------------------------------------------------------
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from flask import Flask, Response, current_app, g, has_app_context, has_request_context, request
+from pymysql import cursors
+
+from backend.utilities.errors import RepeatedQueryError
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+# Quoted strings (with '' and backslash escapes) and numbers that are not part of a name
+_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"|(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_PLACEHOLDER_LIST = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+_ROW_LIST = re.compile(r'\(\?\)(?:\s*,\s*\(\?\))+')
+
+def statement_shape(statement: Any) -> str:
+    """
+    The statement with its literals replaced by ? and its placeholder lists
+    folded, so statements differing only in their values (or in the length
+    of an IN-list) share one shape.
+    """
+    if isinstance(statement, bytes):
+        statement = statement.decode('utf-8', 'replace')
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    shape = _LITERAL.sub('?', shape)
+    shape = _PLACEHOLDER_LIST.sub('(?)', shape)
+    return _ROW_LIST.sub('(?)', shape)
+
+class QueryLog:
+    """Statements of one app context (one request)."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest: Tuple[float, Optional[str]] = (0.0, None)
+        self.shapes: Counter = Counter()
+        self.allow_repeats = 0
+
+    def record(self, statement: Any, seconds: float) -> int:
+        """Count one statement; returns how many times its shape has run (0 while repeats are allowed)."""
+        shape = statement_shape(statement)
+        self.count += 1
+        self.seconds += seconds
+        if seconds >= self.slowest[0]:
+            self.slowest = (seconds, shape)
+        if self.allow_repeats:
+            return 0
+        self.shapes[shape] += 1
+        return self.shapes[shape]
+
+    def repeated(self, threshold: int) -> List[Dict[str, Any]]:
+        return [
+            {'shape': shape, 'count': count}
+            for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries", '
+            f'db-slowest;dur={self.slowest[0] * 1000:.2f}'
+        )
+
+def current_query_log() -> Optional[QueryLog]:
+    """The QueryLog of the current app context, created on first use; None outside one."""
+    if not has_app_context():
+        return None
+    if 'query_log' not in g:
+        g.query_log = QueryLog()
+    return g.query_log
+
+@contextmanager
+def repeated_queries_allowed() -> Iterator[None]:
+    """Run statements that repeat on purpose without counting them towards the N+1 check."""
+    log = current_query_log()
+    if log is not None:
+        log.allow_repeats += 1
+    try:
+        yield
+    finally:
+        if log is not None:
+            log.allow_repeats -= 1
+
+def record_statement(statement: Any, seconds: float) -> None:
+    """Count a statement in the QueryLog of the current app context (if any)."""
+    log = current_query_log()
+    if log is None:
+        return
+    repeats = log.record(statement, seconds)
+    threshold = current_app.config.get('QUERY_REPEAT_THRESHOLD', 10)
+    if threshold and repeats == threshold and current_app.config.get('QUERY_REPEAT_STRICT', False):
+        raise RepeatedQueryError(
+            f"Statement ran {repeats} times in one request (likely N+1): {statement_shape(statement)[:200]}"
+        )
+
+class InstrumentedCursor(cursors.DictCursor):
+    """DictCursor that records every statement in the current QueryLog."""
+
+    _in_executemany = False
+
+    def execute(self, query: Any, args: Any = None) -> int:
+        if self._in_executemany:
+            # executemany sends its multi-row statements through here; they are recorded once, below
+            return super().execute(query, args)
+        started = time.perf_counter()
+        try:
+            result = super().execute(query, args)
+        except Exception:
+            record_statement(query, time.perf_counter() - started)
+            raise
+        record_statement(query, time.perf_counter() - started)
+        return result
+
+    def executemany(self, query: Any, args: Any) -> Optional[int]:
+        started = time.perf_counter()
+        self._in_executemany = True
+        try:
+            result = super().executemany(query, args)
+        except Exception:
+            self._in_executemany = False
+            record_statement(query, time.perf_counter() - started)
+            raise
+        self._in_executemany = False
+        record_statement(query, time.perf_counter() - started)
+        return result
+
+class InstrumentedSSCursor(cursors.SSDictCursor):
+    """
+    Unbuffered DictCursor (rows stay on the server until they are fetched)
+    that records its statements. The time recorded is the time to the first
+    row; reading the rows is not counted.
+    """
+
+    def execute(self, query: Any, args: Any = None) -> int:
+        started = time.perf_counter()
+        try:
+            result = super().execute(query, args)
+        except Exception:
+            record_statement(query, time.perf_counter() - started)
+            raise
+        record_statement(query, time.perf_counter() - started)
+        return result
+
+def _report_queries(response: Response) -> Response:
+    log = g.get('query_log')
+    if log is None or not has_request_context():
+        return response
+    config = current_app.config
+    if config.get('QUERY_SERVER_TIMING', True):
+        response.headers.add('Server-Timing', log.server_timing())
+
+    threshold = config.get('QUERY_REPEAT_THRESHOLD', 10)
+    repeated = log.repeated(threshold) if threshold else []
+    line = {
+        'event': 'request_queries',
+        'method': request.method,
+        'path': request.path,
+        'endpoint': request.endpoint,
+        'status': response.status_code,
+        'queries': log.count,
+        'db_ms': round(log.seconds * 1000, 2),
+        'slowest_ms': round(log.slowest[0] * 1000, 2),
+        'slowest': (log.slowest[1] or '')[:200],
+        'repeated': repeated
+    }
+    if repeated:
+        logger.warning(json.dumps(line))
+    else:
+        logger.info(json.dumps(line))
+    return response
+
+def init_app(app: Flask) -> None:
+    app.config.setdefault('QUERY_SERVER_TIMING', True)
+    app.config.setdefault('QUERY_REPEAT_THRESHOLD', 10)
+    app.config.setdefault('QUERY_REPEAT_STRICT', False)
+    app.after_request(_report_queries)
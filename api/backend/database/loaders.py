@@ -0,0 +1,66 @@
+#------------------------------------------------------------
+# Batched parent/child loading (DataLoader-style)
+#------------------------------------------------------------
+from typing import Any, Dict, Iterable, List, Sequence
+
+from backend.database.reads import Query, Reader, run_reader
+
+
+class BatchLoader:
+    """
+    Load the children of many parent rows with one IN-list query.
+
+    `query` must select the parent key column and contain a `{keys}`
+    placeholder where the IN-list goes, e.g.
+
+        BatchLoader('''
+            SELECT program_id, name FROM qualifications
+            WHERE program_id IN ({keys})
+        ''', key='program_id')
+
+    Duplicate keys are collapsed and very large key sets are split into
+    chunks of `chunk_size`, so a page of N parents costs ceil(N / chunk_size)
+    round trips instead of N.
+    """
+
+    def __init__(self, query: str, key: str, chunk_size: int = 500):
+        self.query = query
+        self.key = key
+        self.chunk_size = chunk_size
+
+    def load(self, keys: Iterable[Any]) -> Reader[Dict[Any, List[Dict[str, Any]]]]:
+        """
+        Reader of the children of every key (see backend/database/reads.py).
+
+        Returns:
+            Dict[Any, List[Dict[str, Any]]]: Child rows grouped by parent key, with
+            the key column removed. Keys without children map to an empty list.
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        grouped: Dict[Any, List[Dict[str, Any]]] = {key: [] for key in unique_keys}
+
+        chunks = [unique_keys[start:start + self.chunk_size] for start in range(0, len(unique_keys), self.chunk_size)]
+        if not chunks:
+            return grouped
+        results = yield [Query(self.query.format(keys=', '.join(['%s'] * len(chunk))), chunk) for chunk in chunks]
+        for rows in results:
+            for row in rows:
+                row = dict(row)
+                grouped.setdefault(row.pop(self.key), []).append(row)
+
+        return grouped
+
+    def load_many(self, cursor: Any, keys: Iterable[Any]) -> Dict[Any, List[Dict[str, Any]]]:
+        """Fetch the children of every key on `cursor` (see `load`)."""
+        return run_reader(self.load(keys), cursor)
+
+    def attach(self, cursor: Any, parents: Sequence[Dict[str, Any]], field: str, parent_key: str = 'id') -> Sequence[Dict[str, Any]]:
+        """Load children for `parents` and store them on each parent under `field`."""
+        return self.assign(parents, field, self.load_many(cursor, (parent[parent_key] for parent in parents)), parent_key)
+
+    @staticmethod
+    def assign(parents: Sequence[Dict[str, Any]], field: str, children: Dict[Any, List[Dict[str, Any]]], parent_key: str = 'id') -> Sequence[Dict[str, Any]]:
+        """Store loaded children on each parent under `field`."""
+        for parent in parents:
+            parent[field] = children.get(parent[parent_key], [])
+        return parents
@@ -0,0 +1,208 @@
+#------------------------------------------------------------
+# Thread-safe PyMySQL connection pool
+#------------------------------------------------------------
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Tuple
+
+from pymysql import MySQLError
+from backend.utilities.errors import PoolTimeoutError
+
+
+class ConnectionPool:
+    """
+    A bounded pool of PyMySQL connections.
+
+    Connections are created lazily up to `max_size`, validated with a ping
+    before being handed out (when `pre_ping` is enabled) and recycled once
+    they are older than `max_lifetime` seconds. Callers that cannot get a
+    connection within `checkout_timeout` seconds get a `PoolTimeoutError`.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int = 1,
+        max_size: int = 10,
+        max_lifetime: float = 1800,
+        checkout_timeout: float = 5.0,
+        pre_ping: bool = True
+    ):
+        if min_size < 0 or max_size <= 0 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size > 0")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.checkout_timeout = checkout_timeout
+        self.pre_ping = pre_ping
+
+        self._lock = threading.Condition()
+        self._idle: Deque[Tuple[Any, float]] = deque()
+        self._created_at: Dict[int, float] = {}
+        self._size = 0
+        self._waiting = 0
+        self._warmed = False
+        self._closed = False
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._wait_time = 0.0
+
+    def _open(self) -> Any:
+        conn = self._connect()
+        with self._lock:
+            self._created_at[id(conn)] = time.monotonic()
+            self._created += 1
+        return conn
+
+    def _discard(self, conn: Any) -> None:
+        """Close a connection and free its slot. The caller must not hold the lock."""
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._created_at.pop(id(conn), None)
+            self._size -= 1
+            self._discarded += 1
+            self._lock.notify()
+
+    def _expired(self, conn: Any) -> bool:
+        if not self.max_lifetime:
+            return False
+        created_at = self._created_at.get(id(conn), 0)
+        return time.monotonic() - created_at > self.max_lifetime
+
+    def _healthy(self, conn: Any) -> bool:
+        if not conn.open:
+            return False
+        if not self.pre_ping:
+            return True
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except MySQLError:
+            return False
+
+    def warm(self) -> None:
+        """Open connections until `min_size` of them exist."""
+        with self._lock:
+            self._warmed = True
+            missing = self.min_size - self._size
+            self._size += max(missing, 0)
+        for _ in range(max(missing, 0)):
+            try:
+                conn = self._open()
+            except MySQLError:
+                with self._lock:
+                    self._size -= 1
+                continue
+            with self._lock:
+                self._idle.append((conn, time.monotonic()))
+                self._lock.notify()
+
+    def acquire(self) -> Any:
+        """
+        Check a connection out of the pool.
+
+        Returns:
+            A live PyMySQL connection. It must be given back with `release`.
+
+        Raises:
+            PoolTimeoutError: If no connection frees up within `checkout_timeout`.
+        """
+        if not self._warmed:
+            self.warm()
+
+        started = time.monotonic()
+        deadline = started + self.checkout_timeout
+        while True:
+            conn = None
+            reserve = False
+            with self._lock:
+                if self._closed:
+                    raise PoolTimeoutError("Connection pool is closed")
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {self.checkout_timeout}s waiting for a database connection"
+                        )
+                    self._waiting += 1
+                    try:
+                        self._lock.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+                if self._idle:
+                    conn, _ = self._idle.pop()
+                else:
+                    self._size += 1
+                    reserve = True
+
+            if reserve:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._lock:
+                        self._size -= 1
+                        self._lock.notify()
+                    raise
+            elif self._expired(conn) or not self._healthy(conn):
+                self._discard(conn)
+                continue
+
+            with self._lock:
+                self._checkouts += 1
+                self._wait_time += time.monotonic() - started
+            return conn
+
+    def release(self, conn: Any) -> None:
+        """Return a connection to the pool, rolling back any open transaction."""
+        try:
+            if not conn.open:
+                raise MySQLError("Connection is closed")
+            conn.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+
+        if self._closed or self._expired(conn):
+            self._discard(conn)
+            return
+
+        with self._lock:
+            self._idle.append((conn, time.monotonic()))
+            self._lock.notify()
+
+    def close(self) -> None:
+        """Close every idle connection and refuse further checkouts."""
+        with self._lock:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the pool's size and lifetime counters."""
+        with self._lock:
+            idle = len(self._idle)
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": idle,
+                "in_use": self._size - idle,
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "created": self._created,
+                "discarded": self._discarded,
+                "avg_wait_ms": round(self._wait_time / self._checkouts * 1000, 3) if self._checkouts else 0.0
+            }
@@ -0,0 +1,99 @@
+#------------------------------------------------------------
+# Read functions shared by the sync (Flask) and async (ASGI) paths
+#
+# A reader is a generator that yields the statements it needs and gets their
+# rows sent back, so its SQL and the shaping of the result are written once:
+#
+#     def program_stats_reader(program_id):
+#         row = yield Query('SELECT ... WHERE program_id = %s', (program_id,), one=True)
+#         return row
+#
+# `run_reader` drives one on a PyMySQL cursor (db.read); the async pool
+# (backend/database/aio.py) drives the same generator with aiomysql. A
+# reader that yields a list of statements gets a list of results back; the
+# statements are independent, so the async pool runs them concurrently on
+# separate connections (the sync path runs them one after the other), and
+# `gather` combines independent readers that way.
+#
+# CPU-bound work of a reader (e.g. ranking with the search index) is yielded
+# as a Compute step, so that the async pool runs it in a thread instead of
+# on the event loop:
+#
+#     page = yield Compute(program_index.search, (params,))
+#------------------------------------------------------------
+from typing import Any, Callable, Dict, Generator, List, NamedTuple, Sequence, Tuple, TypeVar, Union
+
+from pymysql import MySQLError as DriverError
+
+from backend.utilities.errors import DatabaseError
+
+T = TypeVar('T')
+
+class Query(NamedTuple):
+    """A statement of a reader; `one` fetches a single row (or None) instead of a list."""
+    sql: str
+    params: Sequence[Any] = ()
+    one: bool = False
+
+class Compute(NamedTuple):
+    """A call of a reader that does not touch the database; its return value is sent back."""
+    function: Callable[..., Any]
+    args: Sequence[Any] = ()
+
+Step = Union[Query, Compute]
+Reader = Generator[Union[Step, List[Step]], Any, T]
+
+def fetch(cursor: Any, query: Step) -> Any:
+    if isinstance(query, Compute):
+        return query.function(*query.args)
+    cursor.execute(query.sql, query.params)
+    return cursor.fetchone() if query.one else cursor.fetchall()
+
+def run_reader(reader: Reader[T], cursor: Any) -> T:
+    """Run every statement `reader` yields on `cursor` and return its result."""
+    try:
+        step = next(reader)
+        while True:
+            if isinstance(step, list):
+                result = [fetch(cursor, query) for query in step]
+            else:
+                result = fetch(cursor, step)
+            step = reader.send(result)
+    except StopIteration as done:
+        return done.value
+    except DriverError as e:
+        raise DatabaseError(str(e))
+
+def gather(*readers: Reader[Any]) -> Reader[List[Any]]:
+    """
+    Run independent readers side by side and return their results in order.
+
+    Their statements are yielded together, one step of each reader at a
+    time, so the async pool runs them concurrently.
+    """
+    results: List[Any] = [None] * len(readers)
+    steps: Dict[int, Union[Step, List[Step]]] = {}
+    for position, reader in enumerate(readers):
+        try:
+            steps[position] = next(reader)
+        except StopIteration as done:
+            results[position] = done.value
+
+    while steps:
+        batch: List[Step] = []
+        slices: Dict[int, Tuple[int, int]] = {}
+        for position, step in steps.items():
+            queries = step if isinstance(step, list) else [step]
+            slices[position] = (len(batch), len(queries))
+            batch.extend(queries)
+        rows = yield batch
+
+        advanced = {}
+        for position, (start, count) in slices.items():
+            sent = rows[start:start + count] if isinstance(steps[position], list) else rows[start]
+            try:
+                advanced[position] = readers[position].send(sent)
+            except StopIteration as done:
+                results[position] = done.value
+        steps = advanced
+    return results
@@ -0,0 +1,180 @@
+#------------------------------------------------------------
+# Diff-based replacement of a parent's child rows
+#------------------------------------------------------------
+from collections import defaultdict
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, List, NamedTuple, Sequence, Tuple
+
+
+class SyncResult(NamedTuple):
+    """Rows written by ChildSync.replace; `unchanged` rows were left alone."""
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+    @property
+    def touched(self) -> int:
+        return self.inserted + self.updated + self.deleted
+
+    def as_dict(self) -> Dict[str, int]:
+        return {**self._asdict(), 'touched': self.touched}
+
+
+def column_value(value: Any) -> Any:
+    """The value MySQL stores for `value` (validated enums are written as their value)."""
+    return value.value if isinstance(value, Enum) else value
+
+
+def comparable_value(value: Any) -> Any:
+    # MySQL hands BOOLEAN back as 0/1 and DECIMAL as Decimal; numbers compare (and hash) by value
+    value = column_value(value)
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, float):
+        return Decimal(str(value))
+    return value
+
+
+class ChildSync:
+    """
+    Replace the children of one parent with a new list by writing only the difference.
+
+    The current rows are read (and locked) first. New rows identical to a
+    current row are left alone. The remaining ones are paired with current
+    rows by `key` and updated in place, and whatever is still unpaired is
+    inserted or deleted. Rows are compared as a multiset, so duplicates are
+    kept as duplicates.
+
+        ChildSync('qualifications', parent=('program_id',),
+                  columns=('name', 'description', ...), key=('name',))
+
+    Whatever the number of rows, a replace runs at most four statements: the
+    SELECT, one DELETE, one INSERT … ON DUPLICATE KEY UPDATE of the updated
+    rows and one multi-row INSERT of the new ones.
+
+    Args:
+        table: The child table.
+        parent: Columns identifying the parent; their values are passed to `replace`.
+        columns: The columns written from the new rows.
+        key: Columns identifying "the same" child across versions. With no key,
+            a changed row is a delete plus an insert.
+        primary_key: The table's primary key, used to address existing rows.
+            Without one, every row holding the values of a deleted or updated
+            row is deleted and the copies that stay are inserted again, with
+            the updated and new rows.
+
+    Run it inside the caller's transaction; it does not commit.
+    """
+
+    def __init__(self, table: str, parent: Sequence[str], columns: Sequence[str], key: Sequence[str] = (), primary_key: Sequence[str] = ()):
+        self.table = table
+        self.parent = tuple(parent)
+        self.columns = tuple(columns)
+        self.key = tuple(key)
+        self.primary_key = tuple(primary_key)
+
+    def _parent_where(self) -> str:
+        return ' AND '.join(f'{column} = %s' for column in self.parent)
+
+    def _values(self, row: Dict[str, Any], columns: Sequence[str]) -> Tuple[Any, ...]:
+        return tuple(comparable_value(row.get(column)) for column in columns)
+
+    def _row_values(self, columns: Sequence[str], parent_values: Sequence[Any], row: Dict[str, Any]) -> List[Any]:
+        # `row` carries the child columns (and the primary key of a current row), the parent comes from `parent_values`
+        parent = dict(zip(self.parent, parent_values))
+        return [parent[column] if column in parent else column_value(row.get(column)) for column in columns]
+
+    def _insert(self, cursor: Any, parent_values: Sequence[Any], rows: Sequence[Dict[str, Any]], upsert: bool = False) -> None:
+        columns = tuple(dict.fromkeys((self.primary_key if upsert else ()) + self.parent + self.columns))
+        placeholders = f"({', '.join(['%s'] * len(columns))})"
+        statement = f"INSERT INTO {self.table} ({', '.join(columns)}) VALUES {', '.join([placeholders] * len(rows))}"
+        if upsert:
+            statement += f" AS new ON DUPLICATE KEY UPDATE {', '.join(f'{column} = new.{column}' for column in self.columns)}"
+        cursor.execute(statement, [value for row in rows for value in self._row_values(columns, parent_values, row)])
+
+    def _delete_by_primary_key(self, cursor: Any, parent_values: Sequence[Any], rows: Sequence[Dict[str, Any]]) -> None:
+        placeholders = ', '.join(['%s'] * len(self.primary_key))
+        if len(self.primary_key) > 1:
+            placeholders = f'({placeholders})'
+        cursor.execute(
+            f"DELETE FROM {self.table} WHERE ({', '.join(self.primary_key)}) IN ({', '.join([placeholders] * len(rows))})",
+            [value for row in rows for value in self._row_values(self.primary_key, parent_values, row)]
+        )
+
+    def _delete_by_values(self, cursor: Any, parent_values: Sequence[Any], rows: Sequence[Dict[str, Any]]) -> None:
+        # <=> so that NULL columns match; every copy of the values goes
+        row_match = f"({' AND '.join(f'{column} <=> %s' for column in self.columns)})"
+        cursor.execute(
+            f"DELETE FROM {self.table} WHERE {self._parent_where()} AND ({' OR '.join([row_match] * len(rows))})",
+            [*parent_values, *(column_value(row.get(column)) for row in rows for column in self.columns)]
+        )
+
+    def replace(self, cursor: Any, parent_values: Sequence[Any], rows: Sequence[Dict[str, Any]]) -> SyncResult:
+        parent_values = list(parent_values)
+        selected = ', '.join(dict.fromkeys(tuple(column for column in self.primary_key if column not in self.parent) + self.columns))
+        cursor.execute(
+            f'SELECT {selected} FROM {self.table} WHERE {self._parent_where()} FOR UPDATE',
+            parent_values
+        )
+        current = cursor.fetchall()
+
+        # Identical rows stay as they are
+        unmatched_current: Dict[tuple, List[Dict[str, Any]]] = defaultdict(list)
+        for row in current:
+            unmatched_current[self._values(row, self.columns)].append(row)
+        added, unchanged = [], 0
+        for row in rows:
+            same = unmatched_current.get(self._values(row, self.columns))
+            if same:
+                same.pop()
+                unchanged += 1
+            else:
+                added.append(row)
+        removed = [row for group in unmatched_current.values() for row in group]
+
+        # Rows with the same key become updates
+        updates = []
+        if self.key and added and removed:
+            removed_by_key: Dict[tuple, List[Dict[str, Any]]] = defaultdict(list)
+            for row in removed:
+                removed_by_key[self._values(row, self.key)].append(row)
+            remaining = []
+            for row in added:
+                candidates = removed_by_key.get(self._values(row, self.key))
+                if candidates:
+                    updates.append((candidates.pop(), row))
+                else:
+                    remaining.append(row)
+            added = remaining
+            removed = [row for group in removed_by_key.values() for row in group]
+
+        if self.primary_key:
+            if removed:
+                self._delete_by_primary_key(cursor, parent_values, removed)
+            if updates:
+                # The new values under the current row's primary key
+                self._insert(
+                    cursor, parent_values,
+                    [{**new, **{column: old[column] for column in self.primary_key if column in old}} for old, new in updates],
+                    upsert=True
+                )
+            inserted = added
+        else:
+            # Rows cannot be told apart, so the groups of values losing a row are rewritten
+            replaced = removed + [old for old, _ in updates]
+            inserted = added + [new for _, new in updates]
+            if replaced:
+                self._delete_by_values(cursor, parent_values, list({self._values(row, self.columns): row for row in replaced}.values()))
+                lost = {self._values(row, self.columns) for row in replaced}
+                replaced_rows = {id(row) for row in replaced}
+                inserted += [
+                    row for row in current
+                    if self._values(row, self.columns) in lost and id(row) not in replaced_rows
+                ]
+
+        if inserted:
+            self._insert(cursor, parent_values, inserted)
+
+        return SyncResult(inserted=len(added), updated=len(updates), deleted=len(removed), unchanged=unchanged)
@@ -0,0 +1,137 @@
+#------------------------------------------------------------
+# Single-row writes that return the row without reading it back
+#
+# MySQL has no INSERT ... RETURNING, so writers used to commit and then
+# SELECT the row they had just written. RowWriter fills in what the server
+# would have (the UUID key, constant defaults and the timestamp columns)
+# before the INSERT, writes every column explicitly, and returns those
+# values: what SELECT * would have returned, one round trip earlier.
+#
+# Timestamps of inserts come from the API host's clock, in UTC: the time
+# zone of every database session (SESSION_INIT_COMMAND), whatever the zone of
+# the host or the server. Updates take theirs from the database along with
+# the locking read.
+#------------------------------------------------------------
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, NamedTuple, Optional, Sequence
+
+from backend.database.sync import column_value, comparable_value
+
+_NOW = '_writer_now'
+
+def _at_precision(moment: datetime, fsp: int) -> datetime:
+    """`moment` as a TIMESTAMP(fsp) column stores it (truncated, so MySQL does not round it)."""
+    step = 10 ** (6 - fsp)
+    return moment.replace(microsecond=moment.microsecond // step * step)
+
+def stored_value(value: Any) -> Any:
+    """The value as MySQL hands it back: enums as their value, booleans as 0/1."""
+    value = column_value(value)
+    return int(value) if isinstance(value, bool) else value
+
+def bump_table_version(cursor: Any, table: str) -> None:
+    """
+    Count a write that adds or removes rows of `table` (see table_versions).
+
+    Run it in the write's transaction: the counter row stays locked until the
+    commit, so the versions read afterwards always see the change.
+    """
+    cursor.execute(
+        'INSERT INTO table_versions (table_name, version) VALUES (%s, 1) ON DUPLICATE KEY UPDATE version = version + 1',
+        (table,)
+    )
+
+class RowChange(NamedTuple):
+    """The row after an update, and the columns the update actually wrote."""
+    row: Dict[str, Any]
+    changed: Dict[str, Any]
+
+class RowWriter:
+    """
+    Insert and update rows of one table, returning them as SELECT * would.
+
+        RowWriter('categories', columns=('id', 'name'))
+        RowWriter('organizations', columns=(...), defaults={'is_verified': 0},
+                  created={'created_at': 0}, updated={'updated_at': 6})
+
+    Args:
+        table: The table.
+        columns: Every column of the table, in table order.
+        key: Primary key column.
+        generate_key: Generate a UUID for the key on insert (the tables default
+            to UUID(); generating it here is what lets the row be returned).
+        defaults: Server defaults other than NULL and the timestamps. A column
+            with a default that is not declared here is written as NULL.
+        created: Timestamp columns set on insert only, with their precision.
+        updated: Timestamp columns set on insert and on every update
+            (ON UPDATE CURRENT_TIMESTAMP), with their precision.
+
+    Both methods run on the caller's cursor and leave the commit to the caller.
+    """
+
+    def __init__(
+        self,
+        table: str,
+        columns: Sequence[str],
+        key: str = 'id',
+        generate_key: bool = True,
+        defaults: Optional[Dict[str, Any]] = None,
+        created: Optional[Dict[str, int]] = None,
+        updated: Optional[Dict[str, int]] = None
+    ):
+        self.table = table
+        self.columns = tuple(columns)
+        self.key = key
+        self.generate_key = generate_key
+        self.defaults = defaults or {}
+        self.created = created or {}
+        self.updated = updated or {}
+
+    def insert(self, cursor: Any, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a row from `values` (unknown keys are ignored) and return it."""
+        row = {column: None for column in self.columns}
+        row.update(self.defaults)
+        if self.generate_key:
+            row[self.key] = str(uuid.uuid4())
+        # Naive, as MySQL hands TIMESTAMP columns back
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        for column, fsp in {**self.created, **self.updated}.items():
+            row[column] = _at_precision(now, fsp)
+        row.update({column: stored_value(value) for column, value in values.items() if column in row})
+
+        cursor.execute(
+            f"INSERT INTO {self.table} ({', '.join(self.columns)}) VALUES ({', '.join(['%s'] * len(self.columns))})",
+            [row[column] for column in self.columns]
+        )
+        return row
+
+    def update(self, cursor: Any, key_value: Any, changes: Dict[str, Any]) -> Optional[RowChange]:
+        """
+        Lock the row, write the columns of `changes` that differ from it, and return it.
+
+        Nothing is written (and the updated timestamps stay as they are) when
+        no column changes. Returns None if the row does not exist.
+        """
+        cursor.execute(
+            f'SELECT *, CURRENT_TIMESTAMP(6) AS {_NOW} FROM {self.table} WHERE {self.key} = %s FOR UPDATE',
+            (key_value,)
+        )
+        row = cursor.fetchone()
+        if not row:
+            return None
+        now = row.pop(_NOW)
+
+        changed = {
+            column: stored_value(value)
+            for column, value in changes.items()
+            if column in row and comparable_value(row[column]) != comparable_value(value)
+        }
+        if changed:
+            written = {**changed, **{column: _at_precision(now, fsp) for column, fsp in self.updated.items()}}
+            cursor.execute(
+                f"UPDATE {self.table} SET {', '.join(f'{column} = %s' for column in written)} WHERE {self.key} = %s",
+                [*written.values(), key_value]
+            )
+            row.update(written)
+        return RowChange(row, changed)
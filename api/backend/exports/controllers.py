@@ -0,0 +1,51 @@
+from typing import Optional
+from flask import Blueprint, request, Response
+from backend.exports.transactions import APPLICATION_COLUMNS, FEEDBACK_COLUMNS, TREND_COLUMNS, export_applications, export_feedback, export_trends
+from backend.utilities.columnar import export_response, validate_export_format
+from backend.utilities.errors import handle_error
+from backend.utilities.uuid import validate_uuid
+from http import HTTPStatus
+
+exports = Blueprint('exports', __name__)
+
+# Whole datasets for the analytics pages as one file: ?format=arrow (Arrow IPC
+# stream, the default) or ?format=parquet (see backend/utilities/columnar.py)
+
+def validate_program_filter() -> Optional[str]:
+    """The optional `program_id` query parameter restricting an export to one program."""
+    program_id = request.args.get('program_id')
+    if program_id:
+        validate_uuid(program_id)
+    return program_id or None
+
+#------------------------------------------------------------
+# Export applications
+@exports.route('/applications', methods=['GET'])
+def export_applications_route() -> tuple[Response, int]:
+    try:
+        export_format = validate_export_format()
+        program_id = validate_program_filter()
+        return export_response(export_applications(program_id), APPLICATION_COLUMNS, export_format, 'applications'), HTTPStatus.OK
+    except Exception as e:
+        return handle_error(e)
+
+#------------------------------------------------------------
+# Export feedback forms
+@exports.route('/feedback', methods=['GET'])
+def export_feedback_route() -> tuple[Response, int]:
+    try:
+        export_format = validate_export_format()
+        program_id = validate_program_filter()
+        return export_response(export_feedback(program_id), FEEDBACK_COLUMNS, export_format, 'feedback'), HTTPStatus.OK
+    except Exception as e:
+        return handle_error(e)
+
+#------------------------------------------------------------
+# Export application trends
+@exports.route('/trends', methods=['GET'])
+def export_trends_route() -> tuple[Response, int]:
+    try:
+        export_format = validate_export_format()
+        return export_response(export_trends(), TREND_COLUMNS, export_format, 'trends'), HTTPStatus.OK
+    except Exception as e:
+        return handle_error(e)
@@ -0,0 +1,72 @@
+from typing import Any, Dict, Iterator, List, Optional
+from backend.database import db
+from backend.database.reads import Query
+from backend.programs.transactions import PROGRAM_TRENDS_SORT, program_trends_query
+from backend.utilities.columnar import Column
+from backend.utilities.pagination import Keyset
+from flask import current_app
+
+# Columns of each export, in file order, with their Arrow types (see backend/utilities/columnar.py)
+APPLICATION_COLUMNS: List[Column] = [
+    ('id', 'string'),
+    ('user_id', 'string'),
+    ('program_id', 'string'),
+    ('status', 'string'),
+    ('qualification_status', 'string'),
+    ('applied_at', 'timestamp'),
+    ('decision_date', 'timestamp'),
+    ('decision_notes', 'string'),
+    ('last_updated', 'timestamp')
+]
+
+FEEDBACK_COLUMNS: List[Column] = [
+    ('id', 'string'),
+    ('program_id', 'string'),
+    ('user_id', 'string'),
+    ('title', 'string'),
+    ('created_at', 'timestamp'),
+    ('updated_at', 'timestamp'),
+    ('effectiveness', 'int'),
+    ('experience', 'int'),
+    ('simplicity', 'int'),
+    ('recommendation', 'int'),
+    ('improvement', 'string')
+]
+
+TREND_COLUMNS: List[Column] = [
+    ('program_id', 'string'),
+    ('program_name', 'string'),
+    ('category_id', 'string'),
+    ('category_name', 'string'),
+    ('application_month', 'string'),
+    ('application_count', 'int'),
+    ('approved_count', 'int'),
+    ('rejected_count', 'int')
+]
+
+def _stream(query: Query) -> Iterator[List[Dict[str, Any]]]:
+    return db.stream(query, current_app.config['EXPORT_BATCH_SIZE'])
+
+def export_applications(program_id: Optional[str] = None) -> Iterator[List[Dict[str, Any]]]:
+    """Every application (of one program when `program_id` is given), newest first, in batches."""
+    where, params = ('WHERE a.program_id = %s', [program_id]) if program_id else ('', [])
+    return _stream(Query(f'''
+        SELECT {', '.join(f'a.{name}' for name, _ in APPLICATION_COLUMNS)}
+        FROM applications a
+        {where}
+        ORDER BY a.applied_at DESC, a.id DESC
+    ''', params))
+
+def export_feedback(program_id: Optional[str] = None) -> Iterator[List[Dict[str, Any]]]:
+    """Every feedback form (of one program when `program_id` is given), newest first, in batches."""
+    where, params = ('WHERE f.program_id = %s', [program_id]) if program_id else ('', [])
+    return _stream(Query(f'''
+        SELECT {', '.join(f'f.{name}' for name, _ in FEEDBACK_COLUMNS)}
+        FROM feedback_forms f
+        {where}
+        ORDER BY f.created_at DESC, f.id DESC
+    ''', params))
+
+def export_trends() -> Iterator[List[Dict[str, Any]]]:
+    """The rows of /programs/trends (the last 24 months of the trends cube), all of them, in batches."""
+    return _stream(program_trends_query(Keyset('program_trends', PROGRAM_TRENDS_SORT)))
@@ -0,0 +1,44 @@
+import sys
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from backend.database.batch import BatchReport
+from backend.feedbacks.ingest import FEEDBACK_FORMATS, read_feedback, validate_feedback
+from backend.feedbacks.transactions import insert_feedback_batch, rebuild_program_feedback_stats
+
+@click.command('rebuild-feedback-stats')
+@with_appcontext
+def rebuild_feedback_stats_command() -> None:
+    """Recompute program_feedback_stats from feedback_forms."""
+    programs = rebuild_program_feedback_stats()
+    click.echo(f"Rebuilt feedback stats for {programs} programs")
+
+@click.command('import-feedback')
+@click.argument('source', type=click.Path(exists=True, dir_okay=False, allow_dash=True))
+@click.option('--format', 'format_', type=click.Choice(FEEDBACK_FORMATS), help="Defaults to csv for .csv files and ndjson otherwise.")
+@click.option('--chunk-size', type=click.IntRange(min=1), help="Forms per transaction (defaults to FEEDBACK_BATCH_CHUNK_SIZE).")
+@click.option('--show-problems', is_flag=True, help="List every form that was not created.")
+@with_appcontext
+def import_feedback_command(source: str, format_: str, chunk_size: int, show_problems: bool) -> None:
+    """Import feedback forms from an NDJSON or CSV file ('-' reads standard input)."""
+    format_ = format_ or ('csv' if source.lower().endswith('.csv') else 'ndjson')
+    chunk_size = chunk_size or current_app.config.get('FEEDBACK_BATCH_CHUNK_SIZE', 500)
+    report = BatchReport()
+    stream = sys.stdin if source == '-' else open(source, encoding='utf-8', newline='')
+    try:
+        insert_feedback_batch(validate_feedback(read_feedback(stream, format_), report), chunk_size, report)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    summary = report.summary()
+    others = ', '.join(f"{count} {status}" for status, count in report.counts.items() if status != 'created')
+    click.echo(
+        f"Imported {summary.get('created', 0)} of {summary['received']} feedback forms "
+        f"in {summary['chunks']} chunks ({summary['elapsed_ms']} ms, {summary['rows_per_second']} rows/s)"
+        + (f"; {others}" if others else "")
+    )
+    if show_problems:
+        for result in report.as_dict()['results']:
+            if result['status'] != 'created':
+                click.echo(f"  #{result['index']} {result['status']}: {result.get('error') or result.get('errors')}")
@@ -1,20 +1,29 @@
-from flask import Blueprint, request, jsonify, Response
+import io
+from flask import Blueprint, current_app, request, jsonify, Response
+from backend.database.batch import BatchReport
+from backend.feedbacks.ingest import read_csv, read_ndjson, validate_feedback
 from backend.feedbacks.transactions import (
     get_feedback_by_id,
-    delete_feedback
+    get_feedback_version,
+    delete_feedback,
+    insert_feedback_batch
 )
-from backend.utilities.errors import handle_error
+from backend.utilities.conditional import conditional_get, resource_version
+from backend.utilities.errors import ValidationError, handle_error
 from backend.utilities.uuid import validate_uuid
 from http import HTTPStatus
 
 feedbacks = Blueprint('feedbacks', __name__)
 
+# `POST /feedbacks:batch` is not under the /feedbacks prefix, so it gets its own blueprint
+feedbacks_batch = Blueprint('feedbacks_batch', __name__)
+
 @feedbacks.route('/<string:feedback_id>', methods=['GET'])
 def get_feedback_route(feedback_id: str) -> tuple[Response, int]:
     try:
         validate_uuid(feedback_id)
-        result = get_feedback_by_id(feedback_id)
-        return jsonify(result), HTTPStatus.OK
+        version = resource_version(get_feedback_version(feedback_id))
+        return conditional_get(version, lambda: jsonify(get_feedback_by_id(feedback_id)))
     except Exception as e:
         return handle_error(e)
 
@@ -26,3 +35,39 @@ def delete_feedback_route(feedback_id: str) -> tuple[Response, int]:
         return jsonify({'message': 'Feedback deleted successfully'}), HTTPStatus.OK
     except Exception as e:
         return handle_error(e)
+
+#------------------------------------------------------------
+# Import many feedback forms at once
+# Body, by Content-Type:
+#   application/x-ndjson  one form per line, read as it streams in
+#   text/csv              a header row, then one form per row, read as it streams in
+#   application/json      {"feedbacks": [...]}
+# Every form read gets a result (created, conflict, invalid or failed) at its position.
+# Forms past FEEDBACK_BATCH_MAX_ITEMS are not read; the report is then marked `truncated`.
+@feedbacks_batch.route('/feedbacks:batch', methods=['POST'])
+def import_feedback_route() -> tuple[Response, int]:
+    try:
+        limit = current_app.config.get('FEEDBACK_BATCH_MAX_ITEMS', 50000)
+        if request.mimetype == 'application/x-ndjson':
+            records = read_ndjson(request.stream)
+        elif request.mimetype == 'text/csv':
+            records = read_csv(io.TextIOWrapper(request.stream, encoding='utf-8', newline=''))
+        else:
+            records = (request.get_json(silent=True) or {}).get('feedbacks')
+            if not isinstance(records, list) or not records:
+                raise ValidationError("Send {\"feedbacks\": [...]} as JSON, or the forms as application/x-ndjson or text/csv")
+            if len(records) > limit:
+                raise ValidationError(f"A batch holds at most {limit} feedback forms, got {len(records)}")
+
+        report = BatchReport()
+        items = validate_feedback(records, report, limit)
+        insert_feedback_batch(items, current_app.config.get('FEEDBACK_BATCH_CHUNK_SIZE', 500), report)
+        summary = report.summary()
+        current_app.logger.info(
+            f"Feedback import: {summary.get('created', 0)} of {summary['received']} created "
+            f"in {summary['elapsed_ms']} ms ({summary['rows_per_second']} rows/s)"
+        )
+        return jsonify(report.as_dict()), HTTPStatus.OK
+
+    except Exception as e:
+        return handle_error(e)
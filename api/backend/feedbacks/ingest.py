@@ -0,0 +1,68 @@
+#------------------------------------------------------------
+# Streaming readers for feedback imports
+#
+# Forms are read one record at a time (NDJSON: one JSON object per line;
+# CSV: a header row naming the fields), validated lazily and handed to
+# insert_feedback_batch, which consumes them chunk by chunk. Neither the
+# API nor the CLI holds the whole import in memory.
+#------------------------------------------------------------
+import csv
+import json
+from typing import Any, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+
+from marshmallow import ValidationError
+
+from backend.database.batch import BatchReport
+from backend.validators.feedbacks import FeedbackBatchItemSchema
+
+FEEDBACK_FORMATS = ('ndjson', 'csv')
+
+class UnreadableRecord(NamedTuple):
+    """A record that could not be parsed; it is reported as invalid."""
+    error: str
+
+def read_ndjson(lines: Iterable[Union[str, bytes]]) -> Iterator[Any]:
+    """One record per non-blank line."""
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield UnreadableRecord(f"Line {number}: {e}")
+
+def read_csv(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """One record per row; the header row names the fields. Empty cells are left out."""
+    reader = csv.DictReader(lines)
+    for row in reader:
+        if None in row:
+            yield UnreadableRecord(f"Line {reader.line_num}: more cells than the header")
+            continue
+        yield {field: value for field, value in row.items() if value not in ('', None)}
+
+def read_feedback(lines: Iterable[Any], format: str) -> Iterator[Any]:
+    if format not in FEEDBACK_FORMATS:
+        raise ValueError(f"Feedback format must be one of: {', '.join(FEEDBACK_FORMATS)}")
+    return read_csv(lines) if format == 'csv' else read_ndjson(lines)
+
+def validate_feedback(records: Iterable[Any], report: BatchReport, limit: Optional[int] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Yield (position, data) for the records that pass FeedbackBatchItemSchema.
+
+    The others are recorded in `report` as 'invalid'. Reading stops at
+    `limit`: if more records follow, the report is marked truncated once
+    and the rest of the input is left unread.
+    """
+    schema = FeedbackBatchItemSchema()
+    for index, record in enumerate(records):
+        if limit is not None and index >= limit:
+            report.truncate(limit, f"Only the first {limit} forms of a batch are read")
+            return
+        if isinstance(record, UnreadableRecord):
+            report.record(index, 'invalid', errors={'_record': [record.error]})
+        else:
+            try:
+                yield index, schema.load(record)
+            except ValidationError as ve:
+                report.record(index, 'invalid', errors=ve.messages)
@@ -0,0 +1,124 @@
+#------------------------------------------------------------
+# Maintenance of the program_feedback_stats rollup
+#
+# Every helper here runs on the caller's cursor and leaves the commit to the
+# caller, so the rollup changes in the same transaction as feedback_forms.
+#------------------------------------------------------------
+from typing import Any, Dict, Optional, Tuple
+
+RATING_COLUMNS = ('effectiveness', 'experience', 'simplicity', 'recommendation')
+
+def record_feedback(cursor: Any, program_id: str, data: Dict[str, Any]) -> None:
+    """Add one feedback form's ratings to its program's running sums."""
+    record_feedback_totals(cursor, program_id, 1, {column: data[column] for column in RATING_COLUMNS})
+
+def record_feedback_totals(cursor: Any, program_id: str, count: int, sums: Dict[str, int]) -> None:
+    """Add `count` forms whose ratings total `sums` to a program's running sums."""
+    record_feedback_batch(cursor, {program_id: (count, sums)})
+
+def record_feedback_batch(cursor: Any, totals: Dict[str, Tuple[int, Dict[str, int]]]) -> None:
+    """Add (count, sums) to the running sums of several programs in one statement."""
+    if not totals:
+        return
+    cursor.execute(f'''
+        INSERT INTO program_feedback_stats (
+            program_id,
+            total_feedback,
+            sum_effectiveness,
+            sum_experience,
+            sum_simplicity,
+            sum_recommendation
+        ) VALUES {', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(totals))} AS new
+        ON DUPLICATE KEY UPDATE
+            total_feedback = program_feedback_stats.total_feedback + new.total_feedback,
+            sum_effectiveness = program_feedback_stats.sum_effectiveness + new.sum_effectiveness,
+            sum_experience = program_feedback_stats.sum_experience + new.sum_experience,
+            sum_simplicity = program_feedback_stats.sum_simplicity + new.sum_simplicity,
+            sum_recommendation = program_feedback_stats.sum_recommendation + new.sum_recommendation
+    ''', [
+        value
+        for program_id, (count, sums) in totals.items()
+        for value in (program_id, count, *(sums[column] for column in RATING_COLUMNS))
+    ])
+
+def retract_feedback(cursor: Any, feedback_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Subtract a feedback form from its program's running sums before it is deleted.
+
+    Returns:
+        Optional[Dict[str, Any]]: The locked feedback row, or None if it does not exist.
+    """
+    cursor.execute('''
+        SELECT program_id, user_id, effectiveness, experience, simplicity, recommendation
+        FROM feedback_forms
+        WHERE id = %s
+        FOR UPDATE
+    ''', (feedback_id,))
+    feedback = cursor.fetchone()
+    if not feedback:
+        return None
+
+    cursor.execute('''
+        UPDATE program_feedback_stats
+        SET
+            total_feedback = total_feedback - 1,
+            sum_effectiveness = sum_effectiveness - %s,
+            sum_experience = sum_experience - %s,
+            sum_simplicity = sum_simplicity - %s,
+            sum_recommendation = sum_recommendation - %s
+        WHERE program_id = %s
+    ''', (*(feedback[column] for column in RATING_COLUMNS), feedback['program_id']))
+    return feedback
+
+def retract_user_feedback(cursor: Any, user_id: str) -> None:
+    """Subtract all of a user's feedback before the user (and, by cascade, their feedback) is deleted."""
+    cursor.execute('''
+        UPDATE program_feedback_stats s
+        INNER JOIN (
+            SELECT
+                program_id,
+                COUNT(*) AS total_feedback,
+                SUM(effectiveness) AS sum_effectiveness,
+                SUM(experience) AS sum_experience,
+                SUM(simplicity) AS sum_simplicity,
+                SUM(recommendation) AS sum_recommendation
+            FROM feedback_forms
+            WHERE user_id = %s
+            GROUP BY program_id
+        ) f ON s.program_id = f.program_id
+        SET
+            s.total_feedback = s.total_feedback - f.total_feedback,
+            s.sum_effectiveness = s.sum_effectiveness - f.sum_effectiveness,
+            s.sum_experience = s.sum_experience - f.sum_experience,
+            s.sum_simplicity = s.sum_simplicity - f.sum_simplicity,
+            s.sum_recommendation = s.sum_recommendation - f.sum_recommendation
+    ''', (user_id,))
+
+def rebuild_feedback_stats(cursor: Any) -> int:
+    """
+    Recompute the whole rollup from feedback_forms.
+
+    Returns:
+        int: The number of programs with feedback.
+    """
+    cursor.execute('DELETE FROM program_feedback_stats')
+    cursor.execute('''
+        INSERT INTO program_feedback_stats (
+            program_id,
+            total_feedback,
+            sum_effectiveness,
+            sum_experience,
+            sum_simplicity,
+            sum_recommendation
+        )
+        SELECT
+            program_id,
+            COUNT(*),
+            SUM(effectiveness),
+            SUM(experience),
+            SUM(simplicity),
+            SUM(recommendation)
+        FROM feedback_forms
+        GROUP BY program_id
+    ''')
+    return cursor.rowcount
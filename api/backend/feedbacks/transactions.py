@@ -1,12 +1,26 @@
+import uuid
 from backend.database import db
+from backend.database.batch import BatchReport, chunked, existing_ids, existing_pairs
+from backend.database.instrumentation import repeated_queries_allowed
+from backend.database.writes import RowWriter
+from backend.feedbacks.stats import RATING_COLUMNS, rebuild_feedback_stats, record_feedback_batch, retract_feedback
+from backend.users.retention import adjust_user_retention, adjust_users_retention
 from backend.utilities.errors import DatabaseError, NotFoundError
 from mysql.connector import Error as MySQLError
-from typing import Dict, Any
+from pymysql import MySQLError as DriverError
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+FEEDBACK_FORMS = RowWriter(
+    'feedback_forms',
+    columns=('id', 'program_id', 'user_id', 'title', 'created_at', 'updated_at', *RATING_COLUMNS, 'improvement'),
+    created={'created_at': 0},
+    updated={'updated_at': 6}
+)
 
 def get_feedback_by_id(feedback_id: str) -> Dict[str, Any]:
     cursor = db.get_db().cursor()
     try:
-        cursor.execute('SELECT * FROM feedbacks WHERE id = %s', (feedback_id,))
+        cursor.execute('SELECT * FROM feedback_forms WHERE id = %s', (feedback_id,))
         result = cursor.fetchone()
         if not result:
             raise NotFoundError(f"Feedback with ID {feedback_id} not found")
@@ -16,14 +30,169 @@ def get_feedback_by_id(feedback_id: str) -> Dict[str, Any]:
     finally:
         cursor.close()
 
+def get_feedback_version(feedback_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch the version probe of a feedback form: its updated_at.
+
+    Args:
+        feedback_id (str): The unique identifier of the feedback form.
+
+    Returns:
+        Optional[Dict[str, Any]]: The probe row, or None if the feedback form does not exist.
+    """
+    cursor = db.get_db().cursor()
+    try:
+        cursor.execute('SELECT UNIX_TIMESTAMP(updated_at) AS updated_at FROM feedback_forms WHERE id = %s', (feedback_id,))
+        return cursor.fetchone()
+    except MySQLError as e:
+        raise DatabaseError(str(e))
+    finally:
+        cursor.close()
+
 def delete_feedback(feedback_id: str) -> None:
     cursor = db.get_db().cursor()
     try:
+        cursor.execute("START TRANSACTION")
+        feedback = retract_feedback(cursor, feedback_id)
+        if not feedback:
+            db.get_db().rollback()
+            raise NotFoundError(f"No feedback with ID {feedback_id} to delete")
+        adjust_user_retention(cursor, feedback['user_id'], feedback=feedback, feedback_sign=-1)
         cursor.execute('DELETE FROM feedback_forms WHERE id = %s', (feedback_id,))
         db.get_db().commit()
-        if cursor.rowcount == 0:
-            raise NotFoundError(f"No feedback with ID {feedback_id} to delete")
     except MySQLError as e:
+        db.get_db().rollback()
         raise DatabaseError(str(e))
     finally:
         cursor.close()
+
+def rebuild_program_feedback_stats() -> int:
+    """
+    Recompute the program_feedback_stats rollup from scratch in one transaction.
+
+    Returns:
+        int: The number of programs that have feedback.
+    """
+    cursor = db.get_db().cursor()
+    try:
+        cursor.execute("START TRANSACTION")
+        programs = rebuild_feedback_stats(cursor)
+        db.get_db().commit()
+        return programs
+    except MySQLError as e:
+        db.get_db().rollback()
+        raise DatabaseError(str(e))
+    finally:
+        cursor.close()
+
+#------------------------------------------------------------
+# Batch import
+#
+# Forms are written in chunks, one transaction each. A chunk looks up its
+# users, programs and already-submitted (user, program) pairs with one query
+# each, inserts the new forms with a single multi-row INSERT, and then adds
+# them to program_feedback_stats and the retention rollups with one
+# statement (or a fixed few) for the whole chunk.
+#------------------------------------------------------------
+FEEDBACK_BATCH_COLUMNS = ('id', 'program_id', 'user_id', 'title', *RATING_COLUMNS, 'improvement')
+
+def _totals(forms: List[Dict[str, Any]], key: str) -> Dict[str, Dict[str, int]]:
+    totals: Dict[str, Dict[str, int]] = {}
+    for form in forms:
+        total = totals.setdefault(form[key], {'count': 0, **{column: 0 for column in RATING_COLUMNS}})
+        total['count'] += 1
+        for column in RATING_COLUMNS:
+            total[column] += form[column]
+    return totals
+
+def _insert_feedback_chunk(
+    cursor: Any,
+    chunk: List[Tuple[int, Dict[str, Any]]],
+    seen: Set[Tuple[str, str]],
+    report: BatchReport
+) -> Set[Tuple[str, str]]:
+    """Write one chunk; returns the (user, program) pairs written."""
+    users = existing_ids(cursor, 'users', {data['user_id'] for _, data in chunk})
+    programs = existing_ids(cursor, 'programs', {data['program_id'] for _, data in chunk})
+    existing = existing_pairs(cursor, 'feedback_forms', ('user_id', 'program_id'), {(data['user_id'], data['program_id']) for _, data in chunk})
+
+    rows, pending = [], set()
+    for index, data in chunk:
+        pair = (data['user_id'], data['program_id'])
+        if data['user_id'] not in users:
+            report.record(index, 'invalid', errors={'user_id': [f"User {data['user_id']} not found"]})
+        elif data['program_id'] not in programs:
+            report.record(index, 'invalid', errors={'program_id': [f"Program {data['program_id']} not found"]})
+        elif pair in existing or pair in seen or pair in pending:
+            report.record(index, 'conflict', error='The user already submitted feedback for this program')
+        else:
+            pending.add(pair)
+            rows.append((index, str(uuid.uuid4()), data))
+    if not rows:
+        return set()
+
+    # Forms that lose a race on unq_user_feedback_program are skipped rather
+    # than failing the statement, and reported as conflicts below
+    cursor.executemany(
+        f"INSERT INTO feedback_forms ({', '.join(FEEDBACK_BATCH_COLUMNS)}) "
+        f"VALUES ({', '.join(['%s'] * len(FEEDBACK_BATCH_COLUMNS))}) "
+        f"ON DUPLICATE KEY UPDATE id = id",
+        [
+            (feedback_id, *(data[column] for column in FEEDBACK_BATCH_COLUMNS[1:]))
+            for _, feedback_id, data in rows
+        ]
+    )
+    inserted = existing_ids(cursor, 'feedback_forms', {feedback_id for _, feedback_id, _ in rows})
+
+    created = []
+    for index, feedback_id, data in rows:
+        if feedback_id in inserted:
+            created.append(data)
+            report.record(index, 'created', id=feedback_id)
+        else:
+            report.record(index, 'conflict', error='The user already submitted feedback for this program')
+
+    record_feedback_batch(cursor, {
+        program_id: (total['count'], total)
+        for program_id, total in _totals(created, 'program_id').items()
+    })
+    adjust_users_retention(cursor, {
+        user_id: {'feedback_count': total['count'], **{f'sum_{column}': total[column] for column in RATING_COLUMNS}}
+        for user_id, total in _totals(created, 'user_id').items()
+    })
+    return {(data['user_id'], data['program_id']) for data in created}
+
+def insert_feedback_batch(items: Iterable[Tuple[int, Dict[str, Any]]], chunk_size: int, report: BatchReport) -> BatchReport:
+    """
+    Insert validated feedback forms in chunks of `chunk_size`, one transaction per chunk.
+
+    Args:
+        items: (position in the input, FeedbackBatchItemSchema data) pairs,
+            consumed lazily so a streamed import stays streamed.
+        report: Receives one result per item: 'created', 'conflict' (the user
+            already has a form for the program), 'invalid' or 'failed'. A
+            chunk that fails on the database is rolled back and the forms it
+            would have created are reported as failed; the other chunks are kept.
+    """
+    conn = db.get_db()
+    cursor = conn.cursor()
+    seen: Set[Tuple[str, str]] = set()
+    try:
+        # Every chunk runs the same statements; that is not an N+1
+        with repeated_queries_allowed():
+            for chunk in chunked(items, chunk_size):
+                report.chunks += 1
+                try:
+                    cursor.execute("START TRANSACTION")
+                    written = _insert_feedback_chunk(cursor, chunk, seen, report)
+                    conn.commit()
+                    seen |= written
+                except (MySQLError, DriverError) as e:
+                    conn.rollback()
+                    for index, _ in chunk:
+                        result = report.results.get(index)
+                        if result is None or result['status'] == 'created':
+                            report.record(index, 'failed', error=str(e))
+    finally:
+        cursor.close()
+    return report.finish()
@@ -0,0 +1,70 @@
+#------------------------------------------------------------
+# Async versions of the organization read routes (served by asgi.py)
+#------------------------------------------------------------
+from backend.database.aio import aio_db
+from backend.organizations.transactions import (
+    organization_programs_reader,
+    organization_programs_version_reader,
+    organization_reader,
+    organization_version_reader,
+    organizations_version_reader,
+    search_org_reader
+)
+from backend.programs.search import validate_search_mode
+from backend.utilities.asgi import AsyncViews
+from backend.utilities.conditional import conditional_get_async, resource_version
+from backend.utilities.errors import handle_error
+from backend.utilities.pagination import jsonify_page, validate_cursor, validate_pagination
+from backend.utilities.uuid import validate_uuid
+from backend.validators.search import validate_search_params
+from flask import request, jsonify, Response
+
+async_organizations = AsyncViews()
+
+@async_organizations.route('api_v1.organizations.get_programs')
+async def get_programs(id: str) -> tuple[Response, int]:
+    try:
+        validate_uuid(id)
+        page, limit = validate_pagination()
+        search_query = request.args.get('search_query')
+        search_mode = validate_search_mode(request.args.get('search_mode'))
+        page_cursor = validate_cursor()
+
+        async def build() -> Response:
+            return jsonify_page(await aio_db.read(
+                organization_programs_reader(id, page, limit, search_query, page_cursor, search_mode)
+            ))
+
+        return await conditional_get_async(resource_version(await aio_db.read(organization_programs_version_reader(id))), build)
+
+    except Exception as e:
+        return handle_error(e)
+
+@async_organizations.route('api_v1.organizations.get_organization')
+async def get_organization(organization_id: str) -> tuple[Response, int]:
+    try:
+        validate_uuid(organization_id)
+        version = resource_version(await aio_db.read(organization_version_reader(organization_id)))
+
+        async def build() -> Response:
+            return jsonify(await aio_db.read(organization_reader(organization_id)))
+
+        return await conditional_get_async(version, build)
+
+    except Exception as e:
+        return handle_error(e)
+
+#------------------------------------------------------------
+# Search for organizations (categories and locations of the page are read concurrently)
+@async_organizations.route('api_v1.organizations.search_organization')
+async def search_organization() -> tuple[Response, int]:
+    try:
+        params = validate_search_params()
+
+        async def build() -> Response:
+            return jsonify_page(await aio_db.read(search_org_reader(params)))
+
+        return await conditional_get_async(resource_version(await aio_db.read(organizations_version_reader())), build)
+
+    except Exception as e:
+        return handle_error(e)
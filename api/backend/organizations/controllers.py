@@ -1,12 +1,18 @@
 from http import HTTPStatus
-from backend.utilities.pagination import validate_pagination
+from backend.contact.transactions import get_point_of_contact_version
+from backend.utilities.conditional import conditional_get, resource_version
+from backend.utilities.pagination import jsonify_page, validate_cursor, validate_pagination
 from backend.validators.organizations import OrganizationSchema, OrganizationContactSchema
 from backend.validators.search import validate_search_params
+from backend.programs.search import validate_search_mode
 from backend.organizations.transactions import (
     create_organization,
     get_programs_by_organization_id, 
+    get_organization_programs_version,
     insert_program, 
     get_organization_by_id, 
+    get_organization_version,
+    get_organizations_version,
     delete_organization_by_id, 
     update_organization_by_id,
     create_org_contact,
@@ -18,7 +24,7 @@ from backend.organizations.transactions import (
 from backend.utilities.errors import handle_error
 from backend.utilities.uuid import validate_uuid
 from flask import Blueprint, request, jsonify, Response
-from backend.validators.programs import ProgramCreateSchema
+from backend.validators.programs import ProgramCreateSchema, load_program_document
 
 organizations = Blueprint('organizations', __name__)
 
@@ -28,11 +34,10 @@ organizations = Blueprint('organizations', __name__)
 def create_program(id: str) -> tuple[Response, int]:
     try:
         validate_uuid(id)
-        program_schema = ProgramCreateSchema()
-        data = program_schema.load(request.json)
+        data = load_program_document(request.json, ProgramCreateSchema())
 
-        insert_program(id, data)
-        return jsonify({ "message": "Program created successfully" }), HTTPStatus.CREATED
+        program = insert_program(id, data)
+        return jsonify({ "message": "Program created successfully", "program": program }), HTTPStatus.CREATED
     
     except Exception as e:
         return handle_error(e)
@@ -45,8 +50,12 @@ def get_programs(id: str) -> tuple[Response, int]:
         validate_uuid(id)
         page, limit = validate_pagination()
         search_query = request.args.get('search_query')
-        programs = get_programs_by_organization_id(id, page, limit, search_query)
-        return jsonify(programs), HTTPStatus.OK
+        search_mode = validate_search_mode(request.args.get('search_mode'))
+        page_cursor = validate_cursor()
+        return conditional_get(
+            resource_version(get_organization_programs_version(id)),
+            lambda: jsonify_page(get_programs_by_organization_id(id, page, limit, search_query, page_cursor, search_mode))
+        )
 
     except Exception as e:
         return handle_error(e)
@@ -70,8 +79,8 @@ def create_organizations()  -> tuple[Response, int]:
 def get_organization(organization_id: str) -> tuple[Response, int]:
     try:
         validate_uuid(organization_id)
-        organization = get_organization_by_id(organization_id)
-        return jsonify(organization), HTTPStatus.OK
+        version = resource_version(get_organization_version(organization_id))
+        return conditional_get(version, lambda: jsonify(get_organization_by_id(organization_id)))
 
     except Exception as e:
         return handle_error(e)
@@ -138,8 +147,8 @@ def get_org_contacts(organization_id: str, contact_id: str) -> tuple[Response, i
     try:
         validate_uuid(organization_id)
         validate_uuid(contact_id)
-        result = get_organization_contact(contact_id)
-        return jsonify(result), HTTPStatus.OK
+        version = resource_version(get_point_of_contact_version(contact_id))
+        return conditional_get(version, lambda: jsonify(get_organization_contact(contact_id)))
 
     except Exception as e:
         return handle_error(e)
@@ -163,8 +172,7 @@ def delete_org_contacts(organization_id: str, contact_id: str) -> tuple[Response
 def search_organization() -> tuple[Response, int]:
     try:
         params = validate_search_params()
-        results = search_org(params)
-        return jsonify(results), HTTPStatus.OK
+        return conditional_get(resource_version(get_organizations_version()), lambda: jsonify_page(search_org(params)))
 
     except Exception as e:
         return handle_error(e)
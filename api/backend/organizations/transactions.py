@@ -1,62 +1,89 @@
 from typing import Dict, Any, List, Optional
-from backend.programs.transactions import retrieve_program
+from backend.contact.transactions import POINT_OF_CONTACTS
+from backend.programs.cache import program_cache
+from backend.programs.search import program_text_filter
+from backend.programs.search_index import program_index
+from backend.programs.transactions import create_program, retrieve_program
 from backend.database import db
+from backend.database.loaders import BatchLoader
+from backend.database.reads import Query, Reader, gather
+from backend.database.writes import RowWriter, bump_table_version
 from backend.utilities.errors import ConflictError, DatabaseError, NotFoundError, ValidationError
+from backend.utilities.pagination import Keyset, SortKey
 from mysql.connector import Error as MySQLError
 
-def get_programs_by_organization_id(organization_id: str, page: int, limit: int, search_query: Optional[str] = None) -> List[Dict[str, Any]]:
-    cursor = db.get_db().cursor()
-    try:
-        # Base query
-        query = 'SELECT * FROM programs WHERE organization_id = %s'
-        params = [organization_id]
-        
-        # Add search query if provided
-        if search_query and search_query.strip():
-            query += ' AND (name LIKE %s OR description LIKE %s)'
-            search_pattern = f'%{search_query.strip()}%'
-            params.extend([search_pattern, search_pattern])
-        
-        # Add pagination
-        query += ' ORDER BY name ASC LIMIT %s OFFSET %s'
-        offset = (page - 1) * limit
-        params.extend([limit, offset])
-        
-        cursor.execute(query, params)
-        return cursor.fetchall()
-    except MySQLError as e:
-        raise DatabaseError(str(e))
+ORGANIZATION_CATEGORIES = BatchLoader("""
+    SELECT oc.organization_id, c.id, c.name
+    FROM categories c
+    JOIN organization_categories oc ON c.id = oc.category_id
+    WHERE oc.organization_id IN ({keys})
+    ORDER BY c.name
+""", key='organization_id')
 
-def insert_program(organization_id: str, data: Dict[str, Any]) -> None:
-    cursor = db.get_db().cursor()
-    try:
-        cursor.execute(
-            'INSERT INTO programs (name, description, status, start_date, deadline, end_date, organization_id) VALUES (%s, %s, %s, %s, %s, %s, %s)',
-            (data['name'], data['description'], data['status'], data['start_date'], data['deadline'], data.get('end_date'), organization_id)
-        )
-        db.get_db().commit()
-        return None
+ORGANIZATION_LOCATIONS = BatchLoader("""
+    SELECT entity_id, id, location_type, type, address_line1, address_line2,
+           city, state, zip_code, country, is_primary
+    FROM locations
+    WHERE location_type = 'organization' AND entity_id IN ({keys})
+""", key='entity_id')
+
+ORGANIZATIONS = RowWriter(
+    'organizations',
+    columns=('id', 'name', 'description', 'website_url', 'is_verified', 'verified_at', 'created_at', 'updated_at'),
+    defaults={'is_verified': 0},
+    created={'created_at': 0},
+    updated={'updated_at': 6}
+)
+
+def get_programs_by_organization_id(organization_id: str, page: int, limit: int, search_query: Optional[str] = None, page_cursor: Optional[str] = None, search_mode: Optional[str] = None) -> List[Dict[str, Any]]:
+    return db.read(organization_programs_reader(organization_id, page, limit, search_query, page_cursor, search_mode))
+
+def organization_programs_reader(organization_id: str, page: int, limit: int, search_query: Optional[str] = None, page_cursor: Optional[str] = None, search_mode: Optional[str] = None) -> Reader[List[Dict[str, Any]]]:
+    # Base query
+    query = 'SELECT * FROM programs WHERE organization_id = %s'
+    params = [organization_id]
     
-    except MySQLError as e:
-        db.get_db().rollback()
-        raise DatabaseError(f"Database error: {str(e)} (Error code: {e.errno}, SQL State: {e.sqlstate})")
-    except Exception as e:
-        db.get_db().rollback()
-        print(f"Unexpected error: {str(e)}")
-        raise DatabaseError(f"Unexpected error: {str(e)}")
-    finally:
-        cursor.close()
+    # Add search query if provided
+    if search_query and search_query.strip():
+        text_filter, text_params = program_text_filter(search_query.strip(), search_mode)
+        query += f' AND {text_filter}'
+        params.extend(text_params)
+    
+    # Add pagination
+    keyset = Keyset('organization_programs', [SortKey('name', 'name'), SortKey('id', 'id')], page_cursor)
+    where, where_params = keyset.where()
+    order_by, _ = keyset.order_by()
+    limit_clause, limit_params = keyset.limit(page, limit)
+    query += f' AND {where}{order_by}{limit_clause}'
+    params.extend(where_params + limit_params)
+    
+    rows = yield Query(query, params)
+    return keyset.page(rows, limit)
+
+def get_organization_programs_version(organization_id: str) -> Dict[str, Any]:
+    """Version probe of get_programs_by_organization_id: the organization's program count and latest update."""
+    return db.read(organization_programs_version_reader(organization_id))
+
+def organization_programs_version_reader(organization_id: str) -> Reader[Dict[str, Any]]:
+    return (yield Query(
+        'SELECT COUNT(*) AS programs, UNIX_TIMESTAMP(MAX(updated_at)) AS updated_at FROM programs WHERE organization_id = %s',
+        (organization_id,),
+        one=True
+    ))
+
+def insert_program(organization_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Create a program of this organization, with any nested sections, in one transaction."""
+    return create_program({**data, 'organization_id': organization_id})
 
 def create_organization(data: Dict[str, str]) -> Dict[str, Any]:
     cursor = db.get_db().cursor()
     try: 
-        cursor.execute('INSERT INTO organizations (name, description, website_url) VALUES (%s, %s, %s)', 
-                       (data['name'], data['description'], data['website_url']))
+        result = ORGANIZATIONS.insert(cursor, {
+            'name': data['name'],
+            'description': data['description'],
+            'website_url': data['website_url']
+        })
         db.get_db().commit()
-        cursor.execute('SELECT * FROM organizations WHERE name = %s', (data['name'],))
-        result = cursor.fetchone()
-        if not result:
-            raise DatabaseError("Failed to create organization")
         return result
     except MySQLError as e:
         if e.args[0] == 1062:
@@ -68,40 +95,40 @@ def create_organization(data: Dict[str, str]) -> Dict[str, Any]:
 
 
 def get_organization_by_id(organization_id: str):
-    cursor = db.get_db().cursor()
-    try:
-        cursor.execute('SELECT * FROM organizations WHERE id = %s', (organization_id,))
-        result = cursor.fetchone()
-        if not result:
-            raise NotFoundError(f"Organization with id {organization_id} does not exist")
-        return result
-    except MySQLError as e:
-        raise DatabaseError(str(e))
-    finally:
-        cursor.close()
+    return db.read(organization_reader(organization_id))
+
+def organization_reader(organization_id: str) -> Reader[Dict[str, Any]]:
+    result = yield Query('SELECT * FROM organizations WHERE id = %s', (organization_id,), one=True)
+    if not result:
+        raise NotFoundError(f"Organization with id {organization_id} does not exist")
+    return result
+
+def get_organization_version(organization_id: str) -> Optional[Dict[str, Any]]:
+    """Version probe of get_organization_by_id: the organization's updated_at, or None if it does not exist."""
+    return db.read(organization_version_reader(organization_id))
+
+def organization_version_reader(organization_id: str) -> Reader[Optional[Dict[str, Any]]]:
+    return (yield Query(
+        'SELECT UNIX_TIMESTAMP(updated_at) AS updated_at FROM organizations WHERE id = %s', (organization_id,), one=True
+    ))
 
 def update_organization_by_id(organization_id: str, update_data: Dict[str, Any]) -> Dict[str, Any]:
     cursor = db.get_db().cursor()
     try: 
-        update_fields = []
-        values = []
-        for key in ['name', 'description', 'website_url', 'is_verified']:
-            if key in update_data:
-                update_fields.append(f"{key} = %s")
-                values.append(update_data[key])
-        if not update_fields:
+        changes = {key: update_data[key] for key in ['name', 'description', 'website_url', 'is_verified'] if key in update_data}
+        if not changes:
             raise DatabaseError("No valid fields to update")
-        values.append(organization_id)
-        query = f"UPDATE organizations SET {', '.join(update_fields)} WHERE id = %s"
-        cursor.execute(query, values)
-        db.get_db().commit()
-
-         # Fetch the updated organization
-        cursor.execute('SELECT * FROM organizations WHERE id = %s', (organization_id,))
-        result = cursor.fetchone()
-        if not result:
+        update = ORGANIZATIONS.update(cursor, organization_id, changes)
+        if not update:
+            db.get_db().rollback()
             raise NotFoundError(f"Organization with id {organization_id} does not exist")
-        return result
+        db.get_db().commit()
+        if 'name' in update.changed:
+            # Program documents embed the organization name
+            cursor.execute('SELECT id FROM programs WHERE organization_id = %s', (organization_id,))
+            program_cache.invalidate(row['id'] for row in cursor.fetchall())
+            program_index.refresh_organization(organization_id)
+        return update.row
     except MySQLError as e:
         if e.args[0] == 1062:
             raise ConflictError(f"Organization with name {update_data['name']} already exists")
@@ -114,8 +141,15 @@ def update_organization_by_id(organization_id: str, update_data: Dict[str, Any])
 def delete_organization_by_id(organization_id: str):
     cursor = db.get_db().cursor()
     try:
+        # The organization's programs go with it by cascade
+        cursor.execute('SELECT id FROM programs WHERE organization_id = %s', (organization_id,))
+        program_ids = [row['id'] for row in cursor.fetchall()]
         cursor.execute('DELETE FROM organizations WHERE id = %s', (organization_id))
+        if program_ids:
+            bump_table_version(cursor, 'programs')
         db.get_db().commit()
+        program_cache.invalidate(program_ids)
+        program_index.refresh_organization(organization_id)
     except MySQLError as e:
         raise DatabaseError(str(e))
     finally:
@@ -124,13 +158,14 @@ def delete_organization_by_id(organization_id: str):
 def create_org_contact(organization_id: str, data: Dict[str, str]) -> Dict[str, Any]:
     cursor = db.get_db().cursor()
     try: 
-        cursor.execute('INSERT INTO point_of_contacts (contact_type, entity_id, description, email, phone_number) VALUES (%s, %s, %s, %s, %s)', 
-                       ('organization', organization_id, data['description'], data['email'], data['phone_number']))
+        result = POINT_OF_CONTACTS.insert(cursor, {
+            'contact_type': 'organization',
+            'entity_id': organization_id,
+            'description': data['description'],
+            'email': data['email'],
+            'phone_number': data['phone_number']
+        })
         db.get_db().commit()
-        cursor.execute('SELECT * FROM point_of_contacts WHERE id = %s', (cursor.lastrowid,))
-        result = cursor.fetchone()
-        if not result:
-            raise DatabaseError("Failed to create organization contact")
         return result
     except MySQLError as e:
         if e.args[2] == 1062:
@@ -147,25 +182,15 @@ def create_org_contact(organization_id: str, data: Dict[str, str]) -> Dict[str,
 def update_org_contact(contact_id: str, data: Dict[str, str]) -> Dict[str, Any]:
     cursor = db.get_db().cursor()
     try: 
-        update_fields = []
-        values = []
-        for key in ['description', 'email', 'phone_number']:
-            if key in data:
-                update_fields.append(f"{key} = %s")
-                values.append(data[key])
-        if not update_fields:
+        changes = {key: data[key] for key in ['description', 'email', 'phone_number'] if key in data}
+        if not changes:
             raise DatabaseError("No valid fields to update")
-        values.append(contact_id)
-        query = f"UPDATE point_of_contacts SET {', '.join(update_fields)} WHERE id = %s"
-        cursor.execute(query, values)
-        db.get_db().commit()
-
-         # Fetch the updated organization
-        cursor.execute('SELECT * FROM point_of_contacts WHERE id = %s', (contact_id,))
-        result = cursor.fetchone()
-        if not result:
+        update = POINT_OF_CONTACTS.update(cursor, contact_id, changes)
+        if not update:
+            db.get_db().rollback()
             raise NotFoundError(f"Contact with id {contact_id} does not exist")
-        return result
+        db.get_db().commit()
+        return update.row
     except MySQLError as e:
         if e.args[2] == 1062:
             raise ConflictError(f"Contact with description {data['description']} already exists")
@@ -202,59 +227,57 @@ def delete_organization_contact(org_contact_id: str):
     finally:
         cursor.close()
 
-def search_org(params: Dict[str, Any]) -> List[Dict[str, Any]]:
-    cursor = db.get_db().cursor()
-    try:
-        # First get basic organization data
-        query = """
-            SELECT 
-                o.id, 
-                o.name, 
-                o.description, 
-                o.website_url
-            FROM organizations o
-            ORDER BY o.name ASC
-            LIMIT %s OFFSET %s
-        """
-        # Handle pagination
-        page = params.get('page', 1)
-        limit = params.get('limit', 10)
-        offset = (page - 1) * limit
-        query_params = [limit, offset]
-
-        cursor.execute(query, query_params)
-        results = cursor.fetchall()
-        
-        # Convert to list of dictionaries
-        organizations = [dict(row) for row in results]
-        
-        # For each organization, get its categories and locations
-        for org in organizations:
-            # Get categories
-            cursor.execute("""
-                SELECT c.id, c.name 
-                FROM categories c
-                JOIN organization_categories oc ON c.id = oc.category_id
-                WHERE oc.organization_id = %s
-            """, (org['id'],))
-            org['categories'] = [dict(row) for row in cursor.fetchall()]
-            
-            # Get locations
-            cursor.execute("""
-                SELECT id, location_type, type, address_line1, address_line2, 
-                       city, state, zip_code, country, is_primary
-                FROM locations
-                WHERE entity_id = %s AND location_type = 'organization'
-            """, (org['id'],))
-            org['locations'] = [dict(row) for row in cursor.fetchall()]
-
-        return organizations
+def get_organizations_version() -> Dict[str, Any]:
+    """
+    Version probe of search_org: organization and organization location counts
+    and latest updates (category renames touch the organizations using them).
+    """
+    return db.read(organizations_version_reader())
 
-    except MySQLError as e:
-        raise DatabaseError(str(e))
-    finally:
-        cursor.close()
+def organizations_version_reader() -> Reader[Dict[str, Any]]:
+    return (yield Query("""
+        SELECT
+            (SELECT COUNT(*) FROM organizations) AS organizations,
+            (SELECT UNIX_TIMESTAMP(MAX(updated_at)) FROM organizations) AS updated_at,
+            (SELECT COUNT(*) FROM locations WHERE location_type = 'organization') AS locations,
+            (SELECT UNIX_TIMESTAMP(MAX(updated_at)) FROM locations WHERE location_type = 'organization') AS location_updated_at
+    """, one=True))
 
+def search_org(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return db.read(search_org_reader(params))
 
+def search_org_reader(params: Dict[str, Any]) -> Reader[List[Dict[str, Any]]]:
+    # Handle pagination
+    page = params.get('page', 1)
+    limit = params.get('limit', 10)
+    keyset = Keyset('organizations', [SortKey('o.name', 'name'), SortKey('o.id', 'id')], params.get('cursor'))
+    where, where_params = keyset.where()
+    order_by, _ = keyset.order_by()
+    limit_clause, limit_params = keyset.limit(page, limit)
 
+    # First get basic organization data
+    results = yield Query(f"""
+        SELECT 
+            o.id, 
+            o.name, 
+            o.description, 
+            o.website_url
+        FROM organizations o
+        WHERE {where}
+        {order_by}
+        {limit_clause}
+    """, where_params + limit_params)
+    
+    # Convert to list of dictionaries
+    organizations = keyset.page([dict(row) for row in results], limit)
+    
+    # Batch-load categories and locations for the whole page (independent, so gathered)
+    organization_ids = [organization['id'] for organization in organizations]
+    categories, locations = yield from gather(
+        ORGANIZATION_CATEGORIES.load(organization_ids),
+        ORGANIZATION_LOCATIONS.load(organization_ids)
+    )
+    BatchLoader.assign(organizations, 'categories', categories)
+    BatchLoader.assign(organizations, 'locations', locations)
 
+    return organizations
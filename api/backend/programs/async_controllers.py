@@ -0,0 +1,143 @@
+#------------------------------------------------------------
+# Async versions of the program read routes (served by asgi.py)
+#
+# Same URLs, validation and responses as the views in controllers.py, with
+# the same readers run on the async pool. Independent reads (a search and its
+# facets, the parts of an overview) run concurrently.
+#------------------------------------------------------------
+from typing import Optional
+from backend.database.aio import aio_db
+from backend.database.reads import gather
+from backend.programs.cache import program_cache
+from backend.programs.transactions import (
+    program_applications_reader,
+    program_facets_reader,
+    program_feedback_reader,
+    program_feedback_version_reader,
+    program_overview_reader,
+    program_profiles_reader,
+    program_reader,
+    program_retention_reader,
+    program_stats_reader,
+    program_trends_reader,
+    program_version_reader,
+    programs_version_reader,
+    search_program_reader
+)
+from backend.utilities.asgi import AsyncViews
+from backend.utilities.conditional import Version, conditional_get_async, resource_version
+from backend.utilities.errors import handle_error
+from backend.utilities.pagination import jsonify_page, validate_cursor, validate_pagination
+from backend.utilities.uuid import validate_uuid
+from backend.validators.search import validate_search_params
+from flask import jsonify, Response
+from http import HTTPStatus
+
+async_programs = AsyncViews()
+
+@async_programs.route('api_v1.programs.get_program')
+async def get_program(program_id: str) -> tuple[Response, int]:
+    try:
+        validate_uuid(program_id)
+        probe = await aio_db.read(program_version_reader(program_id))
+
+        async def build() -> tuple[Response, Optional[Version]]:
+            program = await program_cache.get_or_load_async(program_id, probe, lambda: aio_db.read(program_reader(program_id)))
+            return jsonify(program.document), resource_version(program.version)
+
+        return await conditional_get_async(resource_version(probe), build)
+
+    except Exception as e:
+        return handle_error(e)
+
+#------------------------------------------------------------
+# Search for programs (the page and its facets are read concurrently)
+@async_programs.route('api_v1.programs.search')
+async def search() -> tuple[Response, int]:
+    try:
+        params = validate_search_params()
+
+        async def build() -> Response:
+            if params.get('facets'):
+                programs, facets = await aio_db.read(gather(search_program_reader(params), program_facets_reader(params)))
+                return jsonify_page(programs, {'programs': programs, 'facets': facets})
+            return jsonify_page(await aio_db.read(search_program_reader(params)))
+
+        return await conditional_get_async(resource_version(await aio_db.read(programs_version_reader(params))), build)
+
+    except Exception as e:
+        return handle_error(e)
+
+@async_programs.route('api_v1.programs.get_feedback')
+async def get_feedback(program_id: str) -> tuple[Response, int]:
+    try:
+        validate_uuid(program_id)
+        page, limit = validate_pagination()
+        page_cursor = validate_cursor()
+
+        async def build() -> Response:
+            return jsonify_page(await aio_db.read(program_feedback_reader(program_id, page, limit, page_cursor)))
+
+        return await conditional_get_async(resource_version(await aio_db.read(program_feedback_version_reader(program_id))), build)
+
+    except Exception as e:
+        return handle_error(e)
+
+@async_programs.route('api_v1.programs.get_profiles')
+async def get_profiles(program_id: str) -> tuple[Response, int]:
+    try:
+        validate_uuid(program_id)
+        page, limit = validate_pagination()
+        return jsonify_page(await aio_db.read(program_profiles_reader(program_id, page, limit, validate_cursor()))), HTTPStatus.OK
+
+    except Exception as e:
+        return handle_error(e)
+
+@async_programs.route('api_v1.programs.get_applications')
+async def get_applications(program_id: str) -> tuple[Response, int]:
+    try:
+        validate_uuid(program_id)
+        page, limit = validate_pagination()
+        return jsonify_page(await aio_db.read(program_applications_reader(program_id, page, limit, validate_cursor()))), HTTPStatus.OK
+
+    except Exception as e:
+        return handle_error(e)
+
+#------------------------------------------------------------
+# Analytics
+@async_programs.route('api_v1.programs.get_feedback_stats')
+async def get_feedback_stats(program_id: str) -> tuple[Response, int]:
+    try:
+        validate_uuid(program_id)
+        return jsonify(await aio_db.read(program_stats_reader(program_id))), HTTPStatus.OK
+
+    except Exception as e:
+        return handle_error(e)
+
+@async_programs.route('api_v1.programs.get_overview')
+async def get_overview(program_id: str) -> tuple[Response, int]:
+    try:
+        validate_uuid(program_id)
+        _, limit = validate_pagination()
+        return jsonify(await aio_db.read(program_overview_reader(program_id, limit))), HTTPStatus.OK
+
+    except Exception as e:
+        return handle_error(e)
+
+@async_programs.route('api_v1.programs.get_trends')
+async def get_trends() -> tuple[Response, int]:
+    try:
+        page, limit = validate_pagination()
+        return jsonify_page(await aio_db.read(program_trends_reader(page, limit, validate_cursor()))), HTTPStatus.OK
+
+    except Exception as e:
+        return handle_error(e)
+
+@async_programs.route('api_v1.programs.get_retention')
+async def get_retention() -> tuple[Response, int]:
+    try:
+        page, limit = validate_pagination()
+        return jsonify(await aio_db.read(program_retention_reader(page, limit))), HTTPStatus.OK
+
+    except Exception as e:
+        return handle_error(e)
@@ -0,0 +1,288 @@
+#------------------------------------------------------------
+# Read-through cache of retrieve_program documents
+#
+# Backends (PROGRAM_CACHE_BACKEND):
+#   memory  an LRU per process, entries expiring after PROGRAM_CACHE_TTL
+#   redis   shared by every process (needs the `redis` package and
+#           PROGRAM_CACHE_URL); the memory backend stands in when it is
+#           not installed or not reachable at startup
+#   none    no caching
+#
+# Every entry carries the version of its document: the same updated_at
+# pair as the program's version probe, read in the document's own SELECT.
+# A lookup names the version it wants (the probe of the request) and an
+# entry of another version is a miss, so a copy another process has not
+# invalidated is never served, and the ETag of a response is always that of
+# its body. Writers still invalidate the programs they change once they have
+# committed, which frees the entries early.
+#------------------------------------------------------------
+import asyncio
+import copy
+import datetime
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, Iterable, NamedTuple, Optional
+
+from flask import Flask
+
+logger = logging.getLogger(__name__)
+
+CACHE_BACKENDS = ('memory', 'redis', 'none')
+
+class CachedProgram(NamedTuple):
+    """A retrieve_program document and the version probe (updated_at pair) it was read at."""
+    version: Dict[str, Any]
+    document: Dict[str, Any]
+
+# Documents hold dates, datetimes and Decimals; JSON keeps them as tagged strings
+def _tag(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {'__date__': value.isoformat()}
+    if isinstance(value, Decimal):
+        return {'__decimal__': str(value)}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _untag(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1:
+        if '__datetime__' in obj:
+            return datetime.datetime.fromisoformat(obj['__datetime__'])
+        if '__date__' in obj:
+            return datetime.date.fromisoformat(obj['__date__'])
+        if '__decimal__' in obj:
+            return Decimal(obj['__decimal__'])
+    return obj
+
+def dump_entry(entry: CachedProgram) -> bytes:
+    return json.dumps(entry._asdict(), default=_tag, separators=(',', ':')).encode()
+
+def load_entry(raw: bytes) -> CachedProgram:
+    return CachedProgram(**json.loads(raw, object_hook=_untag))
+
+class MemoryBackend:
+    """LRU of entries with a time to live. Thread-safe."""
+
+    blocking = False
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: 'OrderedDict[str, tuple[float, CachedProgram]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def size(self) -> Optional[int]:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CachedProgram]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        # Callers own what they get back, so the cached document stays intact
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: CachedProgram) -> None:
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+class RedisBackend:
+    """Entries as JSON in Redis under `prefix`, expiring after the TTL."""
+
+    # Every call is a network round trip; the async read path runs them in a thread
+    blocking = True
+
+    def __init__(self, url: str, ttl: float, prefix: str = 'uplift:program:'):
+        import redis  # optional dependency, only needed for this backend
+
+        self.client = redis.Redis.from_url(url)
+        self.client.ping()
+        self.ttl_ms = max(int(ttl * 1000), 1)
+        self.prefix = prefix
+
+    def size(self) -> Optional[int]:
+        # Counting would SCAN the whole keyspace, and stats() runs on every
+        # healthcheck and metrics scrape; the server reports its own key count
+        return None
+
+    def get(self, key: str) -> Optional[CachedProgram]:
+        raw = self.client.get(self.prefix + key)
+        return load_entry(raw) if raw is not None else None
+
+    def set(self, key: str, value: CachedProgram) -> None:
+        self.client.set(self.prefix + key, dump_entry(value), px=self.ttl_ms)
+
+    def delete(self, keys: Iterable[str]) -> None:
+        names = [self.prefix + key for key in keys]
+        if names:
+            self.client.delete(*names)
+
+    def clear(self) -> None:
+        for name in self.client.scan_iter(match=f'{self.prefix}*'):
+            self.client.delete(name)
+
+class ProgramCache:
+    """Program id -> CachedProgram, with hit/miss counters."""
+
+    def __init__(self):
+        self.backend: Optional[Any] = None
+        self.backend_name = 'none'
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; a load that overlapped one is not stored,
+        # since it may have read the rows before the write committed
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def init_app(self, app: Flask) -> None:
+        app.config.setdefault('PROGRAM_CACHE_BACKEND', 'memory')
+        app.config.setdefault('PROGRAM_CACHE_SIZE', 1024)
+        app.config.setdefault('PROGRAM_CACHE_TTL', 60)
+        app.config.setdefault('PROGRAM_CACHE_URL', None)
+
+        name = app.config['PROGRAM_CACHE_BACKEND']
+        if name not in CACHE_BACKENDS:
+            raise ValueError(f"PROGRAM_CACHE_BACKEND must be one of: {', '.join(CACHE_BACKENDS)}")
+        size, ttl = app.config['PROGRAM_CACHE_SIZE'], app.config['PROGRAM_CACHE_TTL']
+
+        if name == 'redis':
+            try:
+                self.backend = RedisBackend(app.config['PROGRAM_CACHE_URL'], ttl)
+            except Exception as e:
+                app.logger.warning(f"Program cache: redis unavailable ({e}), using the in-process cache")
+                name = 'memory'
+        if name == 'memory':
+            self.backend = MemoryBackend(size, ttl)
+        elif name == 'none':
+            self.backend = None
+        self.backend_name = name
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _lookup(self, program_id: str, version: Optional[Dict[str, Any]]) -> Optional[CachedProgram]:
+        try:
+            entry = self.backend.get(program_id)
+        except Exception as e:
+            logger.warning(f"Program cache read failed: {e}")
+            self._count('errors')
+            entry = None
+        # A copy of another version (changed since, or read before the probe) is a miss
+        if entry is not None and entry.version != version:
+            entry = None
+        self._count('hits' if entry is not None else 'misses')
+        return entry
+
+    def _store(self, program_id: str, entry: CachedProgram, generation: int) -> None:
+        if generation != self._generation:
+            return
+        try:
+            self.backend.set(program_id, entry)
+        except Exception as e:
+            logger.warning(f"Program cache write failed: {e}")
+            self._count('errors')
+
+    def get_or_load(self, program_id: str, version: Optional[Dict[str, Any]], load: Callable[[], CachedProgram]) -> CachedProgram:
+        """
+        Return the cached entry of a program at `version` (its version probe),
+        or `load()` the program and cache it.
+
+        A loaded entry carries the version it was read at, which is newer
+        than `version` when a write landed after the probe.
+        """
+        if self.backend is None:
+            return load()
+        entry = self._lookup(program_id, version)
+        if entry is None:
+            generation = self._generation
+            entry = load()
+            self._store(program_id, entry, generation)
+        return entry
+
+    async def get_or_load_async(self, program_id: str, version: Optional[Dict[str, Any]], load: Callable[[], Awaitable[CachedProgram]]) -> CachedProgram:
+        """
+        get_or_load for the async read path: `load()` is awaited, and the
+        lookup and store of a blocking backend (redis) run in a thread so
+        they do not stall the event loop.
+        """
+        if self.backend is None:
+            return await load()
+        entry = await self._off_loop(self._lookup, program_id, version)
+        if entry is None:
+            generation = self._generation
+            entry = await load()
+            await self._off_loop(self._store, program_id, entry, generation)
+        return entry
+
+    async def _off_loop(self, function: Callable[..., Any], *args: Any) -> Any:
+        if self.backend.blocking:
+            return await asyncio.to_thread(function, *args)
+        return function(*args)
+
+    def invalidate(self, program_ids: Iterable[str]) -> None:
+        """Drop the documents of programs whose rows changed (call after committing)."""
+        program_ids = list(program_ids)
+        if self.backend is None or not program_ids:
+            return
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(program_ids)
+        try:
+            self.backend.delete(program_ids)
+        except Exception as e:
+            logger.warning(f"Program cache invalidation failed: {e}")
+            self._count('errors')
+
+    def clear(self) -> None:
+        if self.backend is not None:
+            with self._lock:
+                self._generation += 1
+            self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        try:
+            size = self.backend.size() if self.backend is not None else 0
+        except Exception:
+            size = None
+        return {
+            'backend': self.backend_name,
+            'size': size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            'invalidations': self.invalidations,
+            'errors': self.errors
+        }
+
+
+program_cache = ProgramCache()
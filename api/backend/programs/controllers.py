@@ -1,8 +1,11 @@
-from backend.validators.programs import ProgramCategorySchema, ProgramLocationSchema, ProgramQualificationSchema, ProgramUpdateSchema, ProgramCreateSchema
-from backend.programs.transactions import create_application, create_feedback, get_program_applications, get_program_feedback, get_program_profiles, get_program_retention, get_program_stats, get_program_trends, remove_program, retrieve_program, search_program, update_program_info, upsert_categories, upsert_locations, upsert_qualifications, create_program
-from backend.utilities.pagination import validate_pagination
+from typing import Optional
+from backend.validators.programs import ProgramCategorySchema, ProgramLocationSchema, ProgramQualificationSchema, ProgramUpdateSchema, ProgramCreateSchema, load_program_document
+from backend.programs.transactions import create_application, create_feedback, get_program_applications, get_program_facets, get_program_feedback, get_program_feedback_version, get_program_at, get_program_overview, get_program_version, get_programs_version, get_program_profiles, get_program_retention, get_program_stats, get_program_trends, patch_program, remove_program, search_program, stream_program_applications, stream_program_feedback, stream_program_profiles, update_program_info, upsert_categories, upsert_locations, upsert_qualifications, create_program
+from backend.utilities.conditional import Version, conditional_get, resource_version
+from backend.utilities.pagination import jsonify_page, validate_cursor, validate_pagination
+from backend.utilities.streaming import ndjson_response, validate_stream
 from flask import Blueprint, request, jsonify, Response
-from backend.utilities.errors import handle_error
+from backend.utilities.errors import ValidationError, handle_error
 from backend.utilities.uuid import validate_uuid
 from http import HTTPStatus
 from backend.validators.search import validate_search_params
@@ -22,8 +25,13 @@ def create_feedback_route(program_id: str) -> tuple[Response, int]:
 def get_program(program_id: str) -> tuple[Response, int]:
     try:
         validate_uuid(program_id)
-        program = retrieve_program(program_id)
-        return jsonify(program), HTTPStatus.OK
+        probe = get_program_version(program_id)
+
+        def build() -> tuple[Response, Optional[Version]]:
+            program = get_program_at(program_id, probe)
+            return jsonify(program.document), resource_version(program.version)
+
+        return conditional_get(resource_version(probe), build)
     
     except Exception as e:
         return handle_error(e)
@@ -43,47 +51,63 @@ def create_application_route(program_id: str) -> tuple[Response, int]:
 def search() -> tuple[Response, int]:
     try:
         params = validate_search_params()
-        programs = search_program(params)
-        return jsonify(programs), HTTPStatus.OK
+
+        def build() -> Response:
+            programs = search_program(params)
+            # With facets the page is wrapped: {"programs": [...], "facets": {...}}
+            if params.get('facets'):
+                return jsonify_page(programs, {'programs': programs, 'facets': get_program_facets(params)})
+            return jsonify_page(programs)
+
+        return conditional_get(resource_version(get_programs_version(params)), build)
 
     except Exception as e:
         return handle_error(e)
     
 #------------------------------------------------------------
-# Get a specific program's feedback forms
+# Get a specific program's feedback forms (all of them as NDJSON with ?stream=ndjson)
 @programs.route('/<string:program_id>/feedbacks', methods=['GET'])
 def get_feedback(program_id: str) -> tuple[Response, int]:
     try:
         validate_uuid(program_id)
+        if validate_stream():
+            return ndjson_response(stream_program_feedback(program_id, validate_cursor())), HTTPStatus.OK
         page, limit = validate_pagination()
-        program = get_program_feedback(program_id, page, limit)
-        return jsonify(program), HTTPStatus.OK
+        page_cursor = validate_cursor()
+        return conditional_get(
+            resource_version(get_program_feedback_version(program_id)),
+            lambda: jsonify_page(get_program_feedback(program_id, page, limit, page_cursor))
+        )
 
     except Exception as e:
         return handle_error(e)
     
 #------------------------------------------------------------
-# Get all user profiles who apply to specific program
+# Get all user profiles who apply to specific program (as NDJSON with ?stream=ndjson)
 @programs.route('/<string:program_id>/profiles', methods=['GET'])
 def get_profiles(program_id: str) -> tuple[Response, int]:
     try:
         validate_uuid(program_id)
+        if validate_stream():
+            return ndjson_response(stream_program_profiles(program_id, validate_cursor())), HTTPStatus.OK
         page, limit = validate_pagination()
-        program = get_program_profiles(program_id, page, limit)
-        return jsonify(program), HTTPStatus.OK
+        program = get_program_profiles(program_id, page, limit, validate_cursor())
+        return jsonify_page(program), HTTPStatus.OK
 
     except Exception as e:
         return handle_error(e)
 
 #------------------------------------------------------------
-# Get all applications to a specific program
+# Get all applications to a specific program (as NDJSON with ?stream=ndjson)
 @programs.route('/<string:program_id>/applications', methods=['GET'])
 def get_applications(program_id: str) -> tuple[Response, int]:
     try:
         validate_uuid(program_id)
+        if validate_stream():
+            return ndjson_response(stream_program_applications(program_id, validate_cursor())), HTTPStatus.OK
         page, limit = validate_pagination()
-        program = get_program_applications(program_id, page, limit)
-        return jsonify(program), HTTPStatus.OK
+        program = get_program_applications(program_id, page, limit, validate_cursor())
+        return jsonify_page(program), HTTPStatus.OK
 
     except Exception as e:
         return handle_error(e)
@@ -100,14 +124,26 @@ def get_feedback_stats(program_id: str) -> tuple[Response, int]:
     except Exception as e:
         return handle_error(e)
     
+#------------------------------------------------------------
+# Get a program's applications, feedback stats and applicant profiles at once
+@programs.route('/<string:program_id>/overview', methods=['GET'])
+def get_overview(program_id: str) -> tuple[Response, int]:
+    try:
+        validate_uuid(program_id)
+        _, limit = validate_pagination()
+        return jsonify(get_program_overview(program_id, limit)), HTTPStatus.OK
+
+    except Exception as e:
+        return handle_error(e)
+    
 #------------------------------------------------------------
 # Get the trends of applications over time
 @programs.route('/trends', methods=['GET'])
 def get_trends() -> tuple[Response, int]:
     try:
         page, limit = validate_pagination()
-        program = get_program_trends(page, limit)
-        return jsonify(program), HTTPStatus.OK
+        program = get_program_trends(page, limit, validate_cursor())
+        return jsonify_page(program), HTTPStatus.OK
 
     except Exception as e:
         return handle_error(e)
@@ -138,6 +174,19 @@ def update_program(program_id) -> tuple[Response, int]:
     except Exception as e:
         return handle_error(e)
     
+#------------------------------------------------------------
+# Update a program and any of its locations, qualifications and categories at once
+@programs.route('/<string:program_id>', methods=['PATCH'])
+def patch_program_route(program_id: str) -> tuple[Response, int]:
+    try:
+        validate_uuid(program_id)
+        data = load_program_document(request.json, ProgramUpdateSchema())
+        result = patch_program(program_id, data)
+        return jsonify(result), HTTPStatus.OK
+
+    except Exception as e:
+        return handle_error(e)
+
 #------------------------------------------------------------
 # Update the locations of a specific program
 @programs.route('/<string:program_id>/locations', methods=['PUT'])
@@ -146,8 +195,8 @@ def update_program_locations(program_id: str) -> tuple[Response, int]:
         validate_uuid(program_id)
         program_schema = ProgramLocationSchema()
         data = program_schema.load(request.json)
-        upsert_locations(program_id, data)
-        return jsonify({ "message": "Program locations updated successfully" }), HTTPStatus.OK
+        result = upsert_locations(program_id, data)
+        return jsonify({ "message": "Program locations updated successfully", "changes": result.as_dict() }), HTTPStatus.OK
     
     except Exception as e:
         return handle_error(e) 
@@ -160,8 +209,8 @@ def update_program_qualifications(program_id: str) -> tuple[Response, int]:
         validate_uuid(program_id)
         program_schema = ProgramQualificationSchema()
         data = program_schema.load(request.json)    
-        upsert_qualifications(program_id, data)
-        return jsonify({ "message": "Program qualifications updated successfully" }), HTTPStatus.OK
+        result = upsert_qualifications(program_id, data)
+        return jsonify({ "message": "Program qualifications updated successfully", "changes": result.as_dict() }), HTTPStatus.OK
     
     except Exception as e:
         return handle_error(e)
@@ -174,8 +223,8 @@ def update_program_categories(program_id: str) -> tuple[Response, int]:
         validate_uuid(program_id)
         program_schema = ProgramCategorySchema()
         data = program_schema.load(request.json)
-        upsert_categories(program_id, data)
-        return jsonify({ "message": "Program categories updated successfully" }), HTTPStatus.OK
+        result = upsert_categories(program_id, data)
+        return jsonify({ "message": "Program categories updated successfully", "changes": result.as_dict() }), HTTPStatus.OK
     
     except Exception as e:
         return handle_error(e)
@@ -197,8 +246,9 @@ def delete_program(program_id: str) -> tuple[Response, int]:
 @programs.route('', methods=['POST'], strict_slashes=False)
 def create() -> tuple[Response, int]:
     try:
-        program_schema = ProgramCreateSchema()
-        data = program_schema.load(request.json)
+        data = load_program_document(request.json, ProgramCreateSchema())
+        if not data.get('organization_id'):
+            raise ValidationError("organization_id is required")
         program = create_program(data)
         return jsonify(program), HTTPStatus.CREATED
     except Exception as e:
@@ -0,0 +1,130 @@
+#------------------------------------------------------------
+# SQL for program text search
+#
+# The modes share the same ranking: name prefix (3) > name match (2) >
+# description or organization match (1).
+#
+#   contains  LIKE '%term%' substring matching, which scans every program.
+#   fulltext  the FULLTEXT indexes on programs.name, programs.description and
+#             organizations.name, matching whole words and word prefixes.
+#   index     the in-process index of backend.programs.search_index, with the
+#             same word-prefix matching; its SQL fallback is fulltext.
+#------------------------------------------------------------
+import re
+from typing import Any, List, NamedTuple, Optional
+
+from backend.utilities.errors import ValidationError
+
+SEARCH_MODES = ('contains', 'fulltext', 'index')
+DEFAULT_SEARCH_MODE = 'contains'
+
+# innodb_ft_min_token_size: shorter words are not in the FULLTEXT index
+FULLTEXT_MIN_TOKEN_SIZE = 3
+
+# InnoDB's default stopword list (INFORMATION_SCHEMA.INNODB_FT_DEFAULT_STOPWORD),
+# minus the words already below the minimum token size. They are not indexed,
+# so requiring one (`+the*`) would match nothing.
+FULLTEXT_STOPWORDS = frozenset((
+    'about', 'are', 'com', 'for', 'from', 'how', 'that', 'the', 'this',
+    'was', 'what', 'when', 'where', 'who', 'will', 'with', 'und', 'www'
+))
+
+# Takes the parameters (prefix, contains, contains, contains).
+CONTAINS_RELEVANCE = """
+    CASE
+        WHEN p.name LIKE %s THEN 3  -- Exact match at start
+        WHEN p.name LIKE %s THEN 2  -- Contains match
+        WHEN p.description LIKE %s THEN 1  -- Description match
+        WHEN o.name LIKE %s THEN 1  -- Organization match
+        ELSE 0
+    END
+"""
+
+# Takes the parameters (prefix, boolean query, boolean query, boolean query).
+FULLTEXT_RELEVANCE = """
+    CASE
+        WHEN p.name LIKE %s THEN 3
+        WHEN MATCH(p.name) AGAINST (%s IN BOOLEAN MODE) THEN 2
+        WHEN MATCH(p.description) AGAINST (%s IN BOOLEAN MODE) THEN 1
+        WHEN MATCH(o.name) AGAINST (%s IN BOOLEAN MODE) THEN 1
+        ELSE 0
+    END
+"""
+
+# Takes the parameters (prefix, boolean query, boolean query, boolean query).
+# Each branch is answered from its own index, so no programs row is scanned.
+FULLTEXT_MATCH = """
+    (
+        p.name LIKE %s
+        OR p.id IN (
+            SELECT id FROM programs WHERE MATCH(name) AGAINST (%s IN BOOLEAN MODE)
+            UNION
+            SELECT id FROM programs WHERE MATCH(description) AGAINST (%s IN BOOLEAN MODE)
+            UNION
+            SELECT sp.id FROM programs sp
+            INNER JOIN organizations so ON sp.organization_id = so.id
+            WHERE MATCH(so.name) AGAINST (%s IN BOOLEAN MODE)
+        )
+    )
+"""
+
+class SearchRelevance(NamedTuple):
+    """The rank expression of a search and the predicate selecting its matches."""
+    mode: str
+    rank: str
+    rank_params: List[Any]
+    match: str
+    match_params: List[Any]
+
+def validate_search_mode(mode: Optional[str]) -> str:
+    if mode is None:
+        return DEFAULT_SEARCH_MODE
+    if mode not in SEARCH_MODES:
+        raise ValidationError(f"Search mode must be one of: {', '.join(SEARCH_MODES)}")
+    return mode
+
+def fulltext_query(search_query: str) -> Optional[str]:
+    """
+    Turn free text into a BOOLEAN MODE query requiring every word as a prefix.
+
+    Returns:
+        Optional[str]: e.g. '+food* +bank*', or None when no word would be in the index.
+    """
+    words = [
+        word for word in re.findall(r'\w+', search_query.lower())
+        if len(word) >= FULLTEXT_MIN_TOKEN_SIZE and word not in FULLTEXT_STOPWORDS
+    ]
+    if not words:
+        return None
+    return ' '.join(f'+{word}*' for word in dict.fromkeys(words))
+
+def search_relevance(search_query: str, mode: Optional[str] = None) -> SearchRelevance:
+    """
+    Build the ranking and matching SQL for a program search (aliases `p` and `o`).
+
+    A fulltext search whose words are all too short to be indexed falls back
+    to contains matching, so short queries still find substring matches.
+    """
+    mode = validate_search_mode(mode)
+    prefix_term = f"{search_query}%"
+
+    boolean_query = fulltext_query(search_query) if mode != 'contains' else None
+    if boolean_query:
+        params = [prefix_term, boolean_query, boolean_query, boolean_query]
+        return SearchRelevance('fulltext', FULLTEXT_RELEVANCE, params, FULLTEXT_MATCH, list(params))
+
+    contains_term = f"%{search_query}%"
+    params = [prefix_term, contains_term, contains_term, contains_term]
+    return SearchRelevance('contains', CONTAINS_RELEVANCE, params, f"({CONTAINS_RELEVANCE}) > 0", list(params))
+
+def program_text_filter(search_query: str, mode: Optional[str] = None) -> tuple[str, List[Any]]:
+    """Match programs (unaliased `programs` columns) whose name or description matches the query."""
+    mode = validate_search_mode(mode)
+    boolean_query = fulltext_query(search_query) if mode != 'contains' else None
+    if boolean_query:
+        return (
+            '(MATCH(name) AGAINST (%s IN BOOLEAN MODE) OR MATCH(description) AGAINST (%s IN BOOLEAN MODE))',
+            [boolean_query, boolean_query]
+        )
+    search_pattern = f'%{search_query}%'
+    return '(name LIKE %s OR description LIKE %s)', [search_pattern, search_pattern]
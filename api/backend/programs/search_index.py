@@ -0,0 +1,686 @@
+#------------------------------------------------------------
+# In-process search engine for programs
+#
+# Every program gets a small integer ordinal, and every indexed value (a name
+# or description token, a category, a city, an applicant, ...) maps to the set
+# of ordinals having it. Low-cardinality fields (category, state, status,
+# country) keep that set as a bitmap stored in a Python int; the others keep a
+# compact array of ordinals that is turned into a bitmap when queried. A
+# search is then a handful of `&` / `|` operations over bitmaps: no MySQL
+# round trip is needed to decide which programs match or how they are
+# ordered. Only the page that is returned is read from MySQL, by primary key.
+#
+# The index is loaded in a background thread at startup, kept current by the
+# write paths calling `refresh*()` after they commit, and rebuilt in the
+# background once it is older than SEARCH_INDEX_MAX_AGE. A write only
+# refreshes the index of its own process, so the index is for single-process
+# servers: gunicorn refuses several workers unless SEARCH_INDEX_ENABLED=false.
+#------------------------------------------------------------
+import heapq
+import json
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
+
+from flask import Flask, current_app
+
+from backend.database import db
+from backend.utilities.pagination import CursorPage, decode_cursor, encode_cursor
+
+_TOKEN = re.compile(r'\w+')
+
+# Bit positions set in each byte value, for walking a bitmap byte by byte
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+LOCATION_FIELDS = ('city', 'state', 'zip_code', 'country')
+
+_LOAD_QUERY = """
+    SELECT
+        p.id,
+        p.name,
+        p.description,
+        p.status,
+        p.start_date,
+        p.deadline,
+        p.organization_id,
+        o.name AS organization_name,
+        (
+            SELECT JSON_ARRAYAGG(pc.category_id)
+            FROM program_categories pc
+            WHERE pc.program_id = p.id
+        ) AS categories,
+        (
+            SELECT JSON_ARRAYAGG(JSON_ARRAY(l.city, l.state, l.zip_code, l.country))
+            FROM locations l
+            WHERE l.entity_id = p.id AND l.location_type = 'program'
+        ) AS locations,
+        (
+            SELECT JSON_ARRAYAGG(a.user_id)
+            FROM applications a
+            WHERE a.program_id = p.id
+        ) AS applicants
+    FROM programs p
+    INNER JOIN organizations o ON p.organization_id = o.id
+"""
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN.findall(text.casefold()) if text else []
+
+def _fold(value: Optional[str]) -> Optional[str]:
+    """Normalize a filter value the way the case-insensitive column collation compares it."""
+    return value.casefold() if isinstance(value, str) else value
+
+def to_bitmap(ordinals: Iterable[int], size: int) -> int:
+    buffer = bytearray((size + 7) // 8)
+    for ordinal in ordinals:
+        buffer[ordinal >> 3] |= 1 << (ordinal & 7)
+    return int.from_bytes(buffer, 'little')
+
+def iter_bits(bitmap: int) -> Iterator[int]:
+    """Yield the ordinals set in a bitmap, in ascending order."""
+    for offset, byte in enumerate(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')):
+        if byte:
+            base = offset * 8
+            for bit in _BYTE_BITS[byte]:
+                yield base + bit
+
+class IndexedProgram(NamedTuple):
+    """The fields of a program that the index can filter and sort on."""
+    id: str
+    name: str
+    description: str
+    status: str
+    start_date: Optional[date]
+    deadline: Optional[datetime]
+    organization_id: str
+    organization_name: str
+    categories: Tuple[str, ...]
+    locations: Tuple[Tuple[Optional[str], ...], ...]
+    applicants: Tuple[str, ...]
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> 'IndexedProgram':
+        def json_list(value: Any) -> list:
+            if value is None:
+                return []
+            return json.loads(value) if isinstance(value, (str, bytes)) else value
+
+        return cls(
+            id=row['id'],
+            name=row['name'] or '',
+            description=row['description'] or '',
+            status=row['status'],
+            start_date=row['start_date'],
+            deadline=row['deadline'],
+            organization_id=row['organization_id'],
+            organization_name=row['organization_name'] or '',
+            categories=tuple(json_list(row['categories'])),
+            locations=tuple(tuple(location) for location in json_list(row['locations'])),
+            applicants=tuple(dict.fromkeys(json_list(row['applicants'])))
+        )
+
+    def postings(self) -> Iterator[Tuple[str, Any]]:
+        """Yield every (field, value) pair this program is indexed under."""
+        for token in set(tokenize(self.name)):
+            yield 'name', token
+        for token in set(tokenize(self.description)):
+            yield 'description', token
+        for token in set(tokenize(self.organization_name)):
+            yield 'organization', token
+        yield 'organization_id', self.organization_id
+        yield 'status', self.status
+        for category_id in set(self.categories):
+            yield 'category', category_id
+        for location in self.locations:
+            for field, value in zip(LOCATION_FIELDS, location):
+                if value is not None:
+                    yield field, _fold(value)
+        for user_id in self.applicants:
+            yield 'applicant', user_id
+
+class Postings:
+    """
+    value -> programs having it, with prefix lookup over the values.
+
+    Each value's programs are kept as an array of ordinals (4 bytes per
+    program) until they are common enough that a bitmap (one bit per program
+    in the whole index) is smaller; dense fields use bitmaps from the start.
+    """
+
+    # An array is turned into a bitmap once it holds this many ordinals and
+    # more than 1/32 of the index (the point where the bitmap is smaller)
+    PROMOTE_MIN = 64
+
+    def __init__(self, dense: bool = False):
+        self.dense = dense
+        self.entries: Dict[Any, Union[int, array]] = {}
+        self._sorted: Optional[List[str]] = None
+
+    def add(self, value: Any, ordinal: int, size: int) -> None:
+        entry = self.entries.get(value)
+        if entry is None:
+            self._sorted = None
+            entry = 0 if self.dense else array('I')
+        if isinstance(entry, int):
+            self.entries[value] = entry | 1 << ordinal
+            return
+        entry.append(ordinal)
+        if len(entry) >= self.PROMOTE_MIN and len(entry) * 32 > size:
+            self.entries[value] = to_bitmap(entry, size)
+        else:
+            self.entries[value] = entry
+
+    def discard(self, value: Any, ordinal: int) -> None:
+        entry = self.entries.get(value)
+        if entry is None:
+            return
+        if isinstance(entry, int):
+            entry &= ~(1 << ordinal)
+            self.entries[value] = entry
+        elif ordinal in entry:
+            entry.remove(ordinal)
+        if not entry:
+            del self.entries[value]
+            self._sorted = None
+
+    def append(self, value: Any, ordinal: int) -> None:
+        """Bulk-loading variant of add: always appends, `compact` converts afterwards."""
+        entry = self.entries.get(value)
+        if entry is None:
+            entry = self.entries[value] = array('I')
+        entry.append(ordinal)
+
+    def compact(self, size: int) -> None:
+        """Turn the arrays that should be bitmaps into bitmaps."""
+        self._sorted = None
+        for value, entry in self.entries.items():
+            if not isinstance(entry, int) and (self.dense or (len(entry) >= self.PROMOTE_MIN and len(entry) * 32 > size)):
+                self.entries[value] = to_bitmap(entry, size)
+
+    def counts(self, bitmap: int) -> Iterator[Tuple[Any, int]]:
+        """Yield (value, number of programs of `bitmap` having it) for the values some have."""
+        for value, entry in self.entries.items():
+            if isinstance(entry, int):
+                count = (entry & bitmap).bit_count()
+            else:
+                count = sum(1 for ordinal in entry if bitmap >> ordinal & 1)
+            if count:
+                yield value, count
+
+    def ordinals(self, value: Any) -> Iterable[int]:
+        entry = self.entries.get(value)
+        if entry is None:
+            return ()
+        return iter_bits(entry) if isinstance(entry, int) else entry
+
+    def get(self, value: Any, size: int) -> int:
+        return self.any_of((value,), size)
+
+    def any_of(self, values: Iterable[Any], size: int) -> int:
+        """Bitmap of the programs having any of `values`."""
+        bitmap = 0
+        arrays = []
+        for value in values:
+            entry = self.entries.get(value)
+            if isinstance(entry, int):
+                bitmap |= entry
+            elif entry is not None:
+                arrays.append(entry)
+        if arrays:
+            bitmap |= to_bitmap((ordinal for entry in arrays for ordinal in entry), size)
+        return bitmap
+
+    def prefixed(self, prefix: str, size: int) -> int:
+        """Bitmap of the programs having a value that starts with `prefix`."""
+        if self._sorted is None:
+            self._sorted = sorted(self.entries)
+        values = []
+        for value in islice(self._sorted, bisect_left(self._sorted, prefix), None):
+            if not value.startswith(prefix):
+                break
+            values.append(value)
+        return self.any_of(values, size)
+
+def _sortable(value: Any) -> Any:
+    """Match the string form values take in a cursor (see encode_cursor)."""
+    if isinstance(value, (date, datetime)):
+        return str(value)
+    return value.casefold() if isinstance(value, str) else value
+
+def sort_key(value: Any, program_id: str) -> tuple:
+    """
+    Ascending sort key of a program for one sort field, ending in the id.
+
+    MySQL sorts NULLs first, so they come last when the key is sorted in reverse.
+    """
+    return (value is not None, _sortable(value) if value is not None else '', program_id)
+
+class IndexState:
+    """One generation of the index. Not thread-safe: ProgramSearchIndex guards it."""
+
+    SPARSE_FIELDS = ('name', 'description', 'organization', 'organization_id', 'city', 'zip_code', 'applicant')
+    DENSE_FIELDS = ('status', 'category', 'state', 'country')
+    SORT_FIELDS = ('name', 'start_date', 'deadline')
+
+    def __init__(self):
+        self.programs: List[Optional[IndexedProgram]] = []
+        self.ordinals: Dict[str, int] = {}
+        self.free: List[int] = []
+        self.all = 0
+        self.located = 0
+        self.fields: Dict[str, Postings] = {
+            **{field: Postings() for field in self.SPARSE_FIELDS},
+            **{field: Postings(dense=True) for field in self.DENSE_FIELDS}
+        }
+        # Precomputed sort keys by ordinal, so ordering a result never touches the programs
+        self.sort_keys: Dict[str, List[Optional[tuple]]] = {field: [] for field in self.SORT_FIELDS}
+        # States are indexed casefolded; facet counts show them as first seen
+        self.state_names: Dict[str, str] = {}
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def load(cls, programs: Iterable[IndexedProgram]) -> 'IndexState':
+        """
+        Build a state from scratch.
+
+        Setting bits one program at a time copies every bitmap on each add,
+        so postings are collected as arrays first and converted once at the end.
+        """
+        state = cls()
+        located = []
+        for ordinal, program in enumerate(programs):
+            state.programs.append(program)
+            state.ordinals[program.id] = ordinal
+            for field, keys in state.sort_keys.items():
+                keys.append(sort_key(getattr(program, field), program.id))
+            if program.locations:
+                located.append(ordinal)
+                state.name_states(program)
+            for field, value in program.postings():
+                state.fields[field].append(value, ordinal)
+
+        state.all = (1 << state.size) - 1
+        state.located = to_bitmap(located, state.size)
+        for postings in state.fields.values():
+            postings.compact(state.size)
+        return state
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    @property
+    def size(self) -> int:
+        """Number of ordinals in use, including freed ones; the width of every bitmap."""
+        return len(self.programs)
+
+    def add(self, program: IndexedProgram) -> None:
+        self.remove(program.id)
+        if self.free:
+            ordinal = self.free.pop()
+            self.programs[ordinal] = program
+            for field, keys in self.sort_keys.items():
+                keys[ordinal] = sort_key(getattr(program, field), program.id)
+        else:
+            ordinal = len(self.programs)
+            self.programs.append(program)
+            for field, keys in self.sort_keys.items():
+                keys.append(sort_key(getattr(program, field), program.id))
+        self.ordinals[program.id] = ordinal
+
+        bit = 1 << ordinal
+        self.all |= bit
+        if program.locations:
+            self.located |= bit
+            self.name_states(program)
+        for field, value in program.postings():
+            self.fields[field].add(value, ordinal, self.size)
+
+    def name_states(self, program: IndexedProgram) -> None:
+        for location in program.locations:
+            state = location[LOCATION_FIELDS.index('state')]
+            if state is not None:
+                self.state_names.setdefault(_fold(state), state)
+
+    def remove(self, program_id: str) -> None:
+        ordinal = self.ordinals.pop(program_id, None)
+        if ordinal is None:
+            return
+        program = self.programs[ordinal]
+        self.programs[ordinal] = None
+        for keys in self.sort_keys.values():
+            keys[ordinal] = None
+        self.free.append(ordinal)
+
+        bit = 1 << ordinal
+        self.all &= ~bit
+        self.located &= ~bit
+        for field, value in program.postings():
+            self.fields[field].discard(value, ordinal)
+
+    def ids(self, field: str, value: Any) -> List[str]:
+        """Ids of the programs indexed under `value` in `field`."""
+        return [self.programs[ordinal].id for ordinal in self.fields[field].ordinals(value)]
+
+    def all_words(self, field: str, words: Sequence[str]) -> int:
+        """Programs whose `field` has a token starting with every one of `words`."""
+        if not words:
+            return 0
+        bitmap = self.all
+        for word in words:
+            bitmap &= self.fields[field].prefixed(word, self.size)
+            if not bitmap:
+                break
+        return bitmap
+
+    def filter(self, params: Dict[str, Any]) -> int:
+        """Apply the user_id, categories and location filters of search_program."""
+        bitmap = self.all
+        if params.get('user_id') is not None:
+            bitmap &= self.fields['applicant'].get(params['user_id'], self.size)
+
+        categories = params.get('categories')
+        if categories:
+            bitmap &= self.fields['category'].any_of(categories, self.size)
+
+        # Like the SQL, a program matches when any of its locations matches any
+        # given condition, and without conditions it only needs a location
+        location = params.get('location')
+        if location is not None:
+            conditions = [(field, location[field]) for field in LOCATION_FIELDS if location.get(field)]
+            if conditions:
+                located = 0
+                for field, value in conditions:
+                    located |= self.fields[field].get(_fold(value), self.size)
+                bitmap &= located
+            else:
+                bitmap &= self.located
+        return bitmap
+
+    def match(self, params: Dict[str, Any], exclude: Sequence[str] = ()) -> int:
+        """Programs matching a search_program query, leaving out the filters named in `exclude`."""
+        bitmap = self.filter({key: value for key, value in params.items() if key not in exclude})
+        if params.get('search_query'):
+            matched = 0
+            for _, tier in self.rank(bitmap, params['search_query']):
+                matched |= tier
+            bitmap = matched
+        return bitmap
+
+    def facet_counts(self, field: str, bitmap: int) -> List[Tuple[Any, Any, int]]:
+        """(value, label, count) of each `field` value among the programs of `bitmap`."""
+        labels = self.state_names if field == 'state' else {}
+        return [(value, labels.get(value, value), count) for value, count in self.fields[field].counts(bitmap)]
+
+    def rank(self, bitmap: int, search_query: str) -> List[Tuple[int, int]]:
+        """
+        Split the programs of `bitmap` that match the search text by relevance.
+
+        Returns:
+            List[Tuple[int, int]]: (rank, bitmap) tiers, best first: 3 (name starts
+            with the query), 2 (every word in the name) and 1 (every word in the
+            description or organization name).
+        """
+        words = list(dict.fromkeys(tokenize(search_query)))
+        name_match = self.all_words('name', words) & bitmap
+        other_match = (self.all_words('description', words) | self.all_words('organization', words)) & bitmap & ~name_match
+
+        # A name starting with the query has every query word as a token prefix,
+        # so only those names are checked (all of them for a query without words)
+        prefix = search_query.casefold()
+        names = self.sort_keys['name']
+        starts = to_bitmap(
+            (ordinal for ordinal in iter_bits(name_match if words else bitmap) if names[ordinal][1].startswith(prefix)),
+            self.size
+        )
+        if not words:
+            return [(3, starts)]
+        return [(3, starts), (2, name_match & ~starts), (1, other_match)]
+
+class ProgramSearchIndex:
+    """Thread-safe holder of the current IndexState, with loading and refresh."""
+
+    SORT_FIELDS = IndexState.SORT_FIELDS
+
+    # Seconds between attempts to load an index that failed to load
+    RETRY_INTERVAL = 30.0
+
+    def __init__(self):
+        self.app: Optional[Flask] = None
+        self.enabled = False
+        self.max_age = 0.0
+        self._lock = threading.RLock()
+        self._state: Optional[IndexState] = None
+        self._rebuilding = False
+        self._started_at = float('-inf')
+        self._dirty: Set[str] = set()
+
+    def init_app(self, app: Flask) -> None:
+        self.app = app
+        app.config.setdefault('SEARCH_INDEX_ENABLED', True)
+        app.config.setdefault('SEARCH_INDEX_MAX_AGE', 300)
+        self.enabled = app.config['SEARCH_INDEX_ENABLED']
+        self.max_age = app.config['SEARCH_INDEX_MAX_AGE']
+        if self.enabled:
+            self.rebuild_in_background()
+
+    def after_fork(self) -> None:
+        """Restart, in a forked worker, a load the parent had running (its thread did not survive the fork)."""
+        self._lock = threading.RLock()
+        rebuilding, self._rebuilding = self._rebuilding, False
+        if self.enabled and (rebuilding or self._state is None):
+            self.rebuild_in_background()
+
+    @property
+    def ready(self) -> bool:
+        return self.enabled and self._state is not None
+
+    def stats(self) -> Dict[str, Any]:
+        state = self._state
+        return {
+            'enabled': self.enabled,
+            'ready': self.ready,
+            'programs': len(state) if state else 0,
+            'age_seconds': round(time.monotonic() - state.built_at, 1) if state else None,
+            'rebuilding': self._rebuilding
+        }
+
+    #------------------------------------------------------------
+    # Loading
+
+    def _load(self, where: str = '', params: Sequence[Any] = ()) -> Dict[str, IndexedProgram]:
+        cursor = db.get_db().cursor()
+        try:
+            cursor.execute(_LOAD_QUERY + where, params)
+            return {row['id']: IndexedProgram.from_row(row) for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+
+    def rebuild(self) -> None:
+        """Load every program into a new IndexState and swap it in (needs an app context)."""
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+            self._started_at = time.monotonic()
+            self._dirty.clear()
+
+        state = None
+        try:
+            state = IndexState.load(self._load().values())
+        finally:
+            with self._lock:
+                self._rebuilding = False
+                if state is not None:
+                    self._state = state
+                dirty, self._dirty = list(self._dirty), set()
+
+        # Programs written while loading may be missing from the snapshot
+        if dirty:
+            self.refresh(dirty)
+
+    def rebuild_in_background(self) -> None:
+        def run():
+            with self.app.app_context():
+                try:
+                    self.rebuild()
+                except Exception as e:
+                    self.app.logger.warning(f"Program search index rebuild failed: {e}")
+
+        threading.Thread(target=run, name='program-search-index', daemon=True).start()
+
+    #------------------------------------------------------------
+    # Write hooks (call after the write has been committed)
+
+    def _reload(self, known_ids: Iterable[str], where: str, params: Sequence[Any]) -> None:
+        # Nothing to keep current before the first load; it will read the write anyway
+        if not self.enabled or (self._state is None and not self._rebuilding):
+            return
+        known_ids = set(known_ids)
+        try:
+            loaded = self._load(where, params)
+        except Exception as e:
+            # Never fail the write that triggered the refresh; rebuild instead
+            current_app.logger.warning(f"Program search index refresh failed: {e}")
+            with self._lock:
+                if self._state is not None:
+                    self._state.built_at = float('-inf')
+            return
+
+        with self._lock:
+            if self._rebuilding:
+                self._dirty.update(known_ids | loaded.keys())
+            state = self._state
+            if state is None:
+                return
+            for program_id in known_ids - loaded.keys():
+                state.remove(program_id)
+            for program in loaded.values():
+                state.add(program)
+
+    def _indexed_ids(self, field: str, value: Any) -> List[str]:
+        with self._lock:
+            return self._state.ids(field, value) if self._state else []
+
+    def refresh(self, program_ids: Iterable[str]) -> None:
+        """Reload programs from MySQL, dropping the ones that no longer exist."""
+        program_ids = list(dict.fromkeys(program_ids))
+        if program_ids:
+            self._reload(program_ids, f" WHERE p.id IN ({', '.join(['%s'] * len(program_ids))})", program_ids)
+
+    def refresh_organization(self, organization_id: str) -> None:
+        """Reload an organization's programs (after a rename, delete or new program)."""
+        self._reload(self._indexed_ids('organization_id', organization_id), ' WHERE p.organization_id = %s', (organization_id,))
+
+    def refresh_category(self, category_id: str) -> None:
+        self.refresh(self._indexed_ids('category', category_id))
+
+    def refresh_applicant(self, user_id: str) -> None:
+        self.refresh(self._indexed_ids('applicant', user_id))
+
+    #------------------------------------------------------------
+    # Searching
+
+    def search(self, params: Dict[str, Any]) -> Optional[CursorPage]:
+        """
+        Answer a search_program query from the index.
+
+        Returns:
+            Optional[CursorPage]: The ids of the programs on the requested page, in
+            order, or None when the index is not loaded yet.
+        """
+        if not self.ready:
+            if self.enabled and not self._rebuilding and time.monotonic() - self._started_at > self.RETRY_INTERVAL:
+                self.rebuild_in_background()
+            return None
+        with self._lock:
+            state = self._state
+            if self.max_age and time.monotonic() - state.built_at > self.max_age and not self._rebuilding:
+                self.rebuild_in_background()
+
+            bitmap = state.filter(params)
+            search_query = params.get('search_query')
+            if search_query:
+                # Relevance first, then name and id ascending within a rank
+                field, descending = 'name', False
+                sort = 'programs:index:relevance'
+                tiers = state.rank(bitmap, search_query)
+            else:
+                field = params.get('sort_by') if params.get('sort_by') in self.SORT_FIELDS else 'name'
+                descending = (params.get('sort_order') or 'asc').lower() == 'desc'
+                sort = f"programs:index:{field}:{'desc' if descending else 'asc'}"
+                tiers = [(None, bitmap)]
+            keys = state.sort_keys[field]
+
+            limit = params.get('limit', 10)
+            skip = (params.get('page', 1) - 1) * limit
+            after_rank = after = None
+            if params.get('cursor'):
+                skip = 0
+                values = decode_cursor(params['cursor'], sort, 3 if search_query else 2)
+                if search_query:
+                    after_rank, values = int(values[0]), values[1:]
+                after = sort_key(*values)
+
+            # Walk the tiers in order, skipping whole tiers by their size and
+            # only ordering the ones the page falls in
+            select = heapq.nlargest if descending else heapq.nsmallest
+            selected: List[Tuple[Optional[int], int]] = []
+            for rank, tier in tiers:
+                if after_rank is not None and rank > after_rank:
+                    continue
+                if after is not None and (after_rank is None or rank == after_rank):
+                    candidates = [
+                        ordinal for ordinal in iter_bits(tier)
+                        if (keys[ordinal] < after if descending else keys[ordinal] > after)
+                    ]
+                else:
+                    size = tier.bit_count()
+                    if skip >= size:
+                        skip -= size
+                        continue
+                    candidates = iter_bits(tier)
+                chosen = select(skip + limit - len(selected), candidates, key=keys.__getitem__)[skip:]
+                skip = 0
+                selected.extend((rank, ordinal) for ordinal in chosen)
+                if len(selected) >= limit:
+                    break
+
+            result = CursorPage(state.programs[ordinal].id for _, ordinal in selected)
+            if selected and len(selected) >= limit:
+                rank, ordinal = selected[-1]
+                last = state.programs[ordinal]
+                values = [getattr(last, field), last.id]
+                result.next_cursor = encode_cursor(sort, [rank, *values] if search_query else values)
+            return result
+
+    def facet_counts(self, params: Dict[str, Any], facets: Dict[str, Sequence[str]]) -> Optional[Dict[str, List[Tuple[Any, Any, int]]]]:
+        """
+        Count the programs matching a search_program query by facet value.
+
+        Args:
+            facets: facet ('category', 'state' or 'status') -> the filters it ignores.
+
+        Returns:
+            Optional[Dict[str, List[Tuple[Any, Any, int]]]]: facet -> (value, label,
+            count), or None when the index is not loaded yet.
+        """
+        if not self.ready:
+            return None
+        with self._lock:
+            state = self._state
+            matches: Dict[tuple, int] = {}
+            counts = {}
+            for facet, exclude in facets.items():
+                exclude = tuple(exclude)
+                if exclude not in matches:
+                    matches[exclude] = state.match(params, exclude)
+                counts[facet] = state.facet_counts(facet, matches[exclude])
+            return counts
+
+
+program_index = ProgramSearchIndex()
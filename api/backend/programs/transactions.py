@@ -1,43 +1,42 @@
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any, Optional, Sequence
+from backend.applications.trends import rebuild_application_trends, record_application
 from backend.database import db
+from backend.database.reads import Compute, Query, Reader, gather
+from backend.database.sync import ChildSync, SyncResult, column_value
+from backend.database.writes import bump_table_version
+from backend.feedbacks.stats import record_feedback
+from backend.feedbacks.transactions import FEEDBACK_FORMS
+from backend.programs.cache import CachedProgram, program_cache
+from backend.programs.search import search_relevance
+from backend.programs.search_index import program_index
+from backend.users.retention import adjust_user_retention, restore_users_retention, retract_users_retention
 from backend.utilities.errors import DatabaseError, NotFoundError
+from backend.utilities.pagination import CursorPage, Keyset, SortKey
 from mysql.connector import Error as MySQLError
+from decimal import Decimal
+import json
 import uuid
 
 def create_feedback(program_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
     cursor = db.get_db().cursor()
     try:
-        query = '''
-            INSERT INTO feedback_forms (
-                program_id, 
-                user_id, 
-                title, 
-                effectiveness, 
-                experience, 
-                simplicity, 
-                recommendation, 
-                improvement
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        '''
-        values = (
-            program_id, 
-            data['user_id'], 
-            data['title'],
-            data['effectiveness'],
-            data['experience'],
-            data['simplicity'],
-            data['recommendation'],
-            data['improvement']
-        )
-        cursor.execute(query, values)
+        result = FEEDBACK_FORMS.insert(cursor, {
+            'program_id': program_id,
+            'user_id': data['user_id'],
+            'title': data['title'],
+            'effectiveness': data['effectiveness'],
+            'experience': data['experience'],
+            'simplicity': data['simplicity'],
+            'recommendation': data['recommendation'],
+            'improvement': data['improvement']
+        })
+        record_feedback(cursor, program_id, data)
+        adjust_user_retention(cursor, data['user_id'], feedback=data)
         db.get_db().commit()
-        feedback_id = cursor.lastrowid
-
-        cursor.execute('SELECT * FROM feedback_forms WHERE id = %s', (feedback_id,))
-        result = cursor.fetchone()
         return result
 
     except MySQLError as e:
+        db.get_db().rollback()
         raise DatabaseError(str(e))
     finally:
         cursor.close()
@@ -67,7 +66,10 @@ def create_application(program_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
             data.get('decision_date'),
             data.get('decision_notes'),
         ))
+        record_application(cursor, program_id, data.get('status'))
+        adjust_user_retention(cursor, data['user_id'], application_delta=1)
         db.get_db().commit()
+        program_index.refresh([program_id])
         return {"message": "Application created successfully"}
     except Exception as e:
         # wrap any lower‑level error in your own DatabaseError
@@ -75,535 +77,801 @@ def create_application(program_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
     finally:
         cursor.close()
         
-def retrieve_program(program_id: str) -> Dict[str, Any]:
-    cursor = db.get_db().cursor()
-    try:
-        cursor.execute('''
-            SELECT 
-                p.*,
-                o.name as organization_name,
-                GROUP_CONCAT(DISTINCT CONCAT(c.id, ':', c.name)) as categories,
-                GROUP_CONCAT(DISTINCT CONCAT(l.id, ':', l.location_type, ':', l.type, ':', l.address_line1, ':', l.address_line2, ':', l.city, ':', l.state, ':', l.zip_code, ':', l.country, ':', l.is_primary)) as locations,
-                GROUP_CONCAT(DISTINCT CONCAT(
-                    COALESCE(q.name, ''), ':',
-                    COALESCE(q.description, ''), ':',
-                    COALESCE(q.qualification_type, ''), ':',
-                    COALESCE(q.min_value, ''), ':',
-                    COALESCE(q.max_value, ''), ':',
-                    COALESCE(q.text_value, ''), ':',
-                    COALESCE(q.boolean_value, '0')
-                )) as qualifications
-            FROM programs p
-            INNER JOIN organizations o ON p.organization_id = o.id
-            LEFT JOIN program_categories pc ON p.id = pc.program_id
-            LEFT JOIN categories c ON pc.category_id = c.id
-            LEFT JOIN locations l ON p.id = l.entity_id AND l.location_type = 'program'
-            LEFT JOIN qualifications q ON p.id = q.program_id
-            WHERE p.id = %s
-            GROUP BY p.id, p.name, p.description, p.status, p.start_date, p.deadline, p.end_date, p.organization_id, o.name
-        ''', (program_id,))
-        
-        program = cursor.fetchone()
-        
-        if not program:
-            raise NotFoundError(f"Program with id {program_id} not found")
+# Child collections are aggregated into JSON arrays by correlated subqueries,
+# so each program row arrives with structured children in a single round trip
+# instead of delimiter-packed GROUP_CONCAT strings.
+PROGRAM_CHILDREN_COLUMNS = """
+    (
+        SELECT JSON_ARRAYAGG(JSON_OBJECT('id', c.id, 'name', c.name))
+        FROM program_categories pc
+        INNER JOIN categories c ON pc.category_id = c.id
+        WHERE pc.program_id = p.id
+    ) AS categories,
+    (
+        SELECT JSON_ARRAYAGG(JSON_OBJECT(
+            'id', l.id,
+            'location_type', l.location_type,
+            'type', l.type,
+            'address_line1', l.address_line1,
+            'address_line2', l.address_line2,
+            'city', l.city,
+            'state', l.state,
+            'zip_code', l.zip_code,
+            'country', l.country,
+            'is_primary', l.is_primary
+        ))
+        FROM locations l
+        WHERE l.entity_id = p.id AND l.location_type = 'program'
+    ) AS locations,
+    (
+        SELECT JSON_ARRAYAGG(JSON_OBJECT(
+            'name', q.name,
+            'description', q.description,
+            'qualification_type', q.qualification_type,
+            'min_value', q.min_value,
+            'max_value', q.max_value,
+            'text_value', q.text_value,
+            'boolean_value', q.boolean_value
+        ))
+        FROM qualifications q
+        WHERE q.program_id = p.id
+    ) AS qualifications
+"""
+
+# PUTs of a program's children only write the rows that changed (see ChildSync).
+# A location is the same location while its address is; a qualification while its name is.
+PROGRAM_LOCATIONS = ChildSync(
+    'locations',
+    parent=('location_type', 'entity_id'),
+    columns=('type', 'address_line1', 'address_line2', 'city', 'state', 'zip_code', 'country', 'is_primary'),
+    key=('type', 'address_line1', 'address_line2', 'city', 'state', 'zip_code', 'country'),
+    primary_key=('id',)
+)
+PROGRAM_QUALIFICATIONS = ChildSync(
+    'qualifications',
+    parent=('program_id',),
+    columns=('name', 'description', 'qualification_type', 'min_value', 'max_value', 'text_value', 'boolean_value'),
+    key=('name',)
+)
+PROGRAM_CATEGORIES = ChildSync(
+    'program_categories',
+    parent=('program_id',),
+    columns=('category_id',),
+    primary_key=('program_id', 'category_id')
+)
+
+_json_decoder = json.JSONDecoder(parse_float=Decimal)
+
+def _as_bool(value: Any) -> bool | None:
+    return None if value is None else bool(value)
+
+def parse_program_children(program: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Decode the JSON child arrays selected by PROGRAM_CHILDREN_COLUMNS in place.
 
-        # Parse the concatenated strings into proper data structures
-        if program['categories']:
-            program['categories'] = [
-                {'id': cat.split(':')[0], 'name': cat.split(':')[1]}
-                for cat in program['categories'].split(',')
-            ]
-        else:
-            program['categories'] = []
-
-        if program['locations']:
-            program['locations'] = [
-                {
-                    'id': loc.split(':')[0],
-                    'location_type': loc.split(':')[1],
-                    'type': loc.split(':')[2],
-                    'address_line1': loc.split(':')[3],
-                    'address_line2': loc.split(':')[4],
-                    'city': loc.split(':')[5],
-                    'state': loc.split(':')[6],
-                    'zip_code': loc.split(':')[7],
-                    'country': loc.split(':')[8],
-                    'is_primary': loc.split(':')[9] == '1'
-                }
-                for loc in program['locations'].split(',')
-            ]
-        else:
-            program['locations'] = []
-
-        if program['qualifications']:
-            program['qualifications'] = [
-                {
-                    'name': qual.split(':')[0] or None,
-                    'description': qual.split(':')[1] or None,
-                    'qualification_type': qual.split(':')[2] or None,
-                    'min_value': qual.split(':')[3] or None,
-                    'max_value': qual.split(':')[4] or None,
-                    'text_value': qual.split(':')[5] or None,
-                    'boolean_value': qual.split(':')[6] == '1' if qual.split(':')[6] else None
-                }
-                for qual in program['qualifications'].split(',')
-                if any(qual.split(':'))  # Only include if any field is non-empty
-            ]
-        else:
-            program['qualifications'] = []
+    Decimal columns are parsed back into Decimal and MySQL booleans (0/1)
+    into bool, so the result matches what a plain SELECT would return.
+    """
+    for key in ('categories', 'locations', 'qualifications'):
+        raw = program.get(key)
+        program[key] = _json_decoder.decode(raw) if raw else []
 
-        return program
+    for location in program['locations']:
+        location['is_primary'] = _as_bool(location['is_primary'])
+    for qualification in program['qualifications']:
+        qualification['boolean_value'] = _as_bool(qualification['boolean_value'])
 
-    except MySQLError as e:
-        raise DatabaseError(str(e))
-    finally:
-        cursor.close()
+    return program
 
-def update_program_info(program_id: str, data: Dict[str, Any]) -> None:
-    cursor = db.get_db().cursor()
-    try:
-        cursor.execute("START TRANSACTION")
+def retrieve_program(program_id: str) -> Dict[str, Any]:
+    """The program document (with organization name, categories, locations and qualifications)."""
+    return db.read(program_reader(program_id)).document
 
-        update_fields = []
-        update_values = []
-        
-        for field in ['name', 'description', 'status', 'start_date', 'deadline', 'end_date']:
-            if field in data:
-                update_fields.append(f"{field} = %s")
-                update_values.append(data[field])
-        
-        if update_fields:
-            update_values.append(program_id)
-            cursor.execute(
-                f'UPDATE programs SET {", ".join(update_fields)} WHERE id = %s',
-                update_values
-            )
+def get_program_at(program_id: str, version: Optional[Dict[str, Any]]) -> CachedProgram:
+    """
+    The program document and the version it was read at, from the cache when
+    it holds the program at `version` (the probe of get_program_version).
+    """
+    return program_cache.get_or_load(program_id, version, lambda: db.read(program_reader(program_id)))
+
+def program_reader(program_id: str) -> Reader[CachedProgram]:
+    # The version columns are those of program_version_reader, read in the same
+    # statement as the document so the two always agree
+    program = yield Query(f'''
+        SELECT 
+            p.*,
+            o.name as organization_name,
+            UNIX_TIMESTAMP(p.updated_at) AS version_updated_at,
+            UNIX_TIMESTAMP(o.updated_at) AS version_organization_updated_at,
+            {PROGRAM_CHILDREN_COLUMNS}
+        FROM programs p
+        INNER JOIN organizations o ON p.organization_id = o.id
+        WHERE p.id = %s
+    ''', (program_id,), one=True)
+
+    if not program:
+        raise NotFoundError(f"Program with id {program_id} not found")
+
+    version = {
+        'updated_at': program.pop('version_updated_at'),
+        'organization_updated_at': program.pop('version_organization_updated_at')
+    }
+    return CachedProgram(version, parse_program_children(program))
+
+def touch_program(cursor: Any, program_id: str) -> None:
+    """
+    Bump programs.updated_at after writing rows retrieve_program embeds
+    (locations, qualifications, categories), so the program's ETag changes.
+    """
+    cursor.execute('UPDATE programs SET updated_at = CURRENT_TIMESTAMP(6) WHERE id = %s', (program_id,))
+
+def get_program_version(program_id: str) -> Optional[Dict[str, Any]]:
+    """Version probe of retrieve_program: the program's and its organization's updated_at."""
+    return db.read(program_version_reader(program_id))
+
+def program_version_reader(program_id: str) -> Reader[Optional[Dict[str, Any]]]:
+    return (yield Query('''
+        SELECT
+            UNIX_TIMESTAMP(p.updated_at) AS updated_at,
+            UNIX_TIMESTAMP(o.updated_at) AS organization_updated_at
+        FROM programs p
+        INNER JOIN organizations o ON p.organization_id = o.id
+        WHERE p.id = %s
+    ''', (program_id,), one=True))
+
+def get_programs_version(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Version probe of search_program (and its facets).
 
-        db.get_db().commit()
-        return None
+    Child writes touch programs.updated_at, so the programs' table version
+    (bumped by inserts and deletes) and latest update cover every program
+    field, category and location a search reads; a user_id search also
+    depends on that user's applications. Nothing scans the programs table.
+    """
+    return db.read(programs_version_reader(params))
+
+def programs_version_reader(params: Dict[str, Any]) -> Reader[Dict[str, Any]]:
+    query = '''
+        SELECT
+            (SELECT COALESCE(MAX(version), 0) FROM table_versions WHERE table_name = 'programs') AS programs,
+            (SELECT UNIX_TIMESTAMP(MAX(updated_at)) FROM programs) AS updated_at,
+            (SELECT UNIX_TIMESTAMP(MAX(updated_at)) FROM organizations) AS organization_updated_at
+    '''
+    query_params = []
+    if params.get('user_id') is not None:
+        query += ''',
+            (SELECT COUNT(*) FROM applications WHERE user_id = %s) AS applications,
+            (SELECT UNIX_TIMESTAMP(MAX(last_updated)) FROM applications WHERE user_id = %s) AS application_updated_at
+        '''
+        query_params = [params['user_id'], params['user_id']]
+    return (yield Query(query, query_params, one=True))
+
+PROGRAM_FIELDS = ('name', 'description', 'status', 'start_date', 'deadline', 'end_date')
+
+def _write_program_fields(cursor: Any, program_id: str, data: Dict[str, Any]) -> bool:
+    """UPDATE the program columns present in `data`; True if the row changed."""
+    fields = [field for field in PROGRAM_FIELDS if field in data]
+    if not fields:
+        return False
+    cursor.execute(
+        f'UPDATE programs SET {", ".join(f"{field} = %s" for field in fields)} WHERE id = %s',
+        [column_value(data[field]) for field in fields] + [program_id]
+    )
+    return cursor.rowcount > 0
+
+def _replace_locations(cursor: Any, program_id: str, locations: List[Dict[str, Any]]) -> SyncResult:
+    locations = [
+        {**location, 'country': location.get('country', 'United States'), 'is_primary': location.get('is_primary', True)}
+        for location in locations
+    ]
+    return PROGRAM_LOCATIONS.replace(cursor, ('program', program_id), locations)
+
+def _replace_qualifications(cursor: Any, program_id: str, qualifications: List[Dict[str, Any]]) -> SyncResult:
+    return PROGRAM_QUALIFICATIONS.replace(cursor, (program_id,), qualifications)
+
+def _replace_categories(cursor: Any, program_id: str, category_ids: List[str]) -> SyncResult:
+    result = PROGRAM_CATEGORIES.replace(
+        cursor, (program_id,), [{'category_id': category_id} for category_id in dict.fromkeys(category_ids)]
+    )
+    if result.touched:
+        # The trends cube is keyed by category, so re-slice this program's counts
+        rebuild_application_trends(cursor, program_id)
+    return result
+
+# Nested sections of a program document: key -> writer
+PROGRAM_SECTIONS = {
+    'locations': _replace_locations,
+    'qualifications': _replace_qualifications,
+    'category_ids': _replace_categories
+}
+
+def _write_program_document(cursor: Any, program_id: str, data: Dict[str, Any], fields_changed: bool) -> Dict[str, Any]:
+    """
+    Write the nested sections present in `data` and touch the program if any of them changed.
 
-    except MySQLError as e:
-        db.get_db().rollback()
-        raise DatabaseError(str(e))
-    finally:
-        cursor.close()
+    Returns:
+        Dict[str, Any]: Per-section SyncResult counts, plus whether anything changed.
+    """
+    changes: Dict[str, Any] = {}
+    changed = fields_changed
+    for section, replace in PROGRAM_SECTIONS.items():
+        if section in data:
+            result = replace(cursor, program_id, data[section] or [])
+            changes[section] = result.as_dict()
+            changed = changed or result.touched > 0
+    if changed and not fields_changed:
+        touch_program(cursor, program_id)
+    changes['changed'] = changed
+    return changes
 
-def upsert_locations(program_id: str, data: Dict[str, Any]) -> None:
+def update_program_info(program_id: str, data: Dict[str, Any]) -> None:
     cursor = db.get_db().cursor()
     try:
         cursor.execute("START TRANSACTION")
-        
-        cursor.execute('DELETE FROM locations WHERE entity_id = %s AND location_type = %s', (program_id, 'program'))
-        
-        if 'locations' in data and data['locations']:
-            location_values = [
-                (
-                    'program',
-                    program_id,
-                    location['type'],
-                    location.get('address_line1'),
-                    location.get('address_line2'),
-                    location['city'],
-                    location['state'],
-                    location['zip_code'],
-                    location.get('country', 'United States'),
-                    location.get('is_primary', True)
-                )
-                for location in data['locations']
-            ]
-            cursor.executemany('''
-                INSERT INTO locations 
-                (location_type, entity_id, type, address_line1, address_line2, city, state, zip_code, country, is_primary)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ''', location_values)
-        
+        _write_program_fields(cursor, program_id, data)
         db.get_db().commit()
+        program_cache.invalidate([program_id])
+        program_index.refresh([program_id])
         return None
+
     except MySQLError as e:
         db.get_db().rollback()
         raise DatabaseError(str(e))
     finally:
         cursor.close()
 
-def upsert_qualifications(program_id: str, data: Dict[str, Any]) -> None:   
+def _replace_section(program_id: str, section: str, values: List[Any]) -> SyncResult:
     cursor = db.get_db().cursor()
     try:
         cursor.execute("START TRANSACTION")
-        cursor.execute('DELETE FROM qualifications WHERE program_id = %s', (program_id,))
-        if 'qualifications' in data and data['qualifications']:
-            qualification_values = [
-                (
-                    program_id,
-                    qual['name'],
-                    qual['description'],
-                    qual['qualification_type'],
-                    qual.get('min_value'),
-                    qual.get('max_value'),
-                    qual.get('text_value'),
-                    qual.get('boolean_value')
-                )
-                for qual in data['qualifications']
-            ]
-            cursor.executemany('''
-                INSERT INTO qualifications 
-                (program_id, name, description, qualification_type, min_value, max_value, text_value, boolean_value)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ''', qualification_values)
-        
+        result = PROGRAM_SECTIONS[section](cursor, program_id, values)
+        if result.touched:
+            touch_program(cursor, program_id)
         db.get_db().commit()
-        return None
+
+        if result.touched:
+            program_cache.invalidate([program_id])
+            if section != 'qualifications':
+                program_index.refresh([program_id])
+        return result
     except MySQLError as e:
         db.get_db().rollback()
         raise DatabaseError(str(e))
     finally:
         cursor.close()
 
-def upsert_categories(program_id: str, data: Dict[str, Any]) -> None:
+def upsert_locations(program_id: str, data: Dict[str, Any]) -> SyncResult:
+    """Replace a program's locations, writing only the rows that differ."""
+    return _replace_section(program_id, 'locations', data.get('locations') or [])
+
+def upsert_qualifications(program_id: str, data: Dict[str, Any]) -> SyncResult:
+    """Replace a program's qualifications, writing only the rows that differ."""
+    return _replace_section(program_id, 'qualifications', data.get('qualifications') or [])
+
+def upsert_categories(program_id: str, data: Dict[str, Any]) -> SyncResult:
+    """Replace a program's categories, writing only the links that differ."""
+    return _replace_section(program_id, 'category_ids', data.get('category_ids') or [])
+
+def patch_program(program_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply a program document in one transaction: any of the program fields and
+    any of the `locations`, `qualifications` and `category_ids` sections (each
+    replacing that whole list, diffed against the stored rows).
+
+    Returns:
+        Dict[str, Any]: {"program": the updated document, "changes": per-section counts}.
+
+    Raises:
+        NotFoundError: If the program does not exist.
+    """
     cursor = db.get_db().cursor()
     try:
         cursor.execute("START TRANSACTION")
-        cursor.execute('DELETE FROM program_categories WHERE program_id = %s', (program_id,))
-        if 'category_ids' in data and data['category_ids']:
-            category_values = [(program_id, category_id) for category_id in data['category_ids']]
-            cursor.executemany(
-                'INSERT INTO program_categories (program_id, category_id) VALUES (%s, %s)',
-                category_values
-            )
+        cursor.execute('SELECT id FROM programs WHERE id = %s FOR UPDATE', (program_id,))
+        if not cursor.fetchone():
+            raise NotFoundError(f"Program with id {program_id} not found")
+
+        fields_changed = _write_program_fields(cursor, program_id, data)
+        changes = _write_program_document(cursor, program_id, data, fields_changed)
         db.get_db().commit()
-        return None
+
+        if changes['changed']:
+            program_cache.invalidate([program_id])
+            program_index.refresh([program_id])
+        return {'program': retrieve_program(program_id), 'changes': changes}
     except MySQLError as e:
         db.get_db().rollback()
         raise DatabaseError(str(e))
+    except NotFoundError:
+        db.get_db().rollback()
+        raise
     finally:
         cursor.close()
 
 def remove_program(program_id: str) -> None:
     cursor = db.get_db().cursor()
     try:
+        cursor.execute("START TRANSACTION")
+
+        # Applications and feedback go with the program by cascade, so recount their users
+        cursor.execute('''
+            SELECT user_id FROM applications WHERE program_id = %s
+            UNION
+            SELECT user_id FROM feedback_forms WHERE program_id = %s
+        ''', (program_id, program_id))
+        user_ids = [row['user_id'] for row in cursor.fetchall()]
+        retract_users_retention(cursor, user_ids)
+
         cursor.execute('DELETE FROM programs WHERE id = %s', (program_id,))
+        if cursor.rowcount:
+            bump_table_version(cursor, 'programs')
+        restore_users_retention(cursor, user_ids)
         db.get_db().commit()
+        program_cache.invalidate([program_id])
+        program_index.refresh([program_id])
     except MySQLError as e:
         db.get_db().rollback()
         raise DatabaseError(str(e))
     finally:
         cursor.close()
 
-def get_program_feedback(program_id: str, page: int, limit: int) -> List[Dict[str, Any]]:
-    cursor = db.get_db().cursor()
-    try:
-        offset = (page - 1) * limit
-        cursor.execute('''
-            SELECT f.*
-            FROM feedback_forms f
-            INNER JOIN programs p ON f.program_id = p.id
-            WHERE p.id = %s
-            ORDER BY f.created_at DESC
-            LIMIT %s OFFSET %s
-        ''', (program_id, limit, offset))
-        return cursor.fetchall()
-    except MySQLError as e:
-        raise DatabaseError(str(e))
-    finally:
-        cursor.close()
-
-def get_program_profiles(program_id: str, page: int, limit: int) -> List[Dict[str, Any]]:
-    cursor = db.get_db().cursor()
-    try:
-        offset = (page - 1) * limit
-        cursor.execute('''
-            SELECT u.*
-            FROM user_profiles u
-            INNER JOIN applications a ON u.user_id = a.user_id
-            INNER JOIN programs pr ON a.program_id = pr.id
-            WHERE pr.id = %s
-            LIMIT %s OFFSET %s
-        ''', (program_id, limit, offset))
-        return cursor.fetchall()
-    except MySQLError as e:
-        raise DatabaseError(str(e))
-    finally:
-        cursor.close()
+# Sort orders of the program's lists; the paged and the streamed reads share them,
+# so a page's cursor also resumes a stream
+PROGRAM_FEEDBACK_SORT = [
+    SortKey('f.created_at', 'created_at', descending=True),
+    SortKey('f.id', 'id', descending=True)
+]
+PROGRAM_PROFILES_SORT = [SortKey('u.user_id', 'user_id')]
+PROGRAM_APPLICATIONS_SORT = [
+    SortKey('a.applied_at', 'applied_at', descending=True),
+    SortKey('a.id', 'id', descending=True)
+]
+
+def get_program_feedback(program_id: str, page: int, limit: int, page_cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+    return db.read(program_feedback_reader(program_id, page, limit, page_cursor))
+
+def program_feedback_reader(program_id: str, page: int, limit: int, page_cursor: Optional[str] = None) -> Reader[List[Dict[str, Any]]]:
+    keyset = Keyset('program_feedback', PROGRAM_FEEDBACK_SORT, page_cursor)
+    rows = yield _program_feedback_query(program_id, keyset, *keyset.limit(page, limit))
+    return keyset.page(rows, limit)
+
+def get_program_feedback_version(program_id: str) -> Dict[str, Any]:
+    """Version probe of get_program_feedback: the program's feedback count and latest update."""
+    return db.read(program_feedback_version_reader(program_id))
+
+def program_feedback_version_reader(program_id: str) -> Reader[Dict[str, Any]]:
+    return (yield Query(
+        'SELECT COUNT(*) AS feedback, UNIX_TIMESTAMP(MAX(updated_at)) AS updated_at FROM feedback_forms WHERE program_id = %s',
+        (program_id,),
+        one=True
+    ))
+
+def stream_program_feedback(program_id: str, page_cursor: Optional[str] = None) -> Iterator[List[Dict[str, Any]]]:
+    """Every feedback form of the program after `page_cursor`, in page order, in batches read as they are iterated."""
+    return db.stream(_program_feedback_query(program_id, Keyset('program_feedback', PROGRAM_FEEDBACK_SORT, page_cursor)))
+
+def _program_feedback_query(program_id: str, keyset: Keyset, limit_clause: str = '', limit_params: Sequence[Any] = ()) -> Query:
+    where, where_params = keyset.where()
+    order_by, _ = keyset.order_by()
+    return Query(f'''
+        SELECT f.*
+        FROM feedback_forms f
+        INNER JOIN programs p ON f.program_id = p.id
+        WHERE p.id = %s AND {where}
+        {order_by}
+        {limit_clause}
+    ''', [program_id, *where_params, *limit_params])
+
+def get_program_profiles(program_id: str, page: int, limit: int, page_cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+    return db.read(program_profiles_reader(program_id, page, limit, page_cursor))
+
+def program_profiles_reader(program_id: str, page: int, limit: int, page_cursor: Optional[str] = None) -> Reader[List[Dict[str, Any]]]:
+    keyset = Keyset('program_profiles', PROGRAM_PROFILES_SORT, page_cursor)
+    rows = yield _program_profiles_query(program_id, keyset, *keyset.limit(page, limit))
+    return keyset.page(rows, limit)
+
+def stream_program_profiles(program_id: str, page_cursor: Optional[str] = None) -> Iterator[List[Dict[str, Any]]]:
+    """Every applicant profile of the program after `page_cursor`, in page order, in batches read as they are iterated."""
+    return db.stream(_program_profiles_query(program_id, Keyset('program_profiles', PROGRAM_PROFILES_SORT, page_cursor)))
+
+def _program_profiles_query(program_id: str, keyset: Keyset, limit_clause: str = '', limit_params: Sequence[Any] = ()) -> Query:
+    where, where_params = keyset.where()
+    order_by, _ = keyset.order_by()
+    return Query(f'''
+        SELECT u.*
+        FROM user_profiles u
+        INNER JOIN applications a ON u.user_id = a.user_id
+        INNER JOIN programs pr ON a.program_id = pr.id
+        WHERE pr.id = %s AND {where}
+        {order_by}
+        {limit_clause}
+    ''', [program_id, *where_params, *limit_params])
         
-def get_program_applications(program_id: str, page: int, limit: int) -> List[Dict[str, Any]]:
-    cursor = db.get_db().cursor()
-    try:
-        offset = (page - 1) * limit
-        cursor.execute('''
-            SELECT a.*
-            FROM applications a
-            INNER JOIN programs p ON a.program_id = p.id
-            WHERE p.id = %s
-            ORDER BY a.applied_at DESC
-            LIMIT %s OFFSET %s
-        ''', (program_id, limit, offset))
-        return cursor.fetchall()
-    except MySQLError as e:
-        raise DatabaseError(str(e))
-    finally:
-        cursor.close()
+def get_program_applications(program_id: str, page: int, limit: int, page_cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+    return db.read(program_applications_reader(program_id, page, limit, page_cursor))
+
+def program_applications_reader(program_id: str, page: int, limit: int, page_cursor: Optional[str] = None) -> Reader[List[Dict[str, Any]]]:
+    keyset = Keyset('program_applications', PROGRAM_APPLICATIONS_SORT, page_cursor)
+    rows = yield _program_applications_query(program_id, keyset, *keyset.limit(page, limit))
+    return keyset.page(rows, limit)
+
+def stream_program_applications(program_id: str, page_cursor: Optional[str] = None) -> Iterator[List[Dict[str, Any]]]:
+    """Every application to the program after `page_cursor`, in page order, in batches read as they are iterated."""
+    return db.stream(_program_applications_query(program_id, Keyset('program_applications', PROGRAM_APPLICATIONS_SORT, page_cursor)))
+
+def _program_applications_query(program_id: str, keyset: Keyset, limit_clause: str = '', limit_params: Sequence[Any] = ()) -> Query:
+    where, where_params = keyset.where()
+    order_by, _ = keyset.order_by()
+    return Query(f'''
+        SELECT a.*
+        FROM applications a
+        INNER JOIN programs p ON a.program_id = p.id
+        WHERE p.id = %s AND {where}
+        {order_by}
+        {limit_clause}
+    ''', [program_id, *where_params, *limit_params])
 
 def get_program_stats(program_id: str) -> Dict[str, Any] | None:
-    cursor = db.get_db().cursor()
-    try:
-        cursor.execute("""
-            SELECT 
-                program_id,
-                AVG(effectiveness) AS avg_effectiveness,
-                AVG(simplicity) AS avg_simplicity,
-                AVG(recommendation) AS avg_recommendation,
-                AVG(experience) AS avg_experience,
-                COUNT(*) AS total_feedback
-            FROM feedback_forms 
-            WHERE program_id = %s
-            GROUP BY program_id
-        """, (program_id,))
-        result = cursor.fetchone()
-        if not result or result['total_feedback'] == 0:
-            return None
-        return result
-    except MySQLError as e:
-        raise DatabaseError(str(e))
-    finally:
-        cursor.close()
+    return db.read(program_stats_reader(program_id))
+
+def program_stats_reader(program_id: str) -> Reader[Dict[str, Any] | None]:
+    # Served from the program_feedback_stats rollup maintained on feedback writes
+    result = yield Query("""
+        SELECT 
+            program_id,
+            sum_effectiveness / total_feedback AS avg_effectiveness,
+            sum_simplicity / total_feedback AS avg_simplicity,
+            sum_recommendation / total_feedback AS avg_recommendation,
+            sum_experience / total_feedback AS avg_experience,
+            total_feedback
+        FROM program_feedback_stats 
+        WHERE program_id = %s
+    """, (program_id,), one=True)
+    if not result or result['total_feedback'] == 0:
+        return None
+    return result
+
+def get_program_overview(program_id: str, limit: int) -> Dict[str, Any]:
+    return db.read(program_overview_reader(program_id, limit))
+
+def program_overview_reader(program_id: str, limit: int) -> Reader[Dict[str, Any]]:
+    """
+    A program's first page of applications, its feedback stats and the first
+    page of applicant profiles. The three reads are independent (gathered).
+    """
+    applications, feedback_stats, profiles = yield from gather(
+        program_applications_reader(program_id, 1, limit),
+        program_stats_reader(program_id),
+        program_profiles_reader(program_id, 1, limit)
+    )
+    return {
+        'program_id': program_id,
+        'applications': applications,
+        'applications_next_cursor': applications.next_cursor,
+        'feedback_stats': feedback_stats,
+        'profiles': profiles,
+        'profiles_next_cursor': profiles.next_cursor
+    }
         
-def get_program_trends(page: int, limit: int) -> List[Dict[str, Any]]:
-    cursor = db.get_db().cursor()
-    try:
-        offset = (page - 1) * limit
-        cursor.execute('''
-            SELECT 
-                p.id AS program_id, 
-                p.name AS program_name, 
-                c.name AS category_name, 
-                DATE_FORMAT(a.applied_at, '%%Y-%%m') AS application_month, 
-                COUNT(a.id) AS application_count, 
-                SUM(CASE WHEN a.status = 'approved' THEN 1 ELSE 0 END) AS approved_count, 
-                SUM(CASE WHEN a.status = 'rejected' THEN 1 ELSE 0 END) AS rejected_count 
-            FROM programs p 
-            INNER JOIN applications a ON p.id = a.program_id 
-            INNER JOIN program_categories pc ON p.id = pc.program_id 
-            INNER JOIN categories c ON pc.category_id = c.id 
-            WHERE a.applied_at >= DATE_SUB(CURRENT_DATE(), INTERVAL 24 MONTH) 
-            GROUP BY p.id, p.name, c.name, DATE_FORMAT(a.applied_at, '%%Y-%%m') 
-            ORDER BY p.name, application_month
-            LIMIT %s OFFSET %s
-        ''', (limit, offset))
-        return cursor.fetchall()
-    except MySQLError as e:
-        raise DatabaseError(str(e))
-    finally:
-        cursor.close()
+def get_program_trends(page: int, limit: int, page_cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+    return db.read(program_trends_reader(page, limit, page_cursor))
+
+# Sort order of /programs/trends, also the order of the trends export
+PROGRAM_TRENDS_SORT = [
+    SortKey('p.name', 'program_name'),
+    SortKey('p.id', 'program_id'),
+    SortKey('t.application_month', 'application_month'),
+    SortKey('c.name', 'category_name'),
+    SortKey('c.id', 'category_id')
+]
+
+def program_trends_reader(page: int, limit: int, page_cursor: Optional[str] = None) -> Reader[List[Dict[str, Any]]]:
+    keyset = Keyset('program_trends', PROGRAM_TRENDS_SORT, page_cursor)
+    rows = yield program_trends_query(keyset, *keyset.limit(page, limit))
+    return keyset.page(rows, limit)
+
+def program_trends_query(keyset: Keyset, limit_clause: str = '', limit_params: Sequence[Any] = ()) -> Query:
+    # Served from the program_application_trends cube maintained on application writes
+    where, where_params = keyset.where()
+    order_by, _ = keyset.order_by()
+    return Query(f'''
+        SELECT 
+            p.id AS program_id, 
+            p.name AS program_name, 
+            c.id AS category_id, 
+            c.name AS category_name, 
+            t.application_month, 
+            t.application_count, 
+            t.approved_count, 
+            t.rejected_count 
+        FROM program_application_trends t 
+        INNER JOIN programs p ON t.program_id = p.id 
+        INNER JOIN categories c ON t.category_id = c.id 
+        WHERE t.application_month >= DATE_FORMAT(DATE_SUB(CURRENT_DATE(), INTERVAL 24 MONTH), '%%Y-%%m') 
+            AND t.application_count > 0 
+            AND {where}
+        {order_by}
+        {limit_clause}
+    ''', [*where_params, *limit_params])
         
 def get_program_retention(page: int, limit: int) -> List[Dict[str, Any]]:
-    cursor = db.get_db().cursor()
-    try:
-        offset = (page - 1) * limit
-        cursor.execute('''
-            SELECT 
-                CASE WHEN app_count.application_count > 1 
-                    THEN 'Returned users' 
-                    ELSE 'One-time users' 
-                END AS user_type, 
-                AVG(f.effectiveness) AS avg_effectiveness_rating, 
-                AVG(f.experience) AS avg_experience_rating, 
-                AVG(f.simplicity) AS avg_simplicity_rating, 
-                AVG(f.recommendation) AS avg_recommendation_rating, 
-                COUNT(DISTINCT f.user_id) AS user_count 
-            FROM feedback_forms f 
-            INNER JOIN (
-                SELECT user_id, COUNT(id) AS application_count 
-                FROM applications 
-                GROUP BY user_id 
-            ) app_count ON f.user_id = app_count.user_id 
-            GROUP BY user_type
-            LIMIT %s OFFSET %s
-        ''', (limit, offset))
-        return cursor.fetchall()
-    except MySQLError as e:
-        raise DatabaseError(str(e))
-    finally:
-        cursor.close()
+    return db.read(program_retention_reader(page, limit))
+
+def program_retention_reader(page: int, limit: int) -> Reader[List[Dict[str, Any]]]:
+    offset = (page - 1) * limit
+    # Served from the retention_stats buckets maintained on application and feedback writes
+    return (yield Query('''
+        SELECT 
+            user_type, 
+            sum_effectiveness / feedback_count AS avg_effectiveness_rating, 
+            sum_experience / feedback_count AS avg_experience_rating, 
+            sum_simplicity / feedback_count AS avg_simplicity_rating, 
+            sum_recommendation / feedback_count AS avg_recommendation_rating, 
+            user_count 
+        FROM retention_stats 
+        WHERE user_count > 0
+        ORDER BY user_type
+        LIMIT %s OFFSET %s
+    ''', (limit, offset)))
+
+def _programs_by_ids(program_ids: List[str]) -> Reader[List[Dict[str, Any]]]:
+    """Read programs in the shape search_program returns them, keeping the order of `program_ids`."""
+    if not program_ids:
+        return []
+    rows = yield Query(f"""
+        SELECT 
+            p.id, 
+            p.name, 
+            p.description, 
+            p.status, 
+            p.start_date, 
+            p.deadline, 
+            p.end_date, 
+            o.name as organization_name,
+            {PROGRAM_CHILDREN_COLUMNS}
+        FROM programs p
+        INNER JOIN organizations o ON p.organization_id = o.id
+        WHERE p.id IN ({', '.join(['%s'] * len(program_ids))})
+    """, program_ids)
+    programs = {row['id']: parse_program_children(dict(row)) for row in rows}
+    return [programs[program_id] for program_id in program_ids if program_id in programs]
+
+def _search_filters(params: Dict[str, Any], relevance: Any, exclude: tuple = ()) -> tuple[str, List[Any]]:
+    """
+    Build the search_program WHERE conditions (aliases `p` and `o`), each prefixed with AND.
 
-def search_program(params: Dict[str, Any]) -> List[Dict[str, Any]]:
-    cursor = db.get_db().cursor()
-    try:
-        query = """
-            SELECT 
-                p.id, 
-                p.name, 
-                p.description, 
-                p.status, 
-                p.start_date, 
-                p.deadline, 
-                p.end_date, 
-                o.name as organization_name,
-                GROUP_CONCAT(DISTINCT CONCAT(c.id, ':', c.name)) as categories,
-                GROUP_CONCAT(DISTINCT CONCAT(l.id, ':', l.location_type, ':', l.type, ':', l.address_line1, ':', l.address_line2, ':', l.city, ':', l.state, ':', l.zip_code, ':', l.country, ':', l.is_primary)) as locations,
-                GROUP_CONCAT(DISTINCT CONCAT(
-                    COALESCE(q.name, ''), ':',
-                    COALESCE(q.description, ''), ':',
-                    COALESCE(q.qualification_type, ''), ':',
-                    COALESCE(q.min_value, ''), ':',
-                    COALESCE(q.max_value, ''), ':',
-                    COALESCE(q.text_value, ''), ':',
-                    COALESCE(q.boolean_value, '0')
-                )) as qualifications
-            FROM programs p
-            INNER JOIN organizations o ON p.organization_id = o.id
-            LEFT JOIN program_categories pc ON p.id = pc.program_id
-            LEFT JOIN categories c ON pc.category_id = c.id
-            LEFT JOIN locations l ON p.id = l.entity_id AND l.location_type = 'program'
-            LEFT JOIN qualifications q ON p.id = q.program_id
-            WHERE 1=1
-            GROUP BY p.id, p.name, p.description, p.status, p.start_date, p.deadline, p.end_date, o.name
+    `exclude` names filters to leave out ('categories', 'location'), for facet counts.
+    """
+    query = ""
+    query_params = []
+
+    # Handle user_id if present and not None
+    if params.get('user_id') is not None:
+        query += " AND EXISTS (SELECT 1 FROM applications a WHERE a.program_id = p.id AND a.user_id = %s)"
+        query_params.append(params['user_id'])
+
+    # Handle search query if present
+    if relevance:
+        query += f" AND {relevance.match}"
+        query_params.extend(relevance.match_params)
+
+    # Handle categories if present and not empty
+    categories = params.get('categories', [])
+    if categories and 'categories' not in exclude:
+        query += """
+            AND EXISTS (
+                SELECT 1 FROM program_categories fpc
+                WHERE fpc.program_id = p.id AND fpc.category_id IN (%s)
+            )
+        """ % ','.join(['%s'] * len(categories))
+        query_params.extend(categories)
+
+    # Handle location if present and not None
+    location = params.get('location')
+    if location is not None and 'location' not in exclude:
+        location_conditions = []
+        if location.get('city'):
+            location_conditions.append("fl.city = %s")
+            query_params.append(location['city'])
+        if location.get('state'):
+            location_conditions.append("fl.state = %s")
+            query_params.append(location['state'])
+        if location.get('zip_code'):
+            location_conditions.append("fl.zip_code = %s")
+            query_params.append(location['zip_code'])
+        if location.get('country'):
+            location_conditions.append("fl.country = %s")
+            query_params.append(location['country'])
+
+        # Without any location conditions this only ensures the program has a location
+        query += """
+            AND EXISTS (
+                SELECT 1 FROM locations fl
+                WHERE fl.entity_id = p.id AND fl.location_type = 'program'
         """
-        query_params = []
-
-        # Handle user_id if present and not None
-        if params.get('user_id') is not None:
-            query += " AND EXISTS (SELECT 1 FROM applications a WHERE a.program_id = p.id AND a.user_id = %s)"
-            query_params.append(params['user_id'])
-
-        # Handle search query if present
-        if params.get('search_query'):
-            query += """
-                AND (
-                    CASE 
-                        WHEN p.name LIKE %s THEN 3  -- Exact match at start
-                        WHEN p.name LIKE %s THEN 2  -- Contains match
-                        WHEN p.description LIKE %s THEN 1  -- Description match
-                        WHEN o.name LIKE %s THEN 1  -- Organization match
-                        ELSE 0
-                    END > 0
-                )
-            """
-            exact_term = f"{params['search_query']}%"
-            contains_term = f"%{params['search_query']}%"
-            query_params.extend([exact_term, contains_term, contains_term, contains_term])
-
-        # Handle categories if present and not empty
-        categories = params.get('categories', [])
-        if categories:
-            query += " AND c.id IN (%s)" % ','.join(['%s'] * len(categories))
-            query_params.extend(categories)
-
-        # Handle location if present and not None
-        location = params.get('location')
-        if location is not None:
-            location_conditions = []
-            if location.get('city'):
-                location_conditions.append("l.city = %s")
-                query_params.append(location['city'])
-            if location.get('state'):
-                location_conditions.append("l.state = %s")
-                query_params.append(location['state'])
-            if location.get('zip_code'):
-                location_conditions.append("l.zip_code = %s")
-                query_params.append(location['zip_code'])
-            if location.get('country'):
-                location_conditions.append("l.country = %s")
-                query_params.append(location['country'])
-            
-            if location_conditions:
-                query += " AND (" + " OR ".join(location_conditions) + ")"
-            else:
-                # If no location conditions were added, we need to ensure we only get programs with locations
-                query += " AND l.id IS NOT NULL"
-
-        # Handle sorting and search relevance
-        if params.get('search_query'):
-            # Add search relevance ordering
-            query += """
-                ORDER BY 
-                    CASE 
-                        WHEN p.name LIKE %s THEN 3
-                        WHEN p.name LIKE %s THEN 2
-                        WHEN p.description LIKE %s THEN 1
-                        WHEN o.name LIKE %s THEN 1
-                        ELSE 0
-                    END DESC,
-                    p.name ASC
-            """
-            query_params.extend([exact_term, contains_term, contains_term, contains_term])
-        else:
-            # Default sorting if no search query
-            sort_field = params.get('sort_by', 'name')
-            sort_order = params.get('sort_order', 'ASC')
-            query += f" ORDER BY p.{sort_field} {sort_order}"
-
-        # Handle pagination
-        page = params.get('page', 1)
-        limit = params.get('limit', 10)
-        offset = (page - 1) * limit
-        query += " LIMIT %s OFFSET %s"
-        query_params.extend([limit, offset])
-
-        cursor.execute(query, query_params)
-        results = cursor.fetchall()
-        
-        # Parse the concatenated strings into proper data structures
-        parsed_results = []
-        for row in results:
-            program = dict(row)
-            
-            # Parse categories
-            if program['categories']:
-                program['categories'] = [
-                    {'id': cat.split(':')[0], 'name': cat.split(':')[1]}
-                    for cat in program['categories'].split(',')
-                ]
-            else:
-                program['categories'] = []
-
-            # Parse locations
-            if program['locations']:
-                program['locations'] = [
-                    {
-                        'id': loc.split(':')[0],
-                        'location_type': loc.split(':')[1],
-                        'type': loc.split(':')[2],
-                        'address_line1': loc.split(':')[3],
-                        'address_line2': loc.split(':')[4],
-                        'city': loc.split(':')[5],
-                        'state': loc.split(':')[6],
-                        'zip_code': loc.split(':')[7],
-                        'country': loc.split(':')[8],
-                        'is_primary': loc.split(':')[9] == '1'
-                    }
-                    for loc in program['locations'].split(',')
-                ]
-            else:
-                program['locations'] = []
-
-            # Parse qualifications
-            if program['qualifications']:
-                program['qualifications'] = [
-                    {
-                        'name': qual.split(':')[0] or None,
-                        'description': qual.split(':')[1] or None,
-                        'qualification_type': qual.split(':')[2] or None,
-                        'min_value': qual.split(':')[3] or None,
-                        'max_value': qual.split(':')[4] or None,
-                        'text_value': qual.split(':')[5] or None,
-                        'boolean_value': qual.split(':')[6] == '1' if qual.split(':')[6] else None
-                    }
-                    for qual in program['qualifications'].split(',')
-                    if any(qual.split(':'))  # Only include if any field is non-empty
-                ]
-            else:
-                program['qualifications'] = []
-
-            parsed_results.append(program)
-
-        return parsed_results
+        if location_conditions:
+            query += " AND (" + " OR ".join(location_conditions) + ")"
+        query += ")"
 
-    except MySQLError as e:
-        raise DatabaseError(str(e))
-    finally:
-        cursor.close()
+    return query, query_params
+
+def search_program(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return db.read(search_program_reader(params))
+
+def search_program_reader(params: Dict[str, Any]) -> Reader[List[Dict[str, Any]]]:
+    # The in-process index picks the page; MySQL only reads those programs.
+    # Until the index is loaded the SQL below answers, with fulltext matching.
+    if params.get('search_mode') == 'index':
+        # Ranking is CPU-bound: the async path runs it in a thread
+        page = yield Compute(program_index.search, (params,))
+        if page is not None:
+            result = CursorPage((yield from _programs_by_ids(page)))
+            result.next_cursor = page.next_cursor
+            return result
+
+    search_query = params.get('search_query')
+    relevance = search_relevance(search_query, params.get('search_mode')) if search_query else None
+
+    query = f"""
+        SELECT 
+            p.id, 
+            p.name, 
+            p.description, 
+            p.status, 
+            p.start_date, 
+            p.deadline, 
+            p.end_date, 
+            o.name as organization_name,
+            {f'{relevance.rank} AS search_rank,' if relevance else ''}
+            {PROGRAM_CHILDREN_COLUMNS}
+        FROM programs p
+        INNER JOIN organizations o ON p.organization_id = o.id
+        WHERE 1=1
+    """
+    query_params = list(relevance.rank_params) if relevance else []
+
+    filters, filter_params = _search_filters(params, relevance)
+    query += filters
+    query_params.extend(filter_params)
+
+    # Handle sorting and search relevance. The sort keys double as the
+    # keyset, so a cursor resumes right after the last row it was issued for.
+    if relevance:
+        keyset = Keyset(f'programs:relevance:{relevance.mode}', [
+            SortKey(relevance.rank, 'search_rank', descending=True, params=relevance.rank_params, hidden=True),
+            SortKey('p.name', 'name'),
+            SortKey('p.id', 'id')
+        ], params.get('cursor'))
+    else:
+        # Default sorting if no search query
+        sort_field = params.get('sort_by', 'name')
+        descending = params.get('sort_order', 'asc').lower() == 'desc'
+        keyset = Keyset(f"programs:{sort_field}:{'desc' if descending else 'asc'}", [
+            SortKey(f'p.{sort_field}', sort_field, descending=descending),
+            SortKey('p.id', 'id', descending=descending)
+        ], params.get('cursor'))
+
+    where, where_params = keyset.where()
+    query += f" AND {where}"
+    query_params.extend(where_params)
+    order_by, order_params = keyset.order_by()
+    query += order_by
+    query_params.extend(order_params)
+
+    # Handle pagination
+    page = params.get('page', 1)
+    limit = params.get('limit', 10)
+    limit_clause, limit_params = keyset.limit(page, limit)
+    query += limit_clause
+    query_params.extend(limit_params)
+
+    rows = yield Query(query, query_params)
+    return keyset.page([parse_program_children(dict(row)) for row in rows], limit)
+
+# Facet counts ignore their own filter, so every value of a facet can be
+# offered alongside the selected ones: category counts ignore `categories`
+# and state counts ignore `location`.
+FACET_EXCLUDES = {
+    'category': ('categories',),
+    'state': ('location',),
+    'status': ()
+}
+
+FACET_QUERIES = {
+    'category': """
+        SELECT 'category' AS facet, c.id AS value, c.name AS label, COUNT(DISTINCT p.id) AS count
+        FROM programs p
+        INNER JOIN organizations o ON p.organization_id = o.id
+        INNER JOIN program_categories pc ON pc.program_id = p.id
+        INNER JOIN categories c ON c.id = pc.category_id
+        WHERE 1=1 {filters}
+        GROUP BY c.id, c.name
+    """,
+    'state': """
+        SELECT 'state' AS facet, MIN(l.state) AS value, MIN(l.state) AS label, COUNT(DISTINCT p.id) AS count
+        FROM programs p
+        INNER JOIN organizations o ON p.organization_id = o.id
+        INNER JOIN locations l ON l.entity_id = p.id AND l.location_type = 'program' AND l.state IS NOT NULL
+        WHERE 1=1 {filters}
+        GROUP BY l.state
+    """,
+    'status': """
+        SELECT 'status' AS facet, p.status AS value, p.status AS label, COUNT(*) AS count
+        FROM programs p
+        INNER JOIN organizations o ON p.organization_id = o.id
+        WHERE 1=1 {filters}
+        GROUP BY p.status
+    """
+}
+
+def _facet_entry(facet: str, value: Any, label: Any, count: int) -> Dict[str, Any]:
+    if facet == 'category':
+        return {'id': value, 'name': label, 'count': count}
+    return {'value': label, 'count': count}
+
+def get_program_facets(params: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Count the programs matching a search_program query per category, state and status.
+
+    Answered from the search index's bitmaps with search_mode=index, otherwise
+    with a single UNION ALL query over the requested facets.
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: facet -> entries, most common first.
+    """
+    return db.read(program_facets_reader(params))
+
+def program_facets_reader(params: Dict[str, Any]) -> Reader[Dict[str, List[Dict[str, Any]]]]:
+    requested = [facet for facet in FACET_QUERIES if facet in (params.get('facets') or [])]
+    if not requested:
+        return {}
+
+    counts = None
+    if params.get('search_mode') == 'index':
+        counts = yield Compute(program_index.facet_counts, (params, {facet: FACET_EXCLUDES[facet] for facet in requested}))
+
+    if counts is not None:
+        # The index counts category ids; one query names them
+        category_ids = [value for value, _, _ in counts.get('category', [])]
+        if category_ids:
+            rows = yield Query(
+                f"SELECT id, name FROM categories WHERE id IN ({', '.join(['%s'] * len(category_ids))})",
+                category_ids
+            )
+            names = {row['id']: row['name'] for row in rows}
+            counts['category'] = [
+                (value, names[value], count) for value, _, count in counts['category'] if value in names
+            ]
+    else:
+        search_query = params.get('search_query')
+        relevance = search_relevance(search_query, params.get('search_mode')) if search_query else None
+        queries, query_params = [], []
+        for facet in requested:
+            filters, filter_params = _search_filters(params, relevance, FACET_EXCLUDES[facet])
+            queries.append(FACET_QUERIES[facet].format(filters=filters))
+            query_params.extend(filter_params)
+        rows = yield Query(' UNION ALL '.join(f'({query})' for query in queries), query_params)
+
+        counts = {facet: [] for facet in requested}
+        for row in rows:
+            counts[row['facet']].append((row['value'], row['label'], row['count']))
+
+    return {
+        facet: [
+            _facet_entry(facet, value, label, count)
+            for value, label, count in sorted(entries, key=lambda entry: (-entry[2], str(entry[1]).casefold()))
+        ]
+        for facet, entries in counts.items()
+    }
 
 def create_program(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Create a program, with any `locations`, `qualifications` and `category_ids`
+    sections, in one transaction.
+
+    Returns:
+        Dict[str, Any]: The created program document.
+    """
     cursor = db.get_db().cursor()
     try:
         cursor.execute("START TRANSACTION")
@@ -620,14 +888,17 @@ def create_program(data: Dict[str, Any]) -> Dict[str, Any]:
             program_id,
             data['name'],
             data['description'],
-            data.get('status', 'active'),
+            column_value(data.get('status', 'open')),
             data['start_date'],
             data['deadline'],
             data.get('end_date'),
             data['organization_id']
         ))
+        bump_table_version(cursor, 'programs')
+        _write_program_document(cursor, program_id, data, fields_changed=True)
         
         db.get_db().commit()
+        program_index.refresh([program_id])
         
         # Return the created program
         return retrieve_program(program_id)
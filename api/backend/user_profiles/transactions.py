@@ -2,9 +2,22 @@ from typing import Dict, Any, Optional
 
 from pymysql import MySQLError
 from backend.database import db
+from backend.database.writes import RowWriter
 from backend.utilities.errors import DatabaseError, NotFoundError
 import pymysql.cursors
 
+USER_PROFILES = RowWriter(
+    'user_profiles',
+    columns=(
+        'user_id', 'date_of_birth', 'gender', 'income', 'education_level', 'employment_status',
+        'veteran_status', 'disability_status', 'ssn', 'verification_status', 'verification_date', 'last_updated'
+    ),
+    key='user_id',
+    generate_key=False,
+    defaults={'veteran_status': 0, 'disability_status': 0, 'verification_status': 'unverified'},
+    updated={'last_updated': 0}
+)
+
 def insert_user_profile(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Insert a new user profile record into the database.
@@ -126,32 +139,21 @@ def update_user_profile(user_id: str, update_data: Dict[str, Any]) -> Dict[str,
     """
     cursor = db.get_db().cursor()
     try:
-        update_fields = []
-        values = []
         # Define the allowed fields for the update.
         allowed_fields = [
             'date_of_birth', 'gender', 'income', 'education_level',
             'employment_status', 'veteran_status', 'disability_status',
             'ssn', 'verification_status', 'verification_date'
         ]
-        for field in allowed_fields:
-            if field in update_data:
-                update_fields.append(f"{field} = %s")
-                values.append(update_data[field])
-        if not update_fields:
+        changes = {field: update_data[field] for field in allowed_fields if field in update_data}
+        if not changes:
             raise DatabaseError("No valid fields to update")
-        # Append the user_id for the WHERE clause.
-        values.append(user_id)
-        query = f"UPDATE user_profiles SET {', '.join(update_fields)} WHERE user_id = %s"
-        cursor.execute(query, values)
-        db.get_db().commit()
-        
-        # Fetch the updated user profile record.
-        cursor.execute("SELECT * FROM user_profiles WHERE user_id = %s", (user_id,))
-        result = cursor.fetchone()
-        if not result:
+        update = USER_PROFILES.update(cursor, user_id, changes)
+        if not update:
+            db.get_db().rollback()
             raise NotFoundError(f"User profile with id {user_id} does not exist")
-        return result
+        db.get_db().commit()
+        return update.row
     except MySQLError as e:
         raise DatabaseError(str(e))
     finally:
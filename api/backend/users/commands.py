@@ -0,0 +1,10 @@
+import click
+from flask.cli import with_appcontext
+from backend.users.transactions import rebuild_user_retention_stats
+
+@click.command('rebuild-retention-stats')
+@with_appcontext
+def rebuild_retention_stats_command() -> None:
+    """Recompute the user retention rollups from applications and feedback_forms."""
+    rebuild_user_retention_stats()
+    click.echo("Rebuilt user retention stats")
@@ -1,5 +1,5 @@
 from typing import Any, Tuple
-from backend.utilities.pagination import validate_pagination
+from backend.utilities.pagination import jsonify_page, validate_cursor, validate_pagination
 from flask import Blueprint, request, jsonify, Response
 from backend.validators.users import UserSchema, UserUpdateSchema
 from backend.users.transactions import (
@@ -52,8 +52,8 @@ def get_all_users() -> Tuple[Response, int]:
     try:
         # Validate the pagination parameters
         page, limit = validate_pagination()
-        users = get_users(page, limit)
-        return jsonify(users), HTTPStatus.OK
+        users = get_users(page, limit, validate_cursor())
+        return jsonify_page(users), HTTPStatus.OK
     except Exception as e:
         return handle_error(e)
 
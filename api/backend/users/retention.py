@@ -0,0 +1,216 @@
+#------------------------------------------------------------
+# Maintenance of the user retention rollups
+#
+# user_retention_stats keeps, per user, how many applications they submitted
+# and the running sums of their feedback ratings. retention_stats keeps the
+# same sums per bucket ("One-time users" / "Returned users"), so the
+# retention endpoint reads two rows instead of grouping applications.
+#
+# A user counts towards a bucket once they have at least one application and
+# one feedback form. Every helper runs on the caller's cursor and leaves the
+# commit to the caller.
+#------------------------------------------------------------
+from typing import Any, Dict, List, Optional
+
+from backend.feedbacks.stats import RATING_COLUMNS
+
+ONE_TIME_USERS = 'One-time users'
+RETURNED_USERS = 'Returned users'
+
+_BUCKET_SQL = f"CASE WHEN application_count > 1 THEN '{RETURNED_USERS}' ELSE '{ONE_TIME_USERS}' END"
+_SUM_COLUMNS = [f'sum_{column}' for column in RATING_COLUMNS]
+_COUNTER_COLUMNS = ['application_count', 'feedback_count', *_SUM_COLUMNS]
+
+def _contribution(row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Return what a user's row adds to its bucket, or None if it adds nothing."""
+    if not row or row['application_count'] < 1 or row['feedback_count'] < 1:
+        return None
+    return {
+        'user_type': RETURNED_USERS if row['application_count'] > 1 else ONE_TIME_USERS,
+        'user_count': 1,
+        'feedback_count': row['feedback_count'],
+        **{column: row[column] for column in _SUM_COLUMNS}
+    }
+
+def _add_to_bucket(cursor: Any, contribution: Optional[Dict[str, Any]], sign: int) -> None:
+    if not contribution:
+        return
+    cursor.execute(f'''
+        UPDATE retention_stats
+        SET
+            user_count = user_count + %s,
+            feedback_count = feedback_count + %s,
+            {', '.join(f'{column} = {column} + %s' for column in _SUM_COLUMNS)}
+        WHERE user_type = %s
+    ''', (
+        sign * contribution['user_count'],
+        sign * contribution['feedback_count'],
+        *(sign * contribution[column] for column in _SUM_COLUMNS),
+        contribution['user_type']
+    ))
+
+def adjust_user_retention(
+    cursor: Any,
+    user_id: str,
+    application_delta: int = 0,
+    feedback: Optional[Dict[str, Any]] = None,
+    feedback_sign: int = 1
+) -> None:
+    """
+    Apply one user's application and/or feedback change to both rollups.
+
+    Args:
+        application_delta: Change in the user's number of applications.
+        feedback: A feedback form (its rating columns) added or removed for the user.
+        feedback_sign: 1 when `feedback` was added, -1 when it was removed.
+    """
+    cursor.execute(f'''
+        SELECT user_id, application_count, feedback_count, {', '.join(_SUM_COLUMNS)}
+        FROM user_retention_stats
+        WHERE user_id = %s
+        FOR UPDATE
+    ''', (user_id,))
+    current = cursor.fetchone()
+    updated = dict(current) if current else {
+        'user_id': user_id,
+        'application_count': 0,
+        'feedback_count': 0,
+        **{column: 0 for column in _SUM_COLUMNS}
+    }
+
+    updated['application_count'] += application_delta
+    if feedback:
+        updated['feedback_count'] += feedback_sign
+        for column in RATING_COLUMNS:
+            updated[f'sum_{column}'] += feedback_sign * feedback[column]
+
+    cursor.execute(f'''
+        INSERT INTO user_retention_stats (user_id, application_count, feedback_count, {', '.join(_SUM_COLUMNS)})
+        VALUES (%s, %s, %s, {', '.join(['%s'] * len(_SUM_COLUMNS))}) AS new
+        ON DUPLICATE KEY UPDATE
+            application_count = new.application_count,
+            feedback_count = new.feedback_count,
+            {', '.join(f'{column} = new.{column}' for column in _SUM_COLUMNS)}
+    ''', (
+        user_id,
+        updated['application_count'],
+        updated['feedback_count'],
+        *(updated[column] for column in _SUM_COLUMNS)
+    ))
+
+    before, after = _contribution(current), _contribution(updated)
+    if before != after:
+        _add_to_bucket(cursor, before, -1)
+        _add_to_bucket(cursor, after, 1)
+
+def retract_user_retention(cursor: Any, user_id: str) -> None:
+    """Remove a user from the buckets before the user (and, by cascade, their row) is deleted."""
+    cursor.execute(f'''
+        SELECT user_id, application_count, feedback_count, {', '.join(_SUM_COLUMNS)}
+        FROM user_retention_stats
+        WHERE user_id = %s
+        FOR UPDATE
+    ''', (user_id,))
+    _add_to_bucket(cursor, _contribution(cursor.fetchone()), -1)
+
+def _user_filter(column: str, user_ids: Optional[List[str]]) -> tuple[str, List[str]]:
+    if user_ids is None:
+        return '1=1', []
+    if not user_ids:
+        return '1=0', []
+    return f"{column} IN ({', '.join(['%s'] * len(user_ids))})", list(user_ids)
+
+def _apply_bucket_totals(cursor: Any, user_ids: Optional[List[str]], sign: int) -> None:
+    user_filter, params = _user_filter('user_id', user_ids)
+    cursor.execute(f'''
+        UPDATE retention_stats b
+        INNER JOIN (
+            SELECT
+                {_BUCKET_SQL} AS user_type,
+                COUNT(*) AS user_count,
+                SUM(feedback_count) AS feedback_count,
+                {', '.join(f'SUM({column}) AS {column}' for column in _SUM_COLUMNS)}
+            FROM user_retention_stats
+            WHERE application_count > 0 AND feedback_count > 0 AND {user_filter}
+            GROUP BY user_type
+        ) u ON b.user_type = u.user_type
+        SET
+            b.user_count = b.user_count + %s * u.user_count,
+            b.feedback_count = b.feedback_count + %s * u.feedback_count,
+            {', '.join(f'b.{column} = b.{column} + %s * u.{column}' for column in _SUM_COLUMNS)}
+    ''', (*params, sign, sign, *([sign] * len(_SUM_COLUMNS))))
+
+def _recount_users(cursor: Any, user_ids: Optional[List[str]]) -> None:
+    user_filter, params = _user_filter('user_id', user_ids)
+    cursor.execute(f'DELETE FROM user_retention_stats WHERE {user_filter}', params)
+
+    user_filter, params = _user_filter('u.id', user_ids)
+    cursor.execute(f'''
+        INSERT INTO user_retention_stats (user_id, application_count, feedback_count, {', '.join(_SUM_COLUMNS)})
+        SELECT
+            u.id,
+            COALESCE(a.application_count, 0),
+            COALESCE(f.feedback_count, 0),
+            {', '.join(f'COALESCE(f.{column}, 0)' for column in _SUM_COLUMNS)}
+        FROM users u
+        LEFT JOIN (
+            SELECT user_id, COUNT(*) AS application_count
+            FROM applications
+            GROUP BY user_id
+        ) a ON a.user_id = u.id
+        LEFT JOIN (
+            SELECT
+                user_id,
+                COUNT(*) AS feedback_count,
+                {', '.join(f'SUM({column}) AS sum_{column}' for column in RATING_COLUMNS)}
+            FROM feedback_forms
+            GROUP BY user_id
+        ) f ON f.user_id = u.id
+        WHERE {user_filter} AND (a.user_id IS NOT NULL OR f.user_id IS NOT NULL)
+    ''', params)
+
+def adjust_users_retention(cursor: Any, deltas: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Apply the changes of many users to both rollups with a fixed number of statements.
+
+    `deltas` maps a user id to what is added to its counters (application_count,
+    feedback_count and the sum_ columns; missing ones count as 0). Batch writes
+    use it instead of one adjust_user_retention call per user.
+    """
+    user_ids = list(deltas)
+    if not user_ids:
+        return
+    user_filter, params = _user_filter('user_id', user_ids)
+    cursor.execute(f'SELECT user_id FROM user_retention_stats WHERE {user_filter} FOR UPDATE', params)
+
+    _apply_bucket_totals(cursor, user_ids, -1)
+    row = f"(%s, {', '.join(['%s'] * len(_COUNTER_COLUMNS))})"
+    cursor.execute(f'''
+        INSERT INTO user_retention_stats (user_id, {', '.join(_COUNTER_COLUMNS)})
+        VALUES {', '.join([row] * len(user_ids))} AS new
+        ON DUPLICATE KEY UPDATE
+            {', '.join(f'{column} = {column} + new.{column}' for column in _COUNTER_COLUMNS)}
+    ''', [
+        value
+        for user_id in user_ids
+        for value in (user_id, *(deltas[user_id].get(column, 0) for column in _COUNTER_COLUMNS))
+    ])
+    _apply_bucket_totals(cursor, user_ids, 1)
+
+def retract_users_retention(cursor: Any, user_ids: List[str]) -> None:
+    """Take several users out of the buckets ahead of a bulk change to their rows."""
+    _apply_bucket_totals(cursor, user_ids, -1)
+
+def restore_users_retention(cursor: Any, user_ids: List[str]) -> None:
+    """Recount several users from applications and feedback_forms and add them back to the buckets."""
+    _recount_users(cursor, user_ids)
+    _apply_bucket_totals(cursor, user_ids, 1)
+
+def rebuild_retention_stats(cursor: Any) -> None:
+    """Recompute both retention rollups from scratch."""
+    cursor.execute(f'''
+        UPDATE retention_stats
+        SET user_count = 0, feedback_count = 0, {', '.join(f'{column} = 0' for column in _SUM_COLUMNS)}
+    ''')
+    _recount_users(cursor, None)
+    _apply_bucket_totals(cursor, None, 1)
@@ -1,16 +1,27 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 from flask import jsonify
+from backend.applications.trends import retract_user_applications
 from backend.database import db
+from backend.database.writes import RowWriter
+from backend.feedbacks.stats import retract_user_feedback
+from backend.programs.search_index import program_index
+from backend.users.retention import rebuild_retention_stats, retract_user_retention
 from backend.utilities.errors import DatabaseError, NotFoundError
+from backend.utilities.pagination import Keyset, SortKey
 from mysql.connector import Error as MySQLError
 
+USERS = RowWriter('users', columns=('id', 'first_name', 'last_name', 'type', 'registered_at'), created={'registered_at': 0})
 
-def get_users(page: int, limit: int) -> List[Dict[str, Any]]:
+def get_users(page: int, limit: int, page_cursor: Optional[str] = None) -> List[Dict[str, Any]]:
     cursor = db.get_db().cursor()
     try:
-        cursor.execute('SELECT * FROM users LIMIT %s OFFSET %s', (limit, (page - 1) * limit))
-        return cursor.fetchall()
+        keyset = Keyset('users', [SortKey('id', 'id')], page_cursor)
+        where, params = keyset.where()
+        order_by, _ = keyset.order_by()
+        limit_clause, limit_params = keyset.limit(page, limit)
+        cursor.execute(f'SELECT * FROM users WHERE {where}{order_by}{limit_clause}', params + limit_params)
+        return keyset.page(cursor.fetchall(), limit)
     except MySQLError as e:
         raise DatabaseError(str(e))
 
@@ -82,27 +93,16 @@ def update_user(user_id: str, update_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     cursor = db.get_db().cursor()
     try:
-        update_fields = []
-        values = []
-        # Loop only over allowed keys:
-        for key in ['first_name', 'last_name', 'type']:
-            if key in update_data:
-                update_fields.append(f"{key} = %s")
-                values.append(update_data[key])
-        if not update_fields:
+        # Only the allowed keys are written
+        changes = {key: update_data[key] for key in ['first_name', 'last_name', 'type'] if key in update_data}
+        if not changes:
             raise DatabaseError("No valid fields to update")
-        # Append the user_id for the WHERE clause
-        values.append(user_id)
-        query = f"UPDATE users SET {', '.join(update_fields)} WHERE id = %s"
-        cursor.execute(query, values)
-        db.get_db().commit()
-        
-        # Fetch the updated user record
-        cursor.execute("SELECT * FROM users WHERE id = %s", (user_id,))
-        result = cursor.fetchone()
-        if not result:
+        update = USERS.update(cursor, user_id, changes)
+        if not update:
+            db.get_db().rollback()
             raise NotFoundError(f"User with id {user_id} does not exist")
-        return result
+        db.get_db().commit()
+        return update.row
     except MySQLError as e:
         raise DatabaseError(str(e))
     finally:
@@ -123,11 +123,31 @@ def delete_user(user_id: str) -> Dict[str, Any]:
     """
     cursor = db.get_db().cursor()
     try:
+        cursor.execute("START TRANSACTION")
+        # The user's feedback and applications are removed by cascade, so take them out of the rollups first
+        retract_user_feedback(cursor, user_id)
+        retract_user_applications(cursor, user_id)
+        retract_user_retention(cursor, user_id)
         cursor.execute('DELETE FROM users WHERE id = %s', (user_id,))
         db.get_db().commit()
+        program_index.refresh_applicant(user_id)
         # Return an empty dict to be consistent with a structure that could return additional details.
         return {}
     except MySQLError as e:
+        db.get_db().rollback()
         raise DatabaseError(str(e))
     finally:
-        cursor.close()
\ No newline at end of file
+        cursor.close()
+
+def rebuild_user_retention_stats() -> None:
+    """Recompute the user_retention_stats and retention_stats rollups in one transaction."""
+    cursor = db.get_db().cursor()
+    try:
+        cursor.execute("START TRANSACTION")
+        rebuild_retention_stats(cursor)
+        db.get_db().commit()
+    except MySQLError as e:
+        db.get_db().rollback()
+        raise DatabaseError(str(e))
+    finally:
+        cursor.close()
@@ -0,0 +1,137 @@
+#------------------------------------------------------------
+# ASGI front of the Flask app
+#
+# Endpoints with an async implementation (registered on an AsyncViews by
+# endpoint name, e.g. 'api_v1.programs.search') are served on the event
+# loop; every other request goes to the Flask app itself, run in a thread
+# pool. The URL rules stay Flask's: a request is matched against the app's
+# url_map, and an async view runs inside a Flask request context with the
+# app's before/after request hooks, so request.args, the validators,
+# jsonify and handle_error behave as in the sync controllers.
+#
+# Streamed lists (?stream=ndjson) always go to the Flask app, whose thread
+# sends them chunk by chunk as it reads the rows.
+#------------------------------------------------------------
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+from urllib.parse import parse_qs
+
+from flask import Flask, request
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import RequestRedirect
+from werkzeug.test import EnvironBuilder
+
+from backend.utilities.errors import handle_error
+from backend.utilities.streaming import STREAM_PARAM
+
+logger = logging.getLogger(__name__)
+
+AsyncView = Callable[..., Awaitable[Any]]
+Hook = Callable[[], Awaitable[None]]
+
+class AsyncViews:
+    """Async implementations of Flask endpoints, by endpoint name and method."""
+
+    def __init__(self):
+        self.views: Dict[Tuple[str, str], AsyncView] = {}
+
+    def route(self, endpoint: str, methods: Tuple[str, ...] = ('GET',)) -> Callable[[AsyncView], AsyncView]:
+        def register(view: AsyncView) -> AsyncView:
+            for method in methods:
+                self.views[(endpoint, method)] = view
+            return view
+        return register
+
+    def get(self, endpoint: str, method: str) -> Optional[AsyncView]:
+        return self.views.get((endpoint, method))
+
+def _environ(scope: Dict[str, Any]) -> Dict[str, Any]:
+    """A WSGI environ for a bodyless ASGI request."""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = EnvironBuilder(
+        path=scope.get('root_path', '') + scope['path'],
+        base_url=f"{scope.get('scheme', 'http')}://{server[0]}:{server[1]}{scope.get('root_path', '')}",
+        method=scope['method'],
+        query_string=scope.get('query_string', b'').decode('latin-1'),
+        headers=[(name.decode('latin-1'), value.decode('latin-1')) for name, value in scope.get('headers', [])]
+    ).get_environ()
+    environ['REMOTE_ADDR'] = client[0]
+    return environ
+
+class FlaskASGI:
+    """
+    ASGI application serving the async views on the event loop and everything else with `app`.
+
+    Args:
+        app: The Flask app (from create_app()).
+        views: The async endpoints, one AsyncViews per module.
+        startup / shutdown: Awaited on the ASGI lifespan events (open and
+            close the async pool), in the worker process.
+        threads: Threads running the Flask app for the other requests.
+    """
+
+    def __init__(self, app: Flask, views: Sequence[AsyncViews], startup: Hook, shutdown: Hook, threads: int = 10):
+        from uvicorn.middleware.wsgi import WSGIMiddleware  # the server of this entry point
+
+        self.app = app
+        self.views = views
+        self.startup = startup
+        self.shutdown = shutdown
+        self.wsgi = WSGIMiddleware(app, workers=threads)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] == 'http':
+            environ = _environ(scope)
+            view = self._match(environ)
+            if view is not None:
+                return await self._serve(view, environ, send)
+        return await self.wsgi(scope, receive, send)
+
+    def _match(self, environ: Dict[str, Any]) -> Optional[AsyncView]:
+        if STREAM_PARAM in parse_qs(environ.get('QUERY_STRING', ''), keep_blank_values=True):
+            return None
+        try:
+            endpoint, _ = self.app.url_map.bind_to_environ(environ).match()
+        except (HTTPException, RequestRedirect):
+            return None
+        for views in self.views:
+            view = views.get(endpoint, environ['REQUEST_METHOD'])
+            if view is not None:
+                return view
+        return None
+
+    async def _serve(self, view: AsyncView, environ: Dict[str, Any], send: Callable) -> None:
+        with self.app.request_context(environ):
+            try:
+                rv = self.app.preprocess_request()
+                if rv is None:
+                    rv = await view(**request.view_args)
+            except Exception as e:
+                rv = handle_error(e)
+            response = self.app.finalize_request(rv)
+
+            await send({
+                'type': 'http.response.start',
+                'status': response.status_code,
+                'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in response.headers.items()]
+            })
+            await send({'type': 'http.response.body', 'body': response.get_data()})
+
+    async def _lifespan(self, receive: Callable, send: Callable) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await self.startup()
+                except Exception as e:
+                    logger.exception("ASGI startup failed")
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
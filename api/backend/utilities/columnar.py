@@ -0,0 +1,112 @@
+#------------------------------------------------------------
+# Columnar export files (Arrow IPC stream, Parquet)
+#
+# The rows of an export come from an unbuffered cursor (db.stream) in
+# batches. Each batch becomes one Arrow record batch (one Parquet row group)
+# and is sent as soon as it is written, so the worker holds one batch
+# whatever the size of the export. The columns and their types are fixed
+# per export, so an empty export still carries its schema.
+#
+# Clients read the files straight into Arrow, e.g.
+#     pyarrow.ipc.open_stream(response.content).read_pandas()
+#     pandas.read_parquet(io.BytesIO(response.content))
+#
+# Needs the `pyarrow` package; without it the exports answer 501.
+#------------------------------------------------------------
+import io
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from backend.utilities.errors import FeatureUnavailableError, ValidationError
+from flask import Response, request, stream_with_context
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # optional dependency, see validate_export_format
+    pyarrow = None
+
+# (name, type) of a column; the types are 'string', 'int' and 'timestamp'
+Column = Tuple[str, str]
+
+# format -> (mimetype, file extension)
+EXPORT_FORMATS = {
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrow'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet')
+}
+
+def validate_export_format() -> str:
+    """
+    Return the `format` query parameter of an export request (`arrow` by default).
+
+    Raises:
+        ValidationError: If the format is not one of EXPORT_FORMATS.
+        FeatureUnavailableError: If pyarrow is not installed.
+    """
+    export_format = request.args.get('format', 'arrow')
+    if export_format not in EXPORT_FORMATS:
+        raise ValidationError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if pyarrow is None:
+        raise FeatureUnavailableError("Exports need the pyarrow package, which is not installed")
+    return export_format
+
+def export_schema(columns: Sequence[Column]) -> 'pyarrow.Schema':
+    # TIMESTAMP columns are rendered as GMT in the JSON responses too
+    types = {'string': pyarrow.string(), 'int': pyarrow.int32(), 'timestamp': pyarrow.timestamp('us', tz='UTC')}
+    return pyarrow.schema([(name, types[kind]) for name, kind in columns])
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file keeping what a writer wrote until it is drained."""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        chunk = bytes(data)
+        self.chunks.append(chunk)
+        self.position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def export_chunks(batches: Iterable[List[Dict[str, Any]]], columns: Sequence[Column], export_format: str) -> Iterator[bytes]:
+    """The bytes of the export file of `batches`, one chunk per batch."""
+    schema = export_schema(columns)
+    sink = _ChunkSink()
+    if export_format == 'parquet':
+        writer = pyarrow.parquet.ParquetWriter(sink, schema, compression='zstd')
+    else:
+        writer = pyarrow.ipc.new_stream(sink, schema)
+
+    for rows in batches:
+        writer.write_batch(pyarrow.RecordBatch.from_pylist(rows, schema=schema))
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    writer.close()
+    yield sink.drain()
+
+def export_response(batches: Iterable[List[Dict[str, Any]]], columns: Sequence[Column], export_format: str, filename: str) -> Response:
+    """
+    A download of `batches` as an `export_format` file, written as it is read.
+
+    The request context stays open until the last chunk is sent, so
+    `batches` may keep reading from the request's connection (db.stream).
+    """
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    return Response(
+        stream_with_context(export_chunks(batches, columns, export_format)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{extension}"'}
+    )
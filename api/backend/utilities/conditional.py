@@ -0,0 +1,106 @@
+#------------------------------------------------------------
+# Conditional GET: ETag / Last-Modified validators
+#
+# A GET handler reads a version probe first: one row of updated_at
+# timestamps (as UNIX_TIMESTAMP, so independent of the session time zone)
+# and row counts covering everything its payload is built from. When the
+# client's copy matches, the answer is a 304 and the payload is never built.
+#
+# The probe runs before the payload is built, so a write landing in between
+# can only pair a newer body with an older ETag, which the next request
+# revalidates; a 304 is never sent for a stale copy. A payload that is not
+# read after the probe (a cached document) must say which version it is:
+# its build returns (response, version) and the validators are that
+# version's, so an ETag is only ever sent with the body it stands for.
+#
+# Last-Modified (and If-Modified-Since) is only used for probes made of
+# timestamps alone. A list probe also holds row counts or table versions,
+# because deleting a row moves no timestamp; its lists are validated by
+# ETag only.
+#------------------------------------------------------------
+import hashlib
+from datetime import datetime, timezone
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple, Union
+
+from flask import Response, request
+
+class Version(NamedTuple):
+    """Validators of one representation: a strong ETag (unquoted) and its Last-Modified."""
+    etag: str
+    last_modified: Optional[datetime]
+
+def resource_version(probe: Optional[Dict[str, Any]]) -> Optional[Version]:
+    """
+    Turn a version probe row into the validators of the requested URL.
+
+    The URL (path and query string) is part of the ETag, so every page and
+    filter of a list has its own. Columns named `updated_at` or ending in
+    `_updated_at` hold UNIX timestamps; when the probe has no other columns,
+    the latest one is Last-Modified. A probe with other columns (counts,
+    table versions) changes on deletes that no timestamp records, so it
+    gets no Last-Modified.
+
+    Returns:
+        Optional[Version]: None when there is no probe row (e.g. the resource does not exist).
+    """
+    if probe is None:
+        return None
+    state = '|'.join(f'{key}={probe[key]}' for key in sorted(probe))
+    etag = hashlib.sha1(f'{request.full_path}|{state}'.encode()).hexdigest()
+
+    if not all(key == 'updated_at' or key.endswith('_updated_at') for key in probe):
+        return Version(etag, None)
+    timestamps = [value for value in probe.values() if value is not None]
+    last_modified = datetime.fromtimestamp(float(max(timestamps)), timezone.utc) if timestamps else None
+    return Version(etag, last_modified)
+
+def is_not_modified(version: Version) -> bool:
+    """Evaluate If-None-Match (which takes precedence) or If-Modified-Since against `version`."""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(version.etag)
+    if request.if_modified_since and version.last_modified:
+        # HTTP dates have whole seconds
+        return version.last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+def set_validators(response: Response, version: Version) -> Response:
+    response.set_etag(version.etag)
+    if version.last_modified:
+        response.last_modified = version.last_modified
+    # Caches may keep the response but must revalidate it on every use
+    response.cache_control.no_cache = True
+    return response
+
+# What a build returns: the response, or the response and the version its body was read at
+Built = Union[Response, Tuple[Response, Optional[Version]]]
+
+def _with_validators(built: Built, version: Optional[Version]) -> tuple[Response, int]:
+    if isinstance(built, tuple):
+        response, version = built
+    else:
+        response = built
+    if version is not None:
+        set_validators(response, version)
+    return response, HTTPStatus.OK
+
+def conditional_get(version: Optional[Version], build: Callable[[], Built]) -> tuple[Response, int]:
+    """
+    Answer a GET with 304 Not Modified when the client's copy is current, else with `build()`.
+
+    Args:
+        version: The validators from `resource_version`, or None to always build.
+        build: Builds the full response; only called when it is needed. When
+            its body may be older or newer than `version` (e.g. it comes from
+            a cache), it returns (response, version of the body) and the
+            response gets that version's validators (none for None).
+    """
+    if version is not None and is_not_modified(version):
+        return set_validators(Response(status=HTTPStatus.NOT_MODIFIED), version), HTTPStatus.NOT_MODIFIED
+    return _with_validators(build(), version)
+
+async def conditional_get_async(version: Optional[Version], build: Callable[[], Awaitable[Built]]) -> tuple[Response, int]:
+    """conditional_get for the async read path: `build()` is awaited."""
+    if version is not None and is_not_modified(version):
+        return set_validators(Response(status=HTTPStatus.NOT_MODIFIED), version), HTTPStatus.NOT_MODIFIED
+    return _with_validators(await build(), version)
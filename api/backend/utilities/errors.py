@@ -2,6 +2,7 @@ from typing import Dict, Any, Optional, Tuple
 from flask import jsonify, Response
 from http import HTTPStatus
 from marshmallow.exceptions import ValidationError as MarshmallowValidationError
+from backend.utilities.metrics import record_error
 
 class CustomAPIError(Exception):
     """Base class for custom API errors."""
@@ -28,6 +29,15 @@ class DatabaseError(CustomAPIError):
     status_code = HTTPStatus.INTERNAL_SERVER_ERROR
     message = "A database error occurred"
 
+class PoolTimeoutError(DatabaseError):
+    """Raised when no pooled database connection becomes available in time."""
+    status_code = HTTPStatus.SERVICE_UNAVAILABLE
+    message = "Database connection pool exhausted"
+
+class RepeatedQueryError(DatabaseError):
+    """Raised, when QUERY_REPEAT_STRICT is set, by a statement repeated too often within one request."""
+    message = "Statement repeated too often within one request"
+
 class ValidationError(CustomAPIError):
     """Raised when data validation fails."""
     status_code = HTTPStatus.BAD_REQUEST
@@ -48,12 +58,19 @@ class ForbiddenError(CustomAPIError):
     status_code = HTTPStatus.FORBIDDEN
     message = "Permission denied"
 
+class FeatureUnavailableError(CustomAPIError):
+    """Raised when a feature needs an optional package that is not installed."""
+    status_code = HTTPStatus.NOT_IMPLEMENTED
+    message = "This feature is not available on this server"
+
 def handle_error(error: Exception) -> Tuple[Response, int]:
     """Handle different types of errors and return appropriate responses."""
     if isinstance(error, CustomAPIError):
+        record_error(error.__class__.__name__)
         return jsonify(error.to_dict()), error.status_code
     
     if isinstance(error, MarshmallowValidationError):
+        record_error("ValidationError")
         return jsonify({
             "error": {
                 "message": error.messages,
@@ -62,6 +79,7 @@ def handle_error(error: Exception) -> Tuple[Response, int]:
         }), HTTPStatus.BAD_REQUEST
     
     # Handle unexpected errors
+    record_error("UnexpectedError")
     return jsonify({
         "error": {
             "message": str(error),
@@ -0,0 +1,94 @@
+#------------------------------------------------------------
+# JSON provider of the Flask app (jsonify, request.get_json)
+#
+# Providers (JSON_PROVIDER):
+#   orjson   encodes with orjson (needs the `orjson` package); Flask's
+#            default provider stands in when it is not installed
+#   default  Flask's DefaultJSONProvider (the stdlib json module)
+#
+# The orjson provider writes the same documents as the default one: keys
+# sorted, dates and datetimes as HTTP dates, Decimal and UUID as strings,
+# compact unless in debug mode, with a trailing newline. The one difference
+# is that non-ASCII text is written as UTF-8 instead of \u escapes.
+#------------------------------------------------------------
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any
+
+from flask import Flask, Response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency, see init_app
+    orjson = None
+
+JSON_PROVIDERS = ('orjson', 'default')
+
+_WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_MONTHS = ('', 'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+def _http_date(value: date) -> str:
+    """werkzeug's http_date (naive values are UTC) without its round trip through email.utils."""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        clock = f'{value.hour:02d}:{value.minute:02d}:{value.second:02d}'
+    else:
+        clock = '00:00:00'
+    return f'{_WEEKDAYS[value.weekday()]}, {value.day:02d} {_MONTHS[value.month]} {value.year:04d} {clock} GMT'
+
+class OrjsonProvider(DefaultJSONProvider):
+    """DefaultJSONProvider with the encoding and decoding done by orjson."""
+
+    @staticmethod
+    def default(o: Any) -> Any:
+        # The dates and Decimals of every row come through here, so they skip the generic hook
+        if isinstance(o, date):
+            return _http_date(o)
+        if isinstance(o, Decimal):
+            return str(o)
+        return DefaultJSONProvider.default(o)
+
+    def _options(self, pretty: bool) -> int:
+        # Dates go through self.default like in the default provider, which
+        # writes HTTP dates where orjson would write ISO 8601
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def encode(self, obj: Any, pretty: bool = False) -> bytes:
+        return orjson.dumps(obj, default=self.default, option=self._options(pretty))
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # Options orjson has no equivalent for (cls, separators, ...) keep the stdlib encoder
+        if set(kwargs) - {'indent'}:
+            return super().dumps(obj, **kwargs)
+        return self.encode(obj, pretty=bool(kwargs.get('indent'))).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.encode(obj, pretty) + b'\n', mimetype=self.mimetype)
+
+def init_app(app: Flask) -> None:
+    app.config.setdefault('JSON_PROVIDER', 'orjson')
+
+    name = app.config['JSON_PROVIDER']
+    if name not in JSON_PROVIDERS:
+        raise ValueError(f"JSON_PROVIDER must be one of: {', '.join(JSON_PROVIDERS)}")
+
+    if name == 'orjson' and orjson is None:
+        app.logger.warning("JSON provider: orjson is not installed, using Flask's default provider")
+        name = 'default'
+    if name == 'orjson':
+        app.json = OrjsonProvider(app)
+    app.extensions['json_provider'] = name
@@ -0,0 +1,170 @@
+#------------------------------------------------------------
+# Prometheus metrics
+#
+# Defined with prometheus_client and rendered by GET /metrics. Request
+# latency is recorded per blueprint and route by the hooks that init_app
+# registers; the pool, cache and index figures are read from their stats()
+# when /metrics is scraped.
+#
+# Values live in the worker process. With several worker processes, set
+# PROMETHEUS_MULTIPROC_DIR (an empty directory shared by the workers):
+# prometheus_client then keeps every value in per-process files, and
+# /metrics renders all the workers' values merged, whichever worker serves
+# the scrape. Gauges merge by their multiprocess_mode (e.g. livesum: summed
+# over the live workers).
+#------------------------------------------------------------
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from flask import Flask, Response, current_app, g, request
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, disable_created_metrics, generate_latest
+from prometheus_client.multiprocess import MultiProcessCollector
+
+# In multiprocess mode, how often each worker refreshes its pool/cache/index figures
+STATS_INTERVAL = 5.0
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PREFIX = 'uplift_'
+
+MULTIPROCESS = bool(os.getenv('PROMETHEUS_MULTIPROC_DIR'))
+
+# The metrics below register here; /metrics renders this registry, or the
+# merged files of every worker in multiprocess mode
+REGISTRY = CollectorRegistry()
+if MULTIPROCESS:
+    EXPOSED = CollectorRegistry()
+    MultiProcessCollector(EXPOSED)
+else:
+    EXPOSED = REGISTRY
+
+# Multiprocess output has no *_created samples; keep one process's output the same
+disable_created_metrics()
+
+#------------------------------------------------------------
+# API metrics
+REQUEST_LATENCY = Histogram(
+    PREFIX + 'http_request_duration_seconds', 'Time spent handling requests.', ('blueprint', 'route', 'method'),
+    buckets=DEFAULT_BUCKETS, registry=REGISTRY
+)
+REQUESTS = Counter(
+    PREFIX + 'http_requests_total', 'Requests handled, by response status.', ('blueprint', 'route', 'method', 'status'),
+    registry=REGISTRY
+)
+REQUESTS_IN_FLIGHT = Gauge(PREFIX + 'http_requests_in_flight', 'Requests being handled right now.', multiprocess_mode='livesum', registry=REGISTRY)
+REQUEST_DB_TIME = Histogram(
+    PREFIX + 'http_request_db_seconds', 'Time spent in SQL statements per request.', ('blueprint', 'route'),
+    buckets=DEFAULT_BUCKETS, registry=REGISTRY
+)
+REQUEST_QUERIES = Histogram(
+    PREFIX + 'http_request_queries', 'SQL statements issued per request.', ('blueprint', 'route'),
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100), registry=REGISTRY
+)
+API_ERRORS = Counter(PREFIX + 'api_errors_total', 'Error responses, by error type (CustomAPIError subclass).', ('type',), registry=REGISTRY)
+
+# Read from the stats() of the pool, the program cache and the search index on
+# each scrape. The *_total figures are counted by those objects, not here, so
+# they are mirrored as gauges (a prometheus_client counter can only be
+# incremented); they still only go up, except when a worker restarts.
+def _stats_gauge(name: str, documentation: str, labels: Sequence[str] = (), multiprocess_mode: str = 'livesum') -> Gauge:
+    return Gauge(PREFIX + name, documentation, labels, multiprocess_mode=multiprocess_mode, registry=REGISTRY)
+
+POOL_CONNECTIONS = _stats_gauge('db_pool_connections', 'Pooled database connections, by state.', ('state',))
+POOL_MAX_CONNECTIONS = _stats_gauge('db_pool_max_connections', 'Maximum size of the connection pool.')
+POOL_WAITING = _stats_gauge('db_pool_waiting', 'Requests waiting for a pooled connection.')
+POOL_CHECKOUTS = _stats_gauge('db_pool_checkouts_total', 'Connections checked out of the pool.')
+POOL_TIMEOUTS = _stats_gauge('db_pool_timeouts_total', 'Checkouts that timed out waiting for a connection.')
+POOL_AVG_WAIT = _stats_gauge('db_pool_avg_wait_seconds', 'Average wait for a pooled connection.', multiprocess_mode='livemax')
+CACHE_LOOKUPS = _stats_gauge('program_cache_lookups_total', 'Program cache lookups, by result.', ('result',))
+CACHE_HIT_RATIO = _stats_gauge('program_cache_hit_ratio', 'Share of program cache lookups that hit.', multiprocess_mode='liveall')
+# The shared (redis) cache reports no size; the in-process one, one per worker
+CACHE_ENTRIES = _stats_gauge('program_cache_entries', 'Program documents in the cache.', multiprocess_mode='livemax')
+CACHE_INVALIDATIONS = _stats_gauge('program_cache_invalidations_total', 'Program documents invalidated.')
+CACHE_ERRORS = _stats_gauge('program_cache_errors_total', 'Program cache backend errors.')
+# Every worker has its own index: ready when all of them are, the age of the oldest
+INDEX_READY = _stats_gauge('search_index_ready', 'Whether program searches are served by the in-process index.', multiprocess_mode='livemin')
+INDEX_PROGRAMS = _stats_gauge('search_index_programs', 'Programs in the search index.', multiprocess_mode='livemax')
+INDEX_AGE = _stats_gauge('search_index_age_seconds', 'Time since the search index was last rebuilt.', multiprocess_mode='livemax')
+
+def record_error(error_type: str) -> None:
+    API_ERRORS.labels(type=error_type).inc()
+
+def _route_labels() -> Dict[str, str]:
+    # The URL rule, not the path, so ids do not each get their own series
+    rule = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    return {'blueprint': request.blueprint or 'app', 'route': rule}
+
+def _start_request() -> None:
+    g.metrics_started = time.perf_counter()
+    REQUESTS_IN_FLIGHT.inc()
+
+def _finish_request(response: Response) -> Response:
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return response
+    REQUESTS_IN_FLIGHT.dec()
+    labels = _route_labels()
+    REQUEST_LATENCY.labels(method=request.method, **labels).observe(time.perf_counter() - started)
+    REQUESTS.labels(method=request.method, status=response.status_code, **labels).inc()
+    query_log = g.get('query_log')
+    if query_log is not None:
+        REQUEST_DB_TIME.labels(**labels).observe(query_log.seconds)
+        REQUEST_QUERIES.labels(**labels).observe(query_log.count)
+    if MULTIPROCESS:
+        _refresh_stats()
+    return response
+
+def _abandon_request(exception: Optional[BaseException]) -> None:
+    # The request failed before after_request ran
+    if g.pop('metrics_started', None) is not None:
+        REQUESTS_IN_FLIGHT.dec()
+
+def _collect_stats(sources: Dict[str, Callable[[], Dict[str, Any]]]) -> None:
+    pool = sources['pool']()
+    if pool:
+        POOL_CONNECTIONS.labels(state='idle').set(pool['idle'])
+        POOL_CONNECTIONS.labels(state='in_use').set(pool['in_use'])
+        POOL_MAX_CONNECTIONS.set(pool['max_size'])
+        POOL_WAITING.set(pool['waiting'])
+        POOL_CHECKOUTS.set(pool['checkouts'])
+        POOL_TIMEOUTS.set(pool['timeouts'])
+        POOL_AVG_WAIT.set(pool['avg_wait_ms'] / 1000)
+
+    cache = sources['cache']()
+    CACHE_LOOKUPS.labels(result='hit').set(cache['hits'])
+    CACHE_LOOKUPS.labels(result='miss').set(cache['misses'])
+    CACHE_HIT_RATIO.set(cache['hit_rate'] or 0)
+    if cache['size'] is not None:
+        CACHE_ENTRIES.set(cache['size'])
+    CACHE_INVALIDATIONS.set(cache['invalidations'])
+    CACHE_ERRORS.set(cache['errors'])
+
+    index = sources['index']()
+    INDEX_READY.set(1 if index['ready'] else 0)
+    INDEX_PROGRAMS.set(index['programs'])
+    if index['age_seconds'] is not None:
+        INDEX_AGE.set(index['age_seconds'])
+
+_stats_collected_at = 0.0
+
+def _refresh_stats() -> None:
+    # Only the worker serving the scrape runs render_metrics, so the others
+    # write their figures to the shared files as they serve requests
+    global _stats_collected_at
+    now = time.monotonic()
+    if now - _stats_collected_at >= STATS_INTERVAL:
+        _stats_collected_at = now
+        _collect_stats(current_app.extensions['metrics'])
+
+def render_metrics() -> Response:
+    """The /metrics response."""
+    _collect_stats(current_app.extensions['metrics'])
+    return Response(generate_latest(EXPOSED), content_type=CONTENT_TYPE_LATEST)
+
+def init_app(app: Flask, pool: Callable[[], Dict[str, Any]], cache: Callable[[], Dict[str, Any]], index: Callable[[], Dict[str, Any]]) -> None:
+    """Time every request and remember where the pool, cache and index stats come from."""
+    app.extensions['metrics'] = {'pool': pool, 'cache': cache, 'index': index}
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_abandon_request)
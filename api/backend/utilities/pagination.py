@@ -1,12 +1,19 @@
+import base64
+import binascii
+import json
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
 from backend.utilities.errors import ValidationError
-from flask import request
+from flask import Response, jsonify, request
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
 
 def validate_pagination() -> tuple[int, int]:
     """
     Validate pagination parameters in the query string of a GET request.
 
-    This function retrieves the `page` and `limit` query parameters, 
-    defaults them to `1` and `10` respectively if not provided, 
+    This function retrieves the `page` and `limit` query parameters,
+    defaults them to `1` and `10` respectively if not provided,
     and raises a `ValidationError` if either parameter is less than or equal to 0.
     """
     page = request.args.get('page', default=1, type=int)
@@ -14,5 +21,129 @@ def validate_pagination() -> tuple[int, int]:
 
     if page <= 0 or limit <= 0:
         raise ValidationError("Page and limit must be positive integers.")
-    
+
     return page, limit
+
+def validate_cursor() -> Optional[str]:
+    """
+    Return the opaque `cursor` query parameter of a GET request, if any.
+
+    When a cursor is given it takes precedence over `page`, and the list is
+    resumed right after the row the cursor was issued for.
+    """
+    cursor = request.args.get('cursor')
+    return cursor.strip() if cursor and cursor.strip() else None
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    payload = json.dumps({'s': sort, 'v': list(values)}, default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(token: str, sort: str, size: int) -> List[Any]:
+    """
+    Decode a cursor issued by `encode_cursor` for the given sort order.
+
+    Raises:
+        ValidationError: If the token is malformed or was issued for another sort order.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        sort_label, values = payload['s'], payload['v']
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise ValidationError("Invalid pagination cursor")
+
+    if sort_label != sort or not isinstance(values, list) or len(values) != size:
+        raise ValidationError("Pagination cursor does not match the requested sort order")
+    return values
+
+class SortKey(NamedTuple):
+    """One column of a keyset ORDER BY and the result field holding its value."""
+    expression: str
+    field: str
+    descending: bool = False
+    params: Sequence[Any] = ()
+    hidden: bool = False
+
+class CursorPage(list):
+    """A page of rows that remembers the cursor of the page that follows it."""
+    next_cursor: Optional[str] = None
+
+class Keyset:
+    """
+    Keyset (seek) pagination over an ordered list of sort keys.
+
+    The last key must be unique (normally the primary key) so every row has a
+    distinct position. With a cursor, `where()` selects the rows strictly after
+    that position, so page N costs the same index seek as page 1; without one
+    the query falls back to LIMIT/OFFSET for the requested page.
+    """
+
+    def __init__(self, sort: str, keys: Sequence[SortKey], token: Optional[str] = None):
+        self.sort = sort
+        self.keys = list(keys)
+        self.values = decode_cursor(token, sort, len(self.keys)) if token else None
+
+    def where(self) -> Tuple[str, List[Any]]:
+        """Return a predicate matching rows after the cursor (`1=1` without one)."""
+        if self.values is None:
+            return '1=1', []
+
+        # Lexicographic "greater than" over the keys. MySQL sorts NULLs first,
+        # so for DESC keys a NULL value sorts after every non-NULL value.
+        branches, params = [], []
+        for i, (key, value) in enumerate(zip(self.keys, self.values)):
+            terms, term_params = [], []
+            for prior, prior_value in zip(self.keys[:i], self.values[:i]):
+                terms.append(f'({prior.expression}) <=> %s')
+                term_params.extend([*prior.params, prior_value])
+
+            if value is None:
+                if key.descending:
+                    continue
+                terms.append(f'({key.expression}) IS NOT NULL')
+                term_params.extend(key.params)
+            elif key.descending:
+                terms.append(f'(({key.expression}) < %s OR ({key.expression}) IS NULL)')
+                term_params.extend([*key.params, value, *key.params])
+            else:
+                terms.append(f'({key.expression}) > %s')
+                term_params.extend([*key.params, value])
+
+            branches.append('(' + ' AND '.join(terms) + ')')
+            params.extend(term_params)
+
+        if not branches:
+            return '1=0', []
+        return '(' + ' OR '.join(branches) + ')', params
+
+    def order_by(self) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        for key in self.keys:
+            clauses.append(f"{key.expression} {'DESC' if key.descending else 'ASC'}")
+            params.extend(key.params)
+        return ' ORDER BY ' + ', '.join(clauses), params
+
+    def limit(self, page: int, limit: int) -> Tuple[str, List[Any]]:
+        if self.values is not None:
+            return ' LIMIT %s', [limit]
+        return ' LIMIT %s OFFSET %s', [limit, (page - 1) * limit]
+
+    def page(self, rows: Sequence[Dict[str, Any]], limit: int) -> CursorPage:
+        """Wrap fetched rows, issuing a next cursor when the page is full."""
+        result = CursorPage(rows)
+        if rows and len(rows) >= limit:
+            last = rows[-1]
+            result.next_cursor = encode_cursor(self.sort, [last[key.field] for key in self.keys])
+        for key in self.keys:
+            if key.hidden:
+                for row in result:
+                    row.pop(key.field, None)
+        return result
+
+def jsonify_page(rows: Sequence[Any], body: Any = None) -> Response:
+    """jsonify a list of rows (or a `body` enclosing them), exposing its next cursor (if any) as a header."""
+    response = jsonify(rows if body is None else body)
+    next_cursor = getattr(rows, 'next_cursor', None)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
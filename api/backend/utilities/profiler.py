@@ -0,0 +1,311 @@
+#------------------------------------------------------------
+# On-demand sampling profiler
+#
+# An admin starts a session (POST /api/v1/admin/profiler) on a running
+# worker. No restart is needed. While the session runs, a background thread
+# wakes every PROFILER_INTERVAL_MS. It reads the stack of every thread and
+# counts it under the route ("GET /api/v1/programs") of the profiled request
+# running on it. A request is recognised by the frame that ran its
+# before_request hooks, so the async views sharing the event loop thread are
+# told apart; an async request waiting on I/O is not on the stack and is not
+# sampled.
+#
+# A session ends after a number of seconds. It can instead end after a number
+# of requests per route; then each route is sampled for its first N requests.
+# The counts can be downloaded as collapsed stacks (the input format of
+# flamegraph.pl and speedscope) and as a per-function summary.
+#
+# The cost outside a session is one attribute check per request. During a
+# session, the sampler's cost is walking the sampled stacks every interval.
+# Sessions and their results belong to the worker process they were started
+# on, so profiling needs a server with a single worker: the gunicorn config
+# exports the worker count as SERVER_WORKERS, and no session starts when it
+# is above 1.
+#------------------------------------------------------------
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from types import FrameType
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from flask import Flask, current_app, request
+
+from backend.utilities.errors import ConflictError, NotFoundError
+
+Stack = Tuple[str, ...]
+
+# The frames below the view function are the server's and Flask's, the same for every request
+_DISPATCH_FRAME = 'dispatch_request'
+# Flask's method running the before_request hooks; its caller serves the request
+_PREPROCESS_FRAME = 'preprocess_request'
+
+class ActiveRequest(NamedTuple):
+    """A request being profiled, and the session it counts towards."""
+    session: 'ProfilerSession'
+    label: str
+    thread: int
+    # The frame serving the request (Flask's full_dispatch_request, or the ASGI front's _serve)
+    root: Optional[FrameType]
+
+# Set by the request hooks; a context variable so that concurrent async requests keep their own
+_active_request: ContextVar[Optional[ActiveRequest]] = ContextVar('profiled_request', default=None)
+
+def _request_root() -> Optional[FrameType]:
+    frame = sys._getframe()
+    while frame is not None and frame.f_code.co_name != _PREPROCESS_FRAME:
+        frame = frame.f_back
+    return frame.f_back if frame is not None else None
+
+def _on_stack(frame: Optional[FrameType], root: Optional[FrameType]) -> bool:
+    while frame is not None:
+        if frame is root:
+            return True
+        frame = frame.f_back
+    return False
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f'{getattr(code, "co_qualname", code.co_name)} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+def _stack(frame: Optional[FrameType], root: Optional[FrameType] = None) -> Stack:
+    """
+    The labels of `frame` and its callers, outermost first, starting at
+    Flask's dispatch_request (or at `root`, the request's root frame).
+    """
+    frames: List[FrameType] = []
+    while frame is not None:
+        frames.append(frame)
+        if frame is root or (frame.f_code.co_name == _DISPATCH_FRAME and 'flask' in frame.f_code.co_filename):
+            break
+        frame = frame.f_back
+    return tuple(_frame_label(frame) for frame in reversed(frames))
+
+def _route_label() -> str:
+    rule = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    return f'{request.method} {rule}'
+
+class ProfilerSession:
+    """
+    One profiling run.
+
+    Args:
+        interval: Seconds between samples.
+        seconds: How long to sample for. When `requests` is also given this
+            is only the upper bound.
+        requests: Sample the first N requests of each route, then stop
+            sampling that route.
+        routes: URL rules to profile (e.g. "/api/v1/programs"). None means
+            every route. When given together with `requests`, the session
+            ends once each of them has been sampled N times.
+    """
+
+    def __init__(self, interval: float, seconds: float, requests: Optional[int] = None, routes: Optional[Sequence[str]] = None):
+        self.interval = interval
+        self.seconds = seconds
+        self.requests = requests
+        self.routes = set(routes) if routes else None
+        self.started_at = time.time()
+        self.ended_at: Optional[float] = None
+        self.end_reason: Optional[str] = None
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self.route_requests: Counter = Counter()
+        self._active: List[ActiveRequest] = []
+        self._deadline = time.monotonic() + seconds
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiler-sampler', daemon=True)
+
+    @property
+    def running(self) -> bool:
+        return self.ended_at is None
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, reason: str) -> None:
+        with self._lock:
+            if self.ended_at is not None:
+                return
+            self.ended_at = time.time()
+            self.end_reason = reason
+            self._active.clear()
+        self._stop.set()
+
+    #------------------------------------------------------------
+    # Request hooks
+    def wants(self, rule: Optional[str], label: str) -> bool:
+        if not self.running:
+            return False
+        if self.routes is not None and rule not in self.routes:
+            return False
+        return self.requests is None or self.route_requests[label] < self.requests
+
+    def enter(self, label: str) -> Optional[ActiveRequest]:
+        active = ActiveRequest(self, label, threading.get_ident(), _request_root())
+        with self._lock:
+            if self.ended_at is not None:
+                return None
+            self._active.append(active)
+        return active
+
+    def leave(self, active: ActiveRequest) -> None:
+        with self._lock:
+            if active not in self._active:
+                return
+            self._active.remove(active)
+            self.route_requests[active.label] += 1
+            finished = self._sampled_every_route()
+        if finished:
+            self.stop('requests')
+
+    def _sampled_every_route(self) -> bool:
+        if self.requests is None or self.routes is None:
+            return False
+        done = {label.split(' ', 1)[1] for label, count in self.route_requests.items() if count >= self.requests}
+        return self.routes <= done
+
+    #------------------------------------------------------------
+    # Sampling
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            if time.monotonic() >= self._deadline:
+                self.stop('seconds')
+                break
+            self.sample()
+
+    def sample(self) -> None:
+        with self._lock:
+            active = list(self._active)
+        if not active:
+            return
+        frames = sys._current_frames()
+        # One stack per thread, counted for the request whose root frame it runs in
+        stacks = {}
+        for profiled in active:
+            frame = frames.get(profiled.thread)
+            if profiled.thread not in stacks and _on_stack(frame, profiled.root):
+                stacks[profiled.thread] = (profiled.label, _stack(frame, profiled.root))
+        stacks = list(stacks.values())
+        with self._lock:
+            self.samples += 1
+            for label, stack in stacks:
+                self.stacks[(label, *stack)] += 1
+
+    #------------------------------------------------------------
+    # Results
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'running': self.running,
+                'started_at': self.started_at,
+                'ended_at': self.ended_at,
+                'end_reason': self.end_reason,
+                'interval_ms': self.interval * 1000,
+                'seconds': self.seconds,
+                'requests': self.requests,
+                'routes': sorted(self.routes) if self.routes else None,
+                'samples': self.samples,
+                'stacks': sum(self.stacks.values()),
+                'route_requests': dict(self.route_requests),
+                'pid': os.getpid()
+            }
+
+    def collapsed(self) -> str:
+        """One line per distinct stack: the route, then the frames outermost first, then its sample count."""
+        with self._lock:
+            stacks = sorted(self.stacks.items())
+        return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in stacks)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Per function: samples in the function itself (self) and samples with
+        the function anywhere on the stack (total), busiest first.
+        """
+        with self._lock:
+            stacks = list(self.stacks.items())
+        total = sum(count for _, count in stacks) or 1
+        own: Counter = Counter()
+        inclusive: Counter = Counter()
+        routes: Dict[str, set] = {}
+        for (route, *frames), count in stacks:
+            if not frames:
+                continue
+            own[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+                routes.setdefault(frame, set()).add(route)
+        return [
+            {
+                'function': frame,
+                'self_samples': own[frame],
+                'total_samples': count,
+                'self_percent': round(own[frame] * 100 / total, 2),
+                'total_percent': round(count * 100 / total, 2),
+                'routes': sorted(routes[frame])
+            }
+            for frame, count in sorted(inclusive.items(), key=lambda item: (-own[item[0]], -item[1], item[0]))
+        ]
+
+class Profiler:
+    """The profiling sessions of this process: at most one runs at a time; the last one's results are kept."""
+
+    def __init__(self):
+        self.session: Optional[ProfilerSession] = None
+        self._lock = threading.Lock()
+
+    def start(self, seconds: Optional[float] = None, requests: Optional[int] = None, routes: Optional[Sequence[str]] = None, interval_ms: Optional[float] = None) -> ProfilerSession:
+        workers = int(os.getenv('SERVER_WORKERS', 1))
+        if workers > 1:
+            raise ConflictError(
+                f"Profiling needs a single worker: a session only sees the worker it starts on, and this server runs {workers}"
+            )
+        config = current_app.config
+        max_seconds = config.get('PROFILER_MAX_SECONDS', 300)
+        interval = (interval_ms or config.get('PROFILER_INTERVAL_MS', 10)) / 1000
+        with self._lock:
+            if self.session is not None and self.session.running:
+                raise ConflictError("A profiling session is already running on this worker")
+            self.session = ProfilerSession(interval, min(seconds or max_seconds, max_seconds), requests, routes)
+            self.session.start()
+        return self.session
+
+    def stop(self) -> ProfilerSession:
+        session = self.last()
+        session.stop('stopped')
+        return session
+
+    def last(self) -> ProfilerSession:
+        if self.session is None:
+            raise NotFoundError("No profiling session has run on this worker")
+        return self.session
+
+    #------------------------------------------------------------
+    # Request hooks
+    def _enter_request(self) -> None:
+        session = self.session
+        # The profiler's own routes are left out of its results
+        if session is None or not session.running or request.blueprint == 'api_v1.admin':
+            return
+        label = _route_label()
+        rule = request.url_rule.rule if request.url_rule is not None else None
+        if session.wants(rule, label):
+            _active_request.set(session.enter(label))
+
+    def _leave_request(self, exception: Optional[BaseException]) -> None:
+        active = _active_request.get()
+        if active is not None:
+            _active_request.set(None)
+            active.session.leave(active)
+
+    def init_app(self, app: Flask) -> None:
+        app.config.setdefault('PROFILER_INTERVAL_MS', 10)
+        app.config.setdefault('PROFILER_MAX_SECONDS', 300)
+        app.before_request(self._enter_request)
+        app.teardown_request(self._leave_request)
+
+
+profiler = Profiler()
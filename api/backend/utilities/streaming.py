@@ -0,0 +1,49 @@
+#------------------------------------------------------------
+# Streamed list responses (?stream=ndjson)
+#
+# Instead of one JSON page, a list endpoint can send all of its rows as
+# newline-delimited JSON (one object per line). The rows come from an
+# unbuffered cursor (db.stream) and are written a batch at a time as they
+# arrive, so the worker's memory stays flat whatever the size of the list.
+#------------------------------------------------------------
+from typing import Any, Dict, Iterable, Iterator, List
+
+from backend.utilities.errors import ValidationError
+from flask import Response, current_app, request, stream_with_context
+
+STREAM_PARAM = 'stream'
+STREAM_FORMATS = ('ndjson',)
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+def validate_stream() -> bool:
+    """
+    Return whether a GET request asked for its rows as a stream (`?stream=ndjson`).
+
+    A streamed list holds every row after the optional `cursor`, in the
+    order of the pages; `page` and `limit` do not apply.
+
+    Raises:
+        ValidationError: If `stream` names an unsupported format.
+    """
+    stream = request.args.get(STREAM_PARAM)
+    if stream is None:
+        return False
+    if stream not in STREAM_FORMATS:
+        raise ValidationError(f"stream must be one of: {', '.join(STREAM_FORMATS)}")
+    return True
+
+def ndjson_response(batches: Iterable[List[Dict[str, Any]]]) -> Response:
+    """
+    A response writing the rows of `batches` as newline-delimited JSON, one
+    chunk per batch, as they are read.
+
+    The request context stays open until the last chunk is sent, so
+    `batches` may keep reading from the request's connection (db.stream).
+    """
+    dumps = current_app.json.dumps
+
+    def chunks() -> Iterator[str]:
+        for rows in batches:
+            yield ''.join(f'{dumps(row)}\n' for row in rows)
+
+    return Response(stream_with_context(chunks()), mimetype=NDJSON_MIMETYPE)
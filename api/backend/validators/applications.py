@@ -22,4 +22,22 @@ class ApplicationSchema(Schema):
         ])
     )
     decision_date = fields.DateTime(required=False)
-    decision_notes = fields.String(required=False)
\ No newline at end of file
+    decision_notes = fields.String(required=False)
+
+class ApplicationBatchItemSchema(ApplicationSchema):
+    """One application of a batch; it names its program since the URL does not."""
+    program_id = fields.String(
+        required=True,
+        validate=validate.Length(equal=36),
+        error_messages={"required": "program_id is required"}
+    )
+
+
+class ApplicationBatchSchema(Schema):
+    """Envelope of a batch; each item is validated on its own so it gets its own result."""
+    applications = fields.List(
+        fields.Dict(),
+        required=True,
+        validate=validate.Length(min=1),
+        error_messages={"required": "applications is required"}
+    )
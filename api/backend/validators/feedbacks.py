@@ -0,0 +1,26 @@
+from marshmallow import Schema, fields, validate
+
+RATING = validate.Range(min=0, max=5)
+
+class FeedbackSchema(Schema):
+    """Schema for validating feedback form payloads."""
+    user_id = fields.String(
+        required=True,
+        validate=validate.Length(equal=36),
+        error_messages={"required": "user_id is required"}
+    )
+    title = fields.String(required=True, validate=validate.Length(min=1, max=255))
+    effectiveness = fields.Integer(required=True, validate=RATING)
+    experience = fields.Integer(required=True, validate=RATING)
+    simplicity = fields.Integer(required=True, validate=RATING)
+    recommendation = fields.Integer(required=True, validate=RATING)
+    improvement = fields.String(required=True)
+
+
+class FeedbackBatchItemSchema(FeedbackSchema):
+    """One feedback form of a batch; it names its program since the URL does not."""
+    program_id = fields.String(
+        required=True,
+        validate=validate.Length(equal=36),
+        error_messages={"required": "program_id is required"}
+    )
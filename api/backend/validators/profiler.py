@@ -0,0 +1,13 @@
+from marshmallow import Schema, ValidationError, fields, validate, validates_schema
+
+class ProfilerSessionSchema(Schema):
+    """Schema for starting a profiling session: for a number of seconds or of requests per route."""
+    seconds = fields.Float(validate=validate.Range(min=0, min_inclusive=False))
+    requests = fields.Integer(validate=validate.Range(min=1))
+    routes = fields.List(fields.String(validate=validate.Length(min=1)), validate=validate.Length(min=1))
+    interval_ms = fields.Float(validate=validate.Range(min=1, max=1000))
+
+    @validates_schema
+    def validate_limit(self, data, **kwargs):
+        if data.get('seconds') is None and data.get('requests') is None:
+            raise ValidationError("Give seconds or requests")
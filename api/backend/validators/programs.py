@@ -102,7 +102,8 @@ class ProgramBaseSchema(Schema):
             raise ValidationError("deadline must be after start_date")
 
 class ProgramCreateSchema(ProgramBaseSchema):
-    pass
+    # Taken from the URL when the program is created under /organizations/<id>/programs
+    organization_id = fields.Str(validate=validate.Length(equal=36))
 
 class ProgramUpdateSchema(Schema):
     name = fields.Str(validate=validate.Length(min=1, max=100))
@@ -131,4 +132,34 @@ class ProgramQualificationSchema(Schema):
     qualifications = fields.List(fields.Nested(QualificationSchema), required=True, validate=validate.Length(min=1))
 
 class ProgramCategorySchema(Schema):
-    category_ids = fields.List(fields.Str(validate=validate.Length(equal=36)), required=True, validate=validate.Length(min=1))
\ No newline at end of file
+    category_ids = fields.List(fields.Str(validate=validate.Length(equal=36)), required=True, validate=validate.Length(min=1))
+
+# Nested sections a program document may carry, each replacing the whole list
+PROGRAM_SECTION_SCHEMAS = {
+    'locations': ProgramLocationSchema,
+    'qualifications': ProgramQualificationSchema,
+    'category_ids': ProgramCategorySchema
+}
+
+def load_program_document(payload, schema: Schema) -> dict:
+    """
+    Validate a program document: the program fields with `schema` and each
+    section present with its own schema, reporting the errors of every part at once.
+    """
+    if not isinstance(payload, dict):
+        raise ValidationError({"_schema": ["Invalid input type."]})
+
+    data, errors = {}, {}
+    try:
+        data.update(schema.load({key: value for key, value in payload.items() if key not in PROGRAM_SECTION_SCHEMAS}))
+    except ValidationError as err:
+        errors.update(err.messages)
+    for section, section_schema in PROGRAM_SECTION_SCHEMAS.items():
+        if section in payload:
+            try:
+                data.update(section_schema().load({section: payload[section]}))
+            except ValidationError as err:
+                errors.update(err.messages)
+    if errors:
+        raise ValidationError(errors)
+    return data
\ No newline at end of file
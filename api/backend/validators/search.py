@@ -1,14 +1,23 @@
 from backend.utilities.uuid import validate_uuid
 from flask import request
-from backend.utilities.pagination import validate_pagination
+from backend.utilities.pagination import validate_cursor, validate_pagination
 from marshmallow import Schema, fields, validates, ValidationError, validate
 
 class SearchQueryParamSchema(Schema):
     search_query = fields.Str(allow_none=True)
+    search_mode = fields.Str(
+        validate=validate.Regexp("^(contains|fulltext|index)$"),
+        allow_none=True
+    )
     page = fields.Int(allow_none=True)
     limit = fields.Int(allow_none=True)
+    cursor = fields.Str(allow_none=True)
     user_id = fields.Str(allow_none=True)
     categories = fields.List(fields.Str(), allow_none=True)
+    facets = fields.List(
+        fields.Str(validate=validate.Regexp("^(category|state|status)$")),
+        allow_none=True
+    )
     location = fields.Dict(keys=fields.Str(), values=fields.Str(), allow_none=True)
     sort_by = fields.Str(
         validate=validate.Regexp("^(name|start_date|deadline)$"),
@@ -59,12 +68,16 @@ def validate_search_params():
 
     query_params = {
         'search_query': request.args.get('search_query'),
+        'search_mode': request.args.get('search_mode', 'contains'),
         'categories': request.args.getlist('categories') or [],
+        # Accepted repeated (?facets=state&facets=status) or comma-separated
+        'facets': [facet.strip() for value in request.args.getlist('facets') for facet in value.split(',') if facet.strip()],
         'user_id': user_id or None,
         'sort_by': request.args.get('sort_by', 'name'),
         'sort_order': request.args.get('sort_order', 'asc'),
         'page': page,
         'limit': limit,
+        'cursor': validate_cursor(),
         'location': location
     }
 
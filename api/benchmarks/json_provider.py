@@ -0,0 +1,149 @@
+###
+# Benchmark: Flask's default JSON provider vs the orjson provider
+#
+# Serializes synthetic /programs pages of 1000 programs, shaped like the
+# rows search_program returns (dates, TIMESTAMP datetimes, DECIMAL
+# qualification bounds, nested categories/locations/qualifications). Each
+# provider is timed twice: encoding the page on its own (app.json.response)
+# and serving GET /api/v1/programs?limit=1000 through the test client with
+# the database reads replaced by the synthetic page. No MySQL is needed.
+# The two providers' bodies are checked to be identical.
+#
+# Usage (from the api/ directory):
+#   python -m benchmarks.json_provider
+#   python -m benchmarks.json_provider --rows 5000 --repeat 50
+###
+import argparse
+import datetime
+import os
+import random
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, List
+
+from flask import Flask
+
+WORDS = (
+    'food', 'bank', 'housing', 'assistance', 'rental', 'energy', 'heating', 'youth', 'career',
+    'training', 'veteran', 'health', 'dental', 'vision', 'child', 'care', 'senior', 'meals',
+    'transport', 'legal', 'aid', 'tax', 'credit', 'education', 'scholarship', 'tutoring'
+)
+
+QUALIFICATION_TYPES = ('income', 'age', 'family_size', 'location', 'education', 'veteran_status')
+
+
+def phrase(rng: random.Random, size: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(size))
+
+
+def synthetic_page(rows: int, seed: int) -> List[Dict[str, Any]]:
+    """A page of programs in the shape of search_program's result."""
+    rng = random.Random(seed)
+    base = datetime.date(2024, 1, 1)
+    page = []
+    for i in range(rows):
+        start = base + datetime.timedelta(days=rng.randrange(365))
+        page.append({
+            'id': f'{i:08d}-0000-4000-8000-{rng.getrandbits(48):012x}',
+            'name': f'{phrase(rng, 3).title()} Program {i}',
+            'description': phrase(rng, 40),
+            'status': rng.choice(('open', 'close')),
+            'start_date': start,
+            'deadline': datetime.datetime.combine(start, datetime.time(23, 59, 59)) + datetime.timedelta(days=30),
+            'end_date': start + datetime.timedelta(days=rng.randrange(60, 400)),
+            'organization_name': f'{phrase(rng, 2).title()} Foundation',
+            'categories': [{'id': f'cat-{rng.randrange(40)}', 'name': phrase(rng, 1).title()} for _ in range(rng.randrange(1, 4))],
+            'locations': [
+                {
+                    'id': f'loc-{i}-{n}', 'location_type': 'program', 'type': 'physical',
+                    'address_line1': f'{rng.randrange(1, 999)} Main St', 'address_line2': None,
+                    'city': 'Boston', 'state': 'MA', 'zip_code': f'02{rng.randrange(100, 999)}',
+                    'country': 'United States', 'is_primary': n == 0
+                }
+                for n in range(rng.randrange(1, 3))
+            ],
+            'qualifications': [
+                {
+                    'name': phrase(rng, 2), 'description': phrase(rng, 8),
+                    'qualification_type': rng.choice(QUALIFICATION_TYPES),
+                    'min_value': Decimal(rng.randrange(0, 5000000)) / 100,
+                    'max_value': Decimal(rng.randrange(5000000, 10000000)) / 100,
+                    'text_value': None, 'boolean_value': None
+                }
+                for _ in range(rng.randrange(0, 4))
+            ]
+        })
+    return page
+
+
+def make_app(provider: str) -> Flask:
+    os.environ['JSON_PROVIDER'] = provider
+    os.environ.setdefault('SEARCH_INDEX_ENABLED', 'false')
+    os.environ.setdefault('PROGRAM_CACHE_BACKEND', 'none')
+    os.environ.setdefault('DB_PORT', '3306')
+    from backend.app import create_app
+    app = create_app()
+    app.config['QUERY_SERVER_TIMING'] = False
+    return app
+
+
+def timed(run: Callable[[], bytes], repeat: int) -> tuple[float, bytes]:
+    body = run()  # warm-up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return min(timings), body
+
+
+def bench(provider: str, page: List[Dict[str, Any]], rows: int, repeat: int) -> Dict[str, Any]:
+    import backend.programs.controllers as controllers
+
+    app = make_app(provider)
+    controllers.search_program = lambda params: page
+    controllers.get_programs_version = lambda params: None
+    client = app.test_client()
+
+    def encode() -> bytes:
+        with app.test_request_context():
+            return app.json.response(page).get_data()
+
+    def serve() -> bytes:
+        return client.get(f'/api/v1/programs?limit={rows}').get_data()
+
+    encode_time, body = timed(encode, repeat)
+    request_time, _ = timed(serve, repeat)
+    return {'provider': app.extensions['json_provider'], 'encode': encode_time, 'request': request_time, 'body': body}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000, help="programs per page")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    page = synthetic_page(args.rows, args.seed)
+    results = [bench(provider, page, args.rows, args.repeat) for provider in ('default', 'orjson')]
+
+    size = len(results[0]['body'])
+    print(f"{args.rows} programs per page, {size / 1024:.0f} KiB of JSON, best of {args.repeat}")
+    for result in results:
+        print(
+            f"{result['provider']:<8} encode {result['encode'] * 1000:>7.2f} ms   "
+            f"GET /api/v1/programs {result['request'] * 1000:>7.2f} ms   "
+            f"{size / result['encode'] / 2 ** 20:>7.1f} MiB/s"
+        )
+    default, fast = results
+    if fast['provider'] != 'orjson':
+        print("orjson is not installed (pip install -r requirements.txt); both runs used the default provider")
+        return
+    print(f"identical bodies: {default['body'] == fast['body']}")
+    print(
+        f"orjson: {default['encode'] / fast['encode']:.1f}x faster encoding, "
+        f"{default['request'] / fast['request']:.1f}x faster requests"
+    )
+
+if __name__ == '__main__':
+    main()
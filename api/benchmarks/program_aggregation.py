@@ -0,0 +1,240 @@
+###
+# Benchmark: GROUP_CONCAT string-packing vs JSON_ARRAYAGG child aggregation
+#
+# Usage (from the api/ directory):
+#   python -m benchmarks.program_aggregation              # decode-only, synthetic rows
+#   python -m benchmarks.program_aggregation --live       # also time both queries against the DB in .env
+###
+import argparse
+import json
+import random
+import time
+import uuid
+from decimal import Decimal
+from typing import Any, Callable, Dict, List
+
+from backend.programs.transactions import PROGRAM_CHILDREN_COLUMNS, parse_program_children
+
+LEGACY_CHILDREN_COLUMNS = """
+    GROUP_CONCAT(DISTINCT CONCAT(c.id, ':', c.name)) as categories,
+    GROUP_CONCAT(DISTINCT CONCAT(l.id, ':', l.location_type, ':', l.type, ':', l.address_line1, ':', l.address_line2, ':', l.city, ':', l.state, ':', l.zip_code, ':', l.country, ':', l.is_primary)) as locations,
+    GROUP_CONCAT(DISTINCT CONCAT(
+        COALESCE(q.name, ''), ':',
+        COALESCE(q.description, ''), ':',
+        COALESCE(q.qualification_type, ''), ':',
+        COALESCE(q.min_value, ''), ':',
+        COALESCE(q.max_value, ''), ':',
+        COALESCE(q.text_value, ''), ':',
+        COALESCE(q.boolean_value, '0')
+    )) as qualifications
+"""
+
+LEGACY_QUERY = f"""
+    SELECT p.id, p.name, o.name as organization_name, {LEGACY_CHILDREN_COLUMNS}
+    FROM programs p
+    INNER JOIN organizations o ON p.organization_id = o.id
+    LEFT JOIN program_categories pc ON p.id = pc.program_id
+    LEFT JOIN categories c ON pc.category_id = c.id
+    LEFT JOIN locations l ON p.id = l.entity_id AND l.location_type = 'program'
+    LEFT JOIN qualifications q ON p.id = q.program_id
+    GROUP BY p.id, p.name, o.name
+    ORDER BY p.name
+    LIMIT %s
+"""
+
+STRUCTURED_QUERY = f"""
+    SELECT p.id, p.name, o.name as organization_name, {PROGRAM_CHILDREN_COLUMNS}
+    FROM programs p
+    INNER JOIN organizations o ON p.organization_id = o.id
+    ORDER BY p.name
+    LIMIT %s
+"""
+
+
+def parse_legacy(program: Dict[str, Any]) -> Dict[str, Any]:
+    """The string-splitting parser search_program used before JSON aggregation."""
+    if program['categories']:
+        program['categories'] = [
+            {'id': cat.split(':')[0], 'name': cat.split(':')[1]}
+            for cat in program['categories'].split(',')
+        ]
+    else:
+        program['categories'] = []
+
+    if program['locations']:
+        program['locations'] = [
+            {
+                'id': loc.split(':')[0],
+                'location_type': loc.split(':')[1],
+                'type': loc.split(':')[2],
+                'address_line1': loc.split(':')[3],
+                'address_line2': loc.split(':')[4],
+                'city': loc.split(':')[5],
+                'state': loc.split(':')[6],
+                'zip_code': loc.split(':')[7],
+                'country': loc.split(':')[8],
+                'is_primary': loc.split(':')[9] == '1'
+            }
+            for loc in program['locations'].split(',')
+        ]
+    else:
+        program['locations'] = []
+
+    if program['qualifications']:
+        program['qualifications'] = [
+            {
+                'name': qual.split(':')[0] or None,
+                'description': qual.split(':')[1] or None,
+                'qualification_type': qual.split(':')[2] or None,
+                'min_value': qual.split(':')[3] or None,
+                'max_value': qual.split(':')[4] or None,
+                'text_value': qual.split(':')[5] or None,
+                'boolean_value': qual.split(':')[6] == '1' if qual.split(':')[6] else None
+            }
+            for qual in program['qualifications'].split(',')
+            if any(qual.split(':'))
+        ]
+    else:
+        program['qualifications'] = []
+
+    return program
+
+
+def synthetic_children(rng: random.Random) -> Dict[str, List[Dict[str, Any]]]:
+    categories = [{'id': str(uuid.UUID(int=rng.getrandbits(128))), 'name': f'Category {i}'} for i in range(3)]
+    locations = [
+        {
+            'id': str(uuid.UUID(int=rng.getrandbits(128))),
+            'location_type': 'program',
+            'type': 'physical',
+            'address_line1': f'{rng.randint(1, 9999)} Main Street',
+            'address_line2': f'Suite {rng.randint(1, 500)}',
+            'city': 'Chicago',
+            'state': 'Illinois',
+            'zip_code': '60601',
+            'country': 'United States',
+            'is_primary': 1
+        }
+        for _ in range(2)
+    ]
+    qualifications = [
+        {
+            'name': 'Income Limit',
+            'description': 'Maximum household income to qualify',
+            'qualification_type': 'income',
+            'min_value': Decimal('0.00'),
+            'max_value': Decimal(f'{rng.randint(20000, 90000)}.00'),
+            'text_value': None,
+            'boolean_value': None
+        },
+        {
+            'name': 'Veteran Status',
+            'description': 'Must be a veteran',
+            'qualification_type': 'veteran_status',
+            'min_value': None,
+            'max_value': None,
+            'text_value': None,
+            'boolean_value': 1
+        }
+    ]
+    return {'categories': categories, 'locations': locations, 'qualifications': qualifications}
+
+
+def legacy_row(children: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Render children the way GROUP_CONCAT(CONCAT(...)) returns them."""
+    def text(value: Any) -> str:
+        return '' if value is None else str(value)
+
+    return {
+        'categories': ','.join(f"{c['id']}:{c['name']}" for c in children['categories']),
+        'locations': ','.join(
+            ':'.join(text(l[k]) for k in (
+                'id', 'location_type', 'type', 'address_line1', 'address_line2',
+                'city', 'state', 'zip_code', 'country', 'is_primary'
+            ))
+            for l in children['locations']
+        ),
+        'qualifications': ','.join(
+            ':'.join(text(q[k]) if k != 'boolean_value' else text(q[k] if q[k] is not None else 0) for k in (
+                'name', 'description', 'qualification_type', 'min_value',
+                'max_value', 'text_value', 'boolean_value'
+            ))
+            for q in children['qualifications']
+        )
+    }
+
+
+def structured_row(children: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Render children the way JSON_ARRAYAGG(JSON_OBJECT(...)) returns them."""
+    return {key: json.dumps(value, default=float) for key, value in children.items()}
+
+
+def timed(label: str, rows: List[Dict[str, Any]], parse: Callable[[Dict[str, Any]], Dict[str, Any]], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        batch = [dict(row) for row in rows]
+        started = time.perf_counter()
+        for row in batch:
+            parse(row)
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<28} {best * 1000:9.1f} ms  ({len(rows) / best:,.0f} rows/s)")
+    return best
+
+
+def run_decode(programs: int, repeat: int) -> None:
+    rng = random.Random(42)
+    children = [synthetic_children(rng) for _ in range(programs)]
+    legacy = [legacy_row(c) for c in children]
+    structured = [structured_row(c) for c in children]
+
+    print(f"Decode {programs:,} programs (best of {repeat})")
+    old = timed("GROUP_CONCAT + split", legacy, parse_legacy, repeat)
+    new = timed("JSON_ARRAYAGG + json.loads", structured, parse_program_children, repeat)
+    print(f"speedup: {old / new:.2f}x")
+
+
+def run_live(programs: int, repeat: int) -> None:
+    import pymysql
+    from backend.config import load_config
+
+    config = load_config()
+    conn = pymysql.connect(
+        host=config['MYSQL_DATABASE_HOST'],
+        port=config['MYSQL_DATABASE_PORT'],
+        user=config['MYSQL_DATABASE_USER'],
+        password=config['MYSQL_DATABASE_PASSWORD'] or '',
+        database=config['MYSQL_DATABASE_DB'],
+        cursorclass=pymysql.cursors.DictCursor
+    )
+    try:
+        print(f"\nQuery + decode {programs:,} programs against {config['MYSQL_DATABASE_HOST']} (best of {repeat})")
+        results = {}
+        for label, query, parse in (
+            ("GROUP_CONCAT + split", LEGACY_QUERY, parse_legacy),
+            ("JSON_ARRAYAGG + json.loads", STRUCTURED_QUERY, parse_program_children),
+        ):
+            best = float('inf')
+            for _ in range(repeat):
+                with conn.cursor() as cursor:
+                    started = time.perf_counter()
+                    cursor.execute(query, (programs,))
+                    rows = [parse(dict(row)) for row in cursor.fetchall()]
+                    best = min(best, time.perf_counter() - started)
+            results[label] = best
+            print(f"{label:<28} {best * 1000:9.1f} ms  ({len(rows):,} rows)")
+        old, new = results.values()
+        print(f"speedup: {old / new:.2f}x")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--programs', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--live', action='store_true', help='also benchmark both queries against the configured database')
+    args = parser.parse_args()
+
+    run_decode(args.programs, args.repeat)
+    if args.live:
+        run_live(args.programs, args.repeat)
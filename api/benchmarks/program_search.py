@@ -0,0 +1,176 @@
+###
+# Benchmark: LIKE '%term%' vs FULLTEXT vs in-process index program search
+#
+# Times the ranked search of search_program over synthetic programs. The
+# index mode runs in memory; with --live a scratch schema is built next to the
+# configured database (same table definitions, so the same indexes) and the
+# two SQL modes are timed against it.
+#
+# Usage (from the api/ directory):
+#   python -m benchmarks.program_search                      # index only, 100k programs
+#   python -m benchmarks.program_search --live               # also LIKE vs FULLTEXT against the DB in .env
+#   python -m benchmarks.program_search --live --programs 20000 --keep
+###
+import argparse
+import random
+import time
+from typing import Any, Dict, List
+
+from backend.programs.search import search_relevance
+from backend.programs.search_index import IndexedProgram, IndexState, ProgramSearchIndex
+
+WORDS = (
+    'food', 'bank', 'housing', 'assistance', 'rental', 'energy', 'heating', 'youth', 'career',
+    'training', 'veteran', 'health', 'dental', 'vision', 'child', 'care', 'senior', 'meals',
+    'transport', 'legal', 'aid', 'tax', 'credit', 'education', 'scholarship', 'tutoring',
+    'mental', 'counseling', 'job', 'placement', 'disability', 'support', 'family', 'grant',
+    'emergency', 'shelter', 'utility', 'internet', 'literacy', 'nutrition', 'community',
+    'recovery', 'immigrant', 'refugee', 'language', 'clinic', 'insurance', 'benefits'
+)
+
+QUERIES = ('food bank', 'veteran', 'scholarship', 'mental health counseling', 'refugee clinic', 'ca')
+
+SEARCH_SQL = """
+    SELECT p.id, p.name, {rank} AS search_rank
+    FROM programs p
+    INNER JOIN organizations o ON p.organization_id = o.id
+    WHERE {match}
+    ORDER BY search_rank DESC, p.name ASC, p.id ASC
+    LIMIT 10
+"""
+
+COUNT_SQL = """
+    SELECT COUNT(*) AS matches
+    FROM programs p
+    INNER JOIN organizations o ON p.organization_id = o.id
+    WHERE {match}
+"""
+
+
+def phrase(rng: random.Random, size: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(size))
+
+
+def synthetic(programs: int, organizations: int, seed: int) -> tuple[List[tuple], List[tuple]]:
+    """Return (organization rows, program rows) as (id, name, description[, organization_id])."""
+    rng = random.Random(seed)
+    org_rows = [(f'org-{i:08d}', f'{phrase(rng, 2).title()} Foundation {i}', phrase(rng, 12)) for i in range(organizations)]
+    program_rows = [
+        (f'prg-{i:08d}', f'{phrase(rng, 3).title()} Program {i}', phrase(rng, 40), org_rows[rng.randrange(organizations)][0])
+        for i in range(programs)
+    ]
+    return org_rows, program_rows
+
+
+def populate(cursor: Any, org_rows: List[tuple], program_rows: List[tuple]) -> None:
+    cursor.executemany('INSERT INTO organizations (id, name, description) VALUES (%s, %s, %s)', org_rows)
+    for start in range(0, len(program_rows), 2000):
+        cursor.executemany(
+            'INSERT INTO programs (id, name, description, organization_id) VALUES (%s, %s, %s, %s)',
+            program_rows[start:start + 2000]
+        )
+    cursor.execute('ANALYZE TABLE programs, organizations')
+    cursor.fetchall()
+
+
+def run_index(org_rows: List[tuple], program_rows: List[tuple], repeat: int) -> None:
+    organization_names = {org_id: name for org_id, name, _ in org_rows}
+    started = time.perf_counter()
+    state = IndexState.load(
+        IndexedProgram(
+            id=program_id, name=name, description=description, status='open', start_date=None, deadline=None,
+            organization_id=organization_id, organization_name=organization_names[organization_id],
+            categories=(), locations=(), applicants=()
+        )
+        for program_id, name, description, organization_id in program_rows
+    )
+    index = ProgramSearchIndex()
+    index.enabled, index._state = True, state
+    print(f"Indexed {len(program_rows):,} programs in memory in {time.perf_counter() - started:.1f} s")
+    print(f"Ranked search, top 10 (best of {repeat})\n")
+    print(f"{'query':<28} {'index':>12} {'matches':>9}")
+
+    for search_query in QUERIES:
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            index.search({'search_query': search_query, 'page': 1, 'limit': 10})
+            best = min(best, time.perf_counter() - started)
+        matches = sum(tier.bit_count() for _, tier in state.rank(state.all, search_query))
+        print(f"{search_query:<28} {best * 1000:9.1f} ms {matches:>9,}")
+
+
+def time_query(cursor: Any, search_query: str, mode: str, repeat: int) -> Dict[str, Any]:
+    relevance = search_relevance(search_query, mode)
+    query = SEARCH_SQL.format(rank=relevance.rank, match=relevance.match)
+    params = relevance.rank_params + relevance.match_params
+
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cursor.execute(query, params)
+        top = cursor.fetchall()
+        best = min(best, time.perf_counter() - started)
+
+    cursor.execute(COUNT_SQL.format(match=relevance.match), relevance.match_params)
+    return {'mode': relevance.mode, 'seconds': best, 'matches': cursor.fetchone()['matches'], 'top': [row['id'] for row in top]}
+
+
+def run_live(org_rows: List[tuple], program_rows: List[tuple], repeat: int, database: str, keep: bool) -> None:
+    import pymysql
+    from backend.config import load_config
+
+    config = load_config()
+    conn = pymysql.connect(
+        host=config['MYSQL_DATABASE_HOST'],
+        port=config['MYSQL_DATABASE_PORT'],
+        user=config['MYSQL_DATABASE_USER'],
+        password=config['MYSQL_DATABASE_PASSWORD'] or '',
+        cursorclass=pymysql.cursors.DictCursor,
+        autocommit=True
+    )
+    source = config['MYSQL_DATABASE_DB']
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f'DROP DATABASE IF EXISTS `{database}`')
+            cursor.execute(f'CREATE DATABASE `{database}`')
+            for table in ('organizations', 'programs'):
+                cursor.execute(f'CREATE TABLE `{database}`.{table} LIKE `{source}`.{table}')
+            conn.select_db(database)
+
+            started = time.perf_counter()
+            populate(cursor, org_rows, program_rows)
+            print(f"\nLoaded {len(program_rows):,} programs / {len(org_rows):,} organizations in {time.perf_counter() - started:.1f} s")
+            print(f"Ranked search, top 10 (best of {repeat})\n")
+            print(f"{'query':<28} {'contains':>12} {'fulltext':>12} {'speedup':>8} {'matches':>17}")
+
+            for search_query in QUERIES:
+                contains = time_query(cursor, search_query, 'contains', repeat)
+                fulltext = time_query(cursor, search_query, 'fulltext', repeat)
+                note = '' if fulltext['mode'] == 'fulltext' else '  (too short, ran as contains)'
+                print(
+                    f"{search_query:<28} {contains['seconds'] * 1000:9.1f} ms {fulltext['seconds'] * 1000:9.1f} ms "
+                    f"{contains['seconds'] / fulltext['seconds']:7.1f}x "
+                    f"{contains['matches']:>8,}/{fulltext['matches']:<8,}{note}"
+                )
+    finally:
+        if not keep:
+            with conn.cursor() as cursor:
+                cursor.execute(f'DROP DATABASE IF EXISTS `{database}`')
+        conn.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--programs', type=int, default=100_000)
+    parser.add_argument('--organizations', type=int, default=2_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--live', action='store_true', help='also benchmark the SQL search modes against the configured database')
+    parser.add_argument('--database', default='uplift_search_bench', help='scratch schema to create (dropped afterwards)')
+    parser.add_argument('--keep', action='store_true', help='keep the scratch schema for manual EXPLAINs')
+    args = parser.parse_args()
+
+    org_rows, program_rows = synthetic(args.programs, args.organizations, seed=42)
+    run_index(org_rows, program_rows, args.repeat)
+    if args.live:
+        run_live(org_rows, program_rows, args.repeat, args.database, args.keep)
@@ -0,0 +1,152 @@
+###
+# Benchmark: development server vs gunicorn throughput
+#
+# Starts each server on a free port in a subprocess, loads one path with
+# concurrent keep-alive clients for a fixed time, and reports requests per
+# second and latency percentiles. The servers run the real create_app(); the
+# default path (/healthcheck) does not touch the database, so no MySQL is
+# needed. Point --path at e.g. /api/v1/programs to include it.
+#
+# gunicorn runs with the config's defaults, one worker with 8 threads. With
+# --workers above 1 it gets what gunicorn.conf.py requires of several workers:
+# a temporary PROMETHEUS_MULTIPROC_DIR, no search index and (unless
+# PROGRAM_CACHE_BACKEND is set) no program cache.
+#
+# Usage (from the api/ directory):
+#   python -m benchmarks.wsgi_throughput
+#   python -m benchmarks.wsgi_throughput --clients 32 --seconds 20 --workers 4 --threads 8
+#   python -m benchmarks.wsgi_throughput --path '/api/v1/programs?search_query=food'
+###
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+DEV_SERVER = (
+    "import sys; from server import app; "
+    "app.run(host='127.0.0.1', port=int(sys.argv[1]), debug=True, use_reloader=False)"
+)
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_until_up(port: int, path: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', path)
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not come up")
+
+def load(port: int, path: str, clients: int, seconds: float) -> Dict[str, float]:
+    latencies: List[List[float]] = [[] for _ in range(clients)]
+    errors = [0] * clients
+    deadline = time.monotonic() + seconds
+
+    def client(slot: int) -> None:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                conn.request('GET', path)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 500:
+                    errors[slot] += 1
+                if response.getheader('Connection', '').lower() == 'close':
+                    conn.close()
+                    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            except (OSError, http.client.HTTPException):
+                errors[slot] += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                continue
+            latencies[slot].append(time.perf_counter() - started)
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(slot,)) for slot in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    timings = sorted(latency for slot in latencies for latency in slot)
+    quantiles = statistics.quantiles(timings, n=100) if len(timings) > 1 else [0.0] * 99
+    return {
+        'requests': len(timings),
+        'errors': sum(errors),
+        'rps': len(timings) / elapsed,
+        'p50_ms': quantiles[49] * 1000,
+        'p99_ms': quantiles[98] * 1000
+    }
+
+def run_server(name: str, command: List[str], port: int, args: argparse.Namespace, extra_env: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+    env = {**os.environ, 'SEARCH_INDEX_ENABLED': os.getenv('SEARCH_INDEX_ENABLED', 'false'), 'PYTHONPATH': '.', **(extra_env or {})}
+    env.setdefault('DB_PORT', '3306')
+    server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_up(port, args.path)
+        load(port, args.path, args.clients, 1.0)  # warm-up
+        result = load(port, args.path, args.clients, args.seconds)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    print(
+        f"{name:<32} {result['rps']:>9.0f} req/s   p50 {result['p50_ms']:>7.2f} ms   "
+        f"p99 {result['p99_ms']:>7.2f} ms   {result['requests']} requests, {result['errors']} errors"
+    )
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--path', default='/healthcheck')
+    parser.add_argument('--clients', type=int, default=16, help="concurrent clients")
+    parser.add_argument('--seconds', type=float, default=10.0, help="measured seconds per server")
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"GET {args.path}, {args.clients} clients, {args.seconds:.0f}s per server")
+    port = free_port()
+    dev = run_server('python server.py (debug)', [sys.executable, '-c', DEV_SERVER, str(port)], port, args)
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        print("gunicorn is not installed (pip install -r requirements.txt); skipping it")
+        return
+    port = free_port()
+    label = f'gunicorn {args.workers}w x {args.threads}t'
+    with tempfile.TemporaryDirectory(prefix='uplift-metrics-') as metrics_dir:
+        extra_env = {}
+        if args.workers > 1:
+            extra_env = {
+                'PROMETHEUS_MULTIPROC_DIR': metrics_dir,
+                'SEARCH_INDEX_ENABLED': 'false',
+                'PROGRAM_CACHE_BACKEND': os.getenv('PROGRAM_CACHE_BACKEND', 'none')
+            }
+        gunicorn = run_server(label, [
+            sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', 'server:app',
+            '--bind', f'127.0.0.1:{port}', '--workers', str(args.workers), '--threads', str(args.threads),
+            '--access-logfile', '/dev/null'
+        ], port, args, extra_env)
+    print(f"gunicorn / dev server: {gunicorn['rps'] / dev['rps']:.1f}x the throughput")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+###
+# Production server configuration
+#
+#   gunicorn --config gunicorn.conf.py server:app
+#
+# A master process pre-forks GUNICORN_WORKERS worker processes. Each worker
+# serves GUNICORN_THREADS requests at a time (gthread worker) and owns its
+# database pool, program cache and search index. Keep DB_POOL_MAX_SIZE at
+# least GUNICORN_THREADS, and workers * DB_POOL_MAX_SIZE under MySQL's
+# max_connections.
+#
+# The default is one worker with more threads. More than one worker needs
+# the state the workers would otherwise keep apart moved out of process:
+# PROGRAM_CACHE_BACKEND=redis, PROMETHEUS_MULTIPROC_DIR for /metrics
+# (emptied at startup) and SEARCH_INDEX_ENABLED=false (a write refreshes only
+# its own worker's index, so the others would serve stale pages under fresh
+# ETags; searches go to MySQL instead), or the server refuses to start (and
+# TTIN refuses to add a worker).
+#
+# Signals to the master (docker kill --signal HUP web-api):
+#   HUP   graceful reload: new workers start with the re-read config (and
+#         code, unless GUNICORN_PRELOAD is set); old ones finish their
+#         requests (up to GUNICORN_GRACEFUL_TIMEOUT) and exit
+#   TERM  graceful shutdown
+#   TTIN / TTOU  one worker more / less
+#
+# `python server.py` still runs the reloading development server.
+###
+import glob
+import os
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Imported here rather than in child_exit: that hook runs in the SIGCHLD
+# handler, and an import it interrupts would be re-entered half done.
+# After load_dotenv, since prometheus_client reads PROMETHEUS_MULTIPROC_DIR
+# when imported and the workers inherit the module.
+from prometheus_client import multiprocess
+
+def _flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ('1', 'true', 'yes')
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:4000')
+workers = int(os.getenv('GUNICORN_WORKERS', 1))
+# uvicorn.workers.UvicornWorker serves asgi:app (the async read path) instead
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+
+# A worker that has not answered the master for `timeout` seconds (a request
+# stuck that long) is killed and replaced
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers now and then, staggered so they do not all restart at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 5000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 500))
+
+# Load the app once in the master and fork it (faster start, the search index
+# pages are shared until written); workers then rebuild their pools in post_fork
+preload_app = _flag('GUNICORN_PRELOAD', 'false')
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+def post_fork(server, worker):
+    # Without preload_app the app is created after this, in the worker, and there is nothing to redo
+    from backend.app import after_fork
+
+    after_fork()
+
+def _multi_worker_error(count: int) -> Optional[str]:
+    """Why `count` workers cannot run with the current settings, if they cannot."""
+    if count > 1 and os.getenv('PROGRAM_CACHE_BACKEND', 'memory') == 'memory':
+        return f"{count} workers need PROGRAM_CACHE_BACKEND=redis; the memory cache is per process"
+    if count > 1 and not os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        return f"{count} workers need PROMETHEUS_MULTIPROC_DIR; metrics are per process without it"
+    if count > 1 and os.getenv('SEARCH_INDEX_ENABLED', 'true').lower() in ('1', 'true', 'yes'):
+        return f"{count} workers need SEARCH_INDEX_ENABLED=false; the search index is per process"
+    return None
+
+def on_starting(server):
+    error = _multi_worker_error(server.cfg.workers)
+    if error:
+        raise RuntimeError(error)
+    # Read by the workers, e.g. the profiler only runs with one of them
+    os.environ['SERVER_WORKERS'] = str(server.cfg.workers)
+    # The metric files of the previous run would be added to this one's
+    metrics_dir = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if metrics_dir:
+        for path in glob.glob(os.path.join(metrics_dir, '*.db')):
+            os.remove(path)
+
+def child_exit(server, worker):
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        # Drops the exited worker's live gauges (in flight, pool, ...)
+        multiprocess.mark_process_dead(worker.pid)
+
+def nworkers_changed(server, new_value, old_value):
+    # TTIN: keep the current count when the new one cannot run. The count
+    # set at startup (old_value None) is checked by on_starting.
+    error = _multi_worker_error(new_value)
+    if error and old_value is not None:
+        server.log.error(f"Not changing the number of workers: {error}")
+        server.num_workers = old_value
+        return
+    # Workers started from now on see the new count
+    os.environ['SERVER_WORKERS'] = str(new_value)
@@ -0,0 +1,55 @@
+#------------------------------------------------------------
+# Shared fixtures
+#
+# The app is created against no database: the tests that run statements
+# give it a connection whose cursor records them instead of sending them.
+#------------------------------------------------------------
+import os
+
+import pytest
+from pymysql import cursors
+
+os.environ.setdefault('DB_PORT', '3306')
+os.environ.setdefault('SEARCH_INDEX_ENABLED', 'false')
+os.environ.setdefault('PROGRAM_CACHE_BACKEND', 'none')
+
+from backend.app import create_app
+from backend.database import db, instrumentation
+
+
+class FakeConnection:
+    """A connection whose InstrumentedCursor records statements without running them."""
+
+    def __init__(self):
+        self.statements = []
+
+    def cursor(self):
+        return instrumentation.InstrumentedCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config.update(TESTING=True, QUERY_REPEAT_THRESHOLD=10, QUERY_REPEAT_STRICT=True)
+    return app
+
+
+@pytest.fixture
+def connection(monkeypatch):
+    connection = FakeConnection()
+
+    def execute(cursor, query, args=None):
+        connection.statements.append(query)
+        return 0
+
+    monkeypatch.setattr(cursors.Cursor, 'execute', execute)
+    monkeypatch.setattr(cursors.Cursor, 'fetchall', lambda cursor: [])
+    monkeypatch.setattr(cursors.Cursor, 'fetchone', lambda cursor: None)
+    monkeypatch.setattr(db, 'get_db', lambda: connection)
+    return connection
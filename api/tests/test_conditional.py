@@ -0,0 +1,21 @@
+from backend.utilities.conditional import is_not_modified, resource_version
+
+
+def test_timestamp_probe_has_last_modified(app):
+    with app.test_request_context('/api/v1/programs/1'):
+        version = resource_version({'updated_at': 1700000000, 'organization_updated_at': 1600000000})
+    assert version.last_modified.timestamp() == 1700000000
+
+
+def test_counting_probe_has_no_last_modified(app):
+    with app.test_request_context('/api/v1/programs'):
+        version = resource_version({'programs': 3, 'updated_at': 1700000000})
+    assert version.etag and version.last_modified is None
+
+
+def test_if_modified_since_is_ignored_for_lists(app):
+    headers = {'If-Modified-Since': 'Wed, 01 Jan 2031 00:00:00 GMT'}
+    with app.test_request_context('/api/v1/programs', headers=headers):
+        assert not is_not_modified(resource_version({'programs': 3, 'updated_at': 1700000000}))
+    with app.test_request_context('/api/v1/programs/1', headers=headers):
+        assert is_not_modified(resource_version({'updated_at': 1700000000}))
@@ -0,0 +1,75 @@
+import pytest
+
+from backend.database import db
+from backend.database.instrumentation import repeated_queries_allowed, statement_shape
+from backend.database.reads import Query
+from backend.utilities.errors import RepeatedQueryError
+
+
+@pytest.mark.parametrize('statement, shape', [
+    ("SELECT *\n    FROM programs\n    WHERE id = %s", 'SELECT * FROM programs WHERE id = %s'),
+    ("SELECT * FROM programs WHERE id = 'a1b2'", 'SELECT * FROM programs WHERE id = ?'),
+    ("SELECT * FROM programs WHERE name = 'it''s' OR name = 'a\\'b'", 'SELECT * FROM programs WHERE name = ? OR name = ?'),
+    ('SELECT * FROM programs WHERE name = "x"', 'SELECT * FROM programs WHERE name = ?'),
+    ('SELECT * FROM programs LIMIT 10 OFFSET 20', 'SELECT * FROM programs LIMIT ? OFFSET ?'),
+    ('SELECT min_value FROM qualifications WHERE min_value > -1.5', 'SELECT min_value FROM qualifications WHERE min_value > ?'),
+    ('SELECT * FROM programs WHERE id IN (%s, %s, %s)', 'SELECT * FROM programs WHERE id IN (?)'),
+    ('SELECT * FROM programs WHERE id IN (1, 2)', 'SELECT * FROM programs WHERE id IN (?)'),
+    ('INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s), (%s, %s)', 'INSERT INTO t (a, b) VALUES (?)'),
+    (b"SELECT * FROM programs WHERE id = 'x'", 'SELECT * FROM programs WHERE id = ?'),
+])
+def test_statement_shape(statement, shape):
+    assert statement_shape(statement) == shape
+
+
+def test_statement_shape_keeps_names_with_digits():
+    statement = 'SELECT t1.col2 FROM idx_3 t1'
+    assert statement_shape(statement) == statement
+
+
+def test_statements_differing_in_values_share_a_shape():
+    assert statement_shape("SELECT * FROM programs WHERE id = 'a' LIMIT 5") == \
+        statement_shape("SELECT * FROM programs WHERE id = 'b' LIMIT 50")
+
+
+def _looping_view(repeats, inline=False):
+    def view():
+        for number in range(repeats):
+            if inline:
+                db.read(_read(Query(f"SELECT * FROM programs WHERE id = '{number}'", one=True)))
+            else:
+                db.read(_read(Query('SELECT * FROM programs WHERE id = %s', (number,), one=True)))
+        return 'ok'
+    return view
+
+
+def _read(query):
+    return (yield query)
+
+
+@pytest.mark.parametrize('inline', [False, True])
+def test_strict_mode_raises_on_a_looped_query(app, connection, inline):
+    app.add_url_rule('/n1', 'n1', _looping_view(10, inline))
+    with pytest.raises(RepeatedQueryError):
+        app.test_client().get('/n1')
+    assert len(connection.statements) == 10
+
+
+def test_strict_mode_allows_repeats_below_the_threshold(app, connection):
+    app.add_url_rule('/n1', 'n1', _looping_view(9))
+    response = app.test_client().get('/n1')
+    assert response.status_code == 200
+    assert '9 queries' in response.headers['Server-Timing']
+
+
+def test_repeated_queries_allowed(app, connection):
+    view = _looping_view(25)
+
+    def allowed():
+        with repeated_queries_allowed():
+            return view()
+
+    app.add_url_rule('/batch', 'batch', allowed)
+    response = app.test_client().get('/batch')
+    assert response.status_code == 200
+    assert '25 queries' in response.headers['Server-Timing']
@@ -26,6 +26,7 @@ if 'all_programs' not in st.session_state:
     st.session_state.page = 1
     st.session_state.has_more = True
     st.session_state.last_search_query = ""
+    st.session_state.program_facets = {}
 
 # Search section
 search_query = st.text_input("Search programs by name")
@@ -36,6 +37,7 @@ if search_query != st.session_state.last_search_query:
     st.session_state.page = 1
     st.session_state.has_more = True
     st.session_state.last_search_query = search_query
+    st.session_state.program_facets = {}
 
 def load_more_programs():
     try:
@@ -47,6 +49,10 @@ def load_more_programs():
         # Only add search_query if it's not empty
         if search_query and search_query.strip():
             params['search_query'] = search_query.strip()
+
+        # Counts only change with the search, so fetch them with the first page
+        if st.session_state.page == 1:
+            params['facets'] = 'category,state,status'
             
         response = requests.get(
             "http://api:4000/api/v1/programs",
@@ -55,6 +61,9 @@ def load_more_programs():
         
         if response.status_code == 200:
             new_programs = response.json()
+            if isinstance(new_programs, dict) and 'facets' in new_programs:
+                st.session_state.program_facets = new_programs['facets']
+                new_programs = new_programs.get('programs')
             
             if isinstance(new_programs, list):
                 if new_programs:
@@ -74,6 +83,20 @@ def load_more_programs():
 if not st.session_state.all_programs and st.session_state.has_more:
     load_more_programs()
 
+# Matching programs by status, category and state
+facets = st.session_state.get('program_facets') or {}
+if any(facets.values()):
+    status_col, category_col, state_col = st.columns(3)
+    for col, title, key, label in (
+        (status_col, "Status", 'status', 'value'),
+        (category_col, "Categories", 'category', 'name'),
+        (state_col, "States", 'state', 'value')
+    ):
+        with col:
+            st.markdown(f"**{title}**")
+            for entry in facets.get(key, [])[:8]:
+                st.write(f"{entry[label]} ({entry['count']})")
+
 # Programs list
 st.markdown("## Programs")
 if st.session_state.all_programs:
@@ -20,6 +20,8 @@ if 'all_programs' not in st.session_state:
     st.session_state.all_programs = []
 if 'page' not in st.session_state:
     st.session_state.page = 1
+if 'programs_cursor' not in st.session_state:
+    st.session_state.programs_cursor = None
 if 'page_size' not in st.session_state:
     st.session_state.page_size = 200
 if 'filters' not in st.session_state:
@@ -47,24 +49,29 @@ if search_query and search_query.strip():
     st.session_state.filters['search_query'] = search_query.strip()
     st.session_state.all_programs = []  # Reset programs when search changes
     st.session_state.page = 1
+    st.session_state.programs_cursor = None
     st.session_state.has_more = True
 if sort_by:
     st.session_state.filters['sort_by'] = sort_by
     st.session_state.all_programs = []  # Reset programs when search changes
     st.session_state.page = 1
+    st.session_state.programs_cursor = None
     st.session_state.has_more = True
 if sort_order:
     st.session_state.filters['sort_order'] = sort_order
     st.session_state.all_programs = []  # Reset programs when search changes
     st.session_state.page = 1
+    st.session_state.programs_cursor = None
     st.session_state.has_more = True
 
 # Function to load more programs
 def load_more_programs():
     try:
+        # Follow the API's keyset cursor so deeper pages cost the same as the first
         params = {
             'page': st.session_state.page,
             'limit': st.session_state.page_size,
+            'cursor': st.session_state.programs_cursor,
             **st.session_state.filters
         }
         response = requests.get("http://api:4000/api/v1/programs", params=params)
@@ -74,7 +81,8 @@ def load_more_programs():
             if new_programs:
                 st.session_state.all_programs.extend(new_programs)
                 st.session_state.page += 1
-                st.session_state.has_more = len(new_programs) == st.session_state.page_size
+                st.session_state.programs_cursor = response.headers.get('X-Next-Cursor')
+                st.session_state.has_more = st.session_state.programs_cursor is not None
             else:
                 st.session_state.has_more = False
     except Exception as e:
@@ -160,18 +168,25 @@ if st.session_state.all_programs:
                     st.session_state.all_applications = []
                 if 'app_page' not in st.session_state:
                     st.session_state.app_page = 1
+                if 'app_cursor' not in st.session_state:
+                    st.session_state.app_cursor = None
                 
                 def load_more_applications():
                     try:
                         response = requests.get(
                             f"http://api:4000/api/v1/programs/{selected_program_id}/applications",
-                            params={'page': st.session_state.app_page, 'limit': st.session_state.page_size}
+                            params={
+                                'page': st.session_state.app_page,
+                                'limit': st.session_state.page_size,
+                                'cursor': st.session_state.app_cursor
+                            }
                         )
                         if response.status_code == 200:
                             new_applications = response.json()
                             if new_applications:
                                 st.session_state.all_applications.extend(new_applications)
                                 st.session_state.app_page += 1
+                                st.session_state.app_cursor = response.headers.get('X-Next-Cursor')
                     except Exception as e:
                         st.error(f"Error loading more applications: {str(e)}")
                 
@@ -194,6 +209,8 @@ if st.session_state.all_programs:
                     st.session_state.all_profiles = []
                 if 'profiles_page' not in st.session_state:
                     st.session_state.profiles_page = 1
+                if 'profiles_cursor' not in st.session_state:
+                    st.session_state.profiles_cursor = None
                 if 'has_more_profiles' not in st.session_state:
                     st.session_state.has_more_profiles = True
                 
@@ -201,14 +218,19 @@ if st.session_state.all_programs:
                     try:
                         response = requests.get(
                             f"http://api:4000/api/v1/programs/{selected_program_id}/profiles",
-                            params={'page': st.session_state.profiles_page, 'limit': st.session_state.page_size}
+                            params={
+                                'page': st.session_state.profiles_page,
+                                'limit': st.session_state.page_size,
+                                'cursor': st.session_state.profiles_cursor
+                            }
                         )
                         if response.status_code == 200:
                             new_profiles = response.json()
                             if new_profiles:
                                 st.session_state.all_profiles.extend(new_profiles)
                                 st.session_state.profiles_page += 1
-                                st.session_state.has_more_profiles = len(new_profiles) == st.session_state.page_size
+                                st.session_state.profiles_cursor = response.headers.get('X-Next-Cursor')
+                                st.session_state.has_more_profiles = st.session_state.profiles_cursor is not None
                             else:
                                 st.session_state.has_more_profiles = False
                     except Exception as e:
@@ -234,6 +256,8 @@ if st.session_state.all_programs:
                     st.session_state.all_feedbacks = []
                 if 'feedbacks_page' not in st.session_state:
                     st.session_state.feedbacks_page = 1
+                if 'feedbacks_cursor' not in st.session_state:
+                    st.session_state.feedbacks_cursor = None
                 if 'has_more_feedbacks' not in st.session_state:
                     st.session_state.has_more_feedbacks = True
                 
@@ -241,14 +265,19 @@ if st.session_state.all_programs:
                     try:
                         response = requests.get(
                             f"http://api:4000/api/v1/programs/{selected_program_id}/feedbacks",
-                            params={'page': st.session_state.feedbacks_page, 'limit': st.session_state.page_size}
+                            params={
+                                'page': st.session_state.feedbacks_page,
+                                'limit': st.session_state.page_size,
+                                'cursor': st.session_state.feedbacks_cursor
+                            }
                         )
                         if response.status_code == 200:
                             new_feedbacks = response.json()
                             if new_feedbacks:
                                 st.session_state.all_feedbacks.extend(new_feedbacks)
                                 st.session_state.feedbacks_page += 1
-                                st.session_state.has_more_feedbacks = len(new_feedbacks) == st.session_state.page_size
+                                st.session_state.feedbacks_cursor = response.headers.get('X-Next-Cursor')
+                                st.session_state.has_more_feedbacks = st.session_state.feedbacks_cursor is not None
                             else:
                                 st.session_state.has_more_feedbacks = False
                     except Exception as e:
@@ -24,6 +24,8 @@ if 'retention_page' not in st.session_state:
     st.session_state.retention_page = 1
 if 'trends_page' not in st.session_state:
     st.session_state.trends_page = 1
+if 'trends_cursor' not in st.session_state:
+    st.session_state.trends_cursor = None
 if 'page_size' not in st.session_state:
     st.session_state.page_size = 20  # Increased page size
 if 'has_more_retention' not in st.session_state:
@@ -116,7 +118,8 @@ with tab2:
                 "http://api:4000/api/v1/programs/trends",
                 params={
                     'page': st.session_state.trends_page,
-                    'limit': st.session_state.page_size
+                    'limit': st.session_state.page_size,
+                    'cursor': st.session_state.trends_cursor
                 }
             )
             
@@ -125,7 +128,8 @@ with tab2:
                 if new_data:
                     st.session_state.all_trends_data.extend(new_data)
                     st.session_state.trends_page += 1
-                    st.session_state.has_more_trends = len(new_data) == st.session_state.page_size
+                    st.session_state.trends_cursor = response.headers.get('X-Next-Cursor')
+                    st.session_state.has_more_trends = st.session_state.trends_cursor is not None
                 else:
                     st.session_state.has_more_trends = False
             else:
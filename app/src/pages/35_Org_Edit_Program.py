@@ -29,6 +29,17 @@ except Exception as e:
     st.error(f"Error loading program data: {str(e)}")
     st.stop()
 
+# Categories to choose from
+try:
+    categories_response = requests.get("http://api:4000/api/v1/categories", params={'page': 1, 'limit': 100})
+    all_categories = categories_response.json() if categories_response.status_code == 200 else []
+except Exception:
+    all_categories = []
+category_names = {category['id']: category['name'] for category in all_categories}
+
+current_category_ids = [category['id'] for category in program_data.get('categories') or [] if category['id'] in category_names]
+current_location = (program_data.get('locations') or [{}])[0]
+
 # Organization profile
 st.markdown("### Edit Program")
 with st.form("edit_program"):
@@ -64,6 +75,24 @@ with st.form("edit_program"):
         except ValueError as e:
             st.error(f"Error parsing dates: {str(e)}")
             st.stop()
+
+    category_ids = st.multiselect(
+        "Categories", options=list(category_names), default=current_category_ids, format_func=category_names.get
+    )
+
+    st.markdown("#### Location")
+    loc_col1, loc_col2, loc_col3, loc_col4 = st.columns(4)
+    with loc_col1:
+        location_type = st.selectbox(
+            "Type", options=['PHYSICAL', 'VIRTUAL'],
+            index=1 if current_location.get('type') == 'virtual' else 0
+        )
+    with loc_col2:
+        city = st.text_input("City", value=current_location.get('city') or "")
+    with loc_col3:
+        state = st.text_input("State", value=current_location.get('state') or "")
+    with loc_col4:
+        zip_code = st.text_input("Zip Code", value=current_location.get('zip_code') or "")
     
     # Add a centered submit button with proper styling
     st.markdown("---")
@@ -80,10 +109,30 @@ with st.form("edit_program"):
             "end_date": end_date.strftime('%Y-%m-%d'),
             "deadline": deadline.strftime('%Y-%m-%dT00:00:00')
         }
+        # One PATCH saves the fields, categories and location in a single transaction
+        if category_ids:
+            payload["category_ids"] = category_ids
+        if city and state and zip_code:
+            location = {
+                "type": location_type,
+                "address_line1": current_location.get('address_line1'),
+                "address_line2": current_location.get('address_line2'),
+                "city": city,
+                "state": state,
+                "zip_code": zip_code,
+                "country": current_location.get('country') or "United States",
+                "is_primary": True
+            }
+            # Other locations are kept as they are
+            payload["locations"] = [location] + [
+                {key: other[key] for key in ('address_line1', 'address_line2', 'city', 'state', 'zip_code', 'country', 'is_primary')}
+                | {"type": other['type'].upper()}
+                for other in (program_data.get('locations') or [])[1:]
+            ]
 
         try:
             program_url = f"http://api:4000/api/v1/programs/{st.session_state.edit_program_id}"
-            response = requests.put(program_url, json=payload)
+            response = requests.patch(program_url, json=payload)
             if response.status_code == 200:
                 st.success("Successfully saved changes!")
                 # Set flag to indicate we're returning from edit page
@@ -17,6 +17,14 @@ if 'selected_organization_id' not in st.session_state:
     st.error("No organization selected. Please select an organization from the role selection page.")
     st.stop()
 
+# Categories to choose from
+try:
+    categories_response = requests.get("http://api:4000/api/v1/categories", params={'page': 1, 'limit': 100})
+    all_categories = categories_response.json() if categories_response.status_code == 200 else []
+except Exception:
+    all_categories = []
+category_names = {category['id']: category['name'] for category in all_categories}
+
 # Organization profile
 st.markdown("### Create Program")
 with st.form("create_program"):
@@ -36,6 +44,19 @@ with st.form("create_program"):
         start_date = st.date_input("Start Date", value=today)
         end_date = st.date_input("End Date", value=today)
         deadline = st.date_input("Application Deadline", value=today)
+
+    category_ids = st.multiselect("Categories", options=list(category_names), format_func=category_names.get)
+
+    st.markdown("#### Location")
+    loc_col1, loc_col2, loc_col3, loc_col4 = st.columns(4)
+    with loc_col1:
+        location_type = st.selectbox("Type", options=['PHYSICAL', 'VIRTUAL'])
+    with loc_col2:
+        city = st.text_input("City")
+    with loc_col3:
+        state = st.text_input("State")
+    with loc_col4:
+        zip_code = st.text_input("Zip Code")
     
     # Add a centered submit button with proper styling
     st.markdown("---")
@@ -52,6 +73,11 @@ with st.form("create_program"):
             "end_date": end_date.strftime('%Y-%m-%d'),
             "deadline": deadline.strftime('%Y-%m-%dT00:00:00')
         }
+        # Categories and location are saved with the program in the same request
+        if category_ids:
+            payload["category_ids"] = category_ids
+        if city and state and zip_code:
+            payload["locations"] = [{"type": location_type, "city": city, "state": state, "zip_code": zip_code}]
 
         try:
             program_url = f"http://api:4000/api/v1/organizations/{st.session_state.selected_organization_id}/programs"
@@ -507,6 +507,66 @@ def insert_organization_locations(connection, organizations, locations):
     connection.commit()
     cursor.close()
 
+def rebuild_rollups(connection):
+    # Mock rows are inserted directly, bypassing the API's write-time rollup maintenance
+    cursor = connection.cursor()
+    cursor.execute("DELETE FROM program_feedback_stats")
+    cursor.execute("""
+    INSERT INTO program_feedback_stats
+    (program_id, total_feedback, sum_effectiveness, sum_experience, sum_simplicity, sum_recommendation)
+    SELECT program_id, COUNT(*), SUM(effectiveness), SUM(experience), SUM(simplicity), SUM(recommendation)
+    FROM feedback_forms
+    GROUP BY program_id
+    """)
+    cursor.execute("DELETE FROM program_application_trends")
+    cursor.execute("""
+    INSERT INTO program_application_trends
+    (program_id, category_id, application_month, application_count, approved_count, rejected_count)
+    SELECT a.program_id, pc.category_id, DATE_FORMAT(a.applied_at, '%Y-%m'), COUNT(*),
+           SUM(a.status = 'approved'), SUM(a.status = 'rejected')
+    FROM applications a
+    INNER JOIN program_categories pc ON a.program_id = pc.program_id
+    GROUP BY a.program_id, pc.category_id, DATE_FORMAT(a.applied_at, '%Y-%m')
+    """)
+    cursor.execute("DELETE FROM user_retention_stats")
+    cursor.execute("""
+    INSERT INTO user_retention_stats
+    (user_id, application_count, feedback_count, sum_effectiveness, sum_experience, sum_simplicity, sum_recommendation)
+    SELECT u.id, COALESCE(a.application_count, 0), COALESCE(f.feedback_count, 0),
+           COALESCE(f.sum_effectiveness, 0), COALESCE(f.sum_experience, 0),
+           COALESCE(f.sum_simplicity, 0), COALESCE(f.sum_recommendation, 0)
+    FROM users u
+    LEFT JOIN (SELECT user_id, COUNT(*) AS application_count FROM applications GROUP BY user_id) a ON a.user_id = u.id
+    LEFT JOIN (
+        SELECT user_id, COUNT(*) AS feedback_count, SUM(effectiveness) AS sum_effectiveness,
+               SUM(experience) AS sum_experience, SUM(simplicity) AS sum_simplicity, SUM(recommendation) AS sum_recommendation
+        FROM feedback_forms
+        GROUP BY user_id
+    ) f ON f.user_id = u.id
+    WHERE a.user_id IS NOT NULL OR f.user_id IS NOT NULL
+    """)
+    cursor.execute("""
+    UPDATE retention_stats
+    SET user_count = 0, feedback_count = 0, sum_effectiveness = 0, sum_experience = 0, sum_simplicity = 0, sum_recommendation = 0
+    """)
+    cursor.execute("""
+    UPDATE retention_stats b
+    INNER JOIN (
+        SELECT CASE WHEN application_count > 1 THEN 'Returned users' ELSE 'One-time users' END AS user_type,
+               COUNT(*) AS user_count, SUM(feedback_count) AS feedback_count,
+               SUM(sum_effectiveness) AS sum_effectiveness, SUM(sum_experience) AS sum_experience,
+               SUM(sum_simplicity) AS sum_simplicity, SUM(sum_recommendation) AS sum_recommendation
+        FROM user_retention_stats
+        WHERE application_count > 0 AND feedback_count > 0
+        GROUP BY user_type
+    ) u ON b.user_type = u.user_type
+    SET b.user_count = u.user_count, b.feedback_count = u.feedback_count,
+        b.sum_effectiveness = u.sum_effectiveness, b.sum_experience = u.sum_experience,
+        b.sum_simplicity = u.sum_simplicity, b.sum_recommendation = u.sum_recommendation
+    """)
+    connection.commit()
+    cursor.close()
+
 def main():
     try:        
         # Connect to database
@@ -556,6 +616,9 @@ def main():
         insert_organization_locations(connection, organizations, locations)
         print("Inserted organization locations")
         
+        rebuild_rollups(connection)
+        print("Rebuilt rollup tables")
+        
         print("All data has been successfully inserted!")
         
     except Error as e:
@@ -2,6 +2,10 @@ DROP DATABASE IF EXISTS uplift;
 CREATE DATABASE IF NOT EXISTS uplift;
 USE uplift;
 
+DROP TABLE IF EXISTS retention_stats;
+DROP TABLE IF EXISTS user_retention_stats;
+DROP TABLE IF EXISTS program_application_trends;
+DROP TABLE IF EXISTS program_feedback_stats;
 DROP TABLE IF EXISTS feedback_forms;
 DROP TABLE IF EXISTS organization_locations;
 DROP TABLE IF EXISTS program_categories;
@@ -43,6 +47,8 @@ CREATE TABLE user_profiles (
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
+-- updated_at columns that back ETags have microsecond precision, so two
+-- writes within the same second still produce different validators.
 CREATE TABLE organizations (
     id CHAR(36) PRIMARY KEY DEFAULT (UUID()) NOT NULL,
     name VARCHAR(100) NOT NULL,
@@ -51,8 +57,10 @@ CREATE TABLE organizations (
     is_verified BOOLEAN DEFAULT FALSE,
     verified_at TIMESTAMP,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-    INDEX idx_organization_verified (is_verified)
+    updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    INDEX idx_organization_verified (is_verified),
+    INDEX idx_organization_updated (updated_at),
+    FULLTEXT INDEX ft_organization_name (name)
 );
 
 CREATE TABLE categories (
@@ -71,13 +79,25 @@ CREATE TABLE programs (
     end_date DATE,
     organization_id CHAR(36) NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
     INDEX idx_program_status (status),
     INDEX idx_program_deadline (deadline),
     INDEX idx_program_organization (organization_id),
+    INDEX idx_program_name (name),
+    INDEX idx_program_updated (updated_at),
+    FULLTEXT INDEX ft_program_name (name),
+    FULLTEXT INDEX ft_program_description (description),
     FOREIGN KEY (organization_id) REFERENCES organizations(id) ON DELETE CASCADE
 );
 
+-- A counter per table, bumped in the transaction of every write that adds or
+-- removes rows, so list versions (ETags) see inserts and deletes without a
+-- COUNT(*); edits show in MAX(updated_at).
+CREATE TABLE table_versions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version BIGINT UNSIGNED NOT NULL DEFAULT 0
+);
+
 CREATE TABLE qualifications (
     program_id CHAR(36) NOT NULL,
     name VARCHAR(100) NOT NULL,
@@ -120,7 +140,7 @@ CREATE TABLE point_of_contacts (
     email VARCHAR(100) NOT NULL,
     phone_number VARCHAR(20),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
     INDEX idx_contact_type (contact_type),
     INDEX idx_contact_entity (entity_id)
 );
@@ -131,7 +151,7 @@ CREATE TABLE feedback_forms (
     user_id CHAR(36) NOT NULL,
     title VARCHAR(255) NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
     FOREIGN KEY (program_id) REFERENCES programs(id) ON DELETE CASCADE,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
     INDEX idx_feedback_program (program_id),
@@ -148,6 +168,19 @@ CREATE TABLE feedback_forms (
     UNIQUE KEY unq_user_feedback_program (user_id, program_id)
 );
 
+-- Per-program running sums of feedback ratings, maintained on every feedback
+-- write so the stats endpoint never aggregates feedback_forms.
+CREATE TABLE program_feedback_stats (
+    program_id CHAR(36) NOT NULL PRIMARY KEY,
+    total_feedback INT NOT NULL DEFAULT 0,
+    sum_effectiveness INT NOT NULL DEFAULT 0,
+    sum_experience INT NOT NULL DEFAULT 0,
+    sum_simplicity INT NOT NULL DEFAULT 0,
+    sum_recommendation INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (program_id) REFERENCES programs(id) ON DELETE CASCADE
+);
+
 CREATE TABLE locations (
     id CHAR(36) PRIMARY KEY DEFAULT (UUID()) NOT NULL,
     location_type ENUM('user', 'program', 'organization') NOT NULL,
@@ -161,7 +194,7 @@ CREATE TABLE locations (
     country VARCHAR(100) DEFAULT 'United States' NOT NULL,
     is_primary BOOLEAN DEFAULT TRUE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
     INDEX idx_location_entity (location_type, entity_id),
     INDEX idx_location_state (state),
     INDEX idx_location_city (city),
@@ -195,6 +228,48 @@ CREATE TABLE program_categories (
     INDEX idx_program_category (program_id, category_id)
 );
 
+-- (program, category, month) -> application counts by status, maintained on
+-- every application write so /programs/trends never groups applications.
+CREATE TABLE program_application_trends (
+    program_id CHAR(36) NOT NULL,
+    category_id CHAR(36) NOT NULL,
+    application_month CHAR(7) NOT NULL,
+    application_count INT NOT NULL DEFAULT 0,
+    approved_count INT NOT NULL DEFAULT 0,
+    rejected_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (program_id, category_id, application_month),
+    FOREIGN KEY (program_id) REFERENCES programs(id) ON DELETE CASCADE,
+    FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE CASCADE,
+    INDEX idx_trends_month (application_month)
+);
+
+-- Per-user application count and feedback rating sums, maintained on every
+-- application and feedback write; a user with at least one of each belongs
+-- to a retention bucket.
+CREATE TABLE user_retention_stats (
+    user_id CHAR(36) NOT NULL PRIMARY KEY,
+    application_count INT NOT NULL DEFAULT 0,
+    feedback_count INT NOT NULL DEFAULT 0,
+    sum_effectiveness INT NOT NULL DEFAULT 0,
+    sum_experience INT NOT NULL DEFAULT 0,
+    sum_simplicity INT NOT NULL DEFAULT 0,
+    sum_recommendation INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- Running totals per retention bucket ('One-time users' / 'Returned users'),
+-- so /programs/retention reads two rows instead of grouping applications.
+CREATE TABLE retention_stats (
+    user_type VARCHAR(20) NOT NULL PRIMARY KEY,
+    user_count INT NOT NULL DEFAULT 0,
+    feedback_count INT NOT NULL DEFAULT 0,
+    sum_effectiveness INT NOT NULL DEFAULT 0,
+    sum_experience INT NOT NULL DEFAULT 0,
+    sum_simplicity INT NOT NULL DEFAULT 0,
+    sum_recommendation INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
 CREATE TABLE organization_locations (
     organization_id CHAR(36) NOT NULL,
     location_id CHAR(36) NOT NULL,
@@ -270,6 +345,11 @@ INSERT INTO feedback_forms VALUES
 ('86582818-8886-8581-2814-51a6a3a4a9a8', 'd1a37b6d-4c3d-40a6-73d9-a6e0b8c9d4e3', 'cd28292a-eadd-42ee-8cef-3397a8bb353a', 'Feedback Form 3', '2017-03-17 04:02:52', '2025-12-12 12:57:11', 3, 3, 3, 3, 'Integer vulputate dui, placerat lacinia in. Nullam at mi in urna laoreetsed massa sed turpis gravida ullamcorper ac sit amet magna.'),
 ('75471707-7775-7470-1703-40a5a2a3a8a7', 'c0926a5c-3b2a-39a5-62c8-95d0a7b8c3d2', 'a0ec60c0-28ce-475e-be6a-ac4bbdb44ada', 'Feedback Form 4', '2019-11-01 05:53:22', '2020-05-07 09:21:44', 4, 4, 4, 4, 'Etiam ut posuere nisl, ac tristique nibh. In hac habitasse platea dictumst. Nulla a nunc eleifend, eleifend nunc sed, pellentesque ex.');
 
+INSERT INTO program_feedback_stats (program_id, total_feedback, sum_effectiveness, sum_experience, sum_simplicity, sum_recommendation)
+SELECT program_id, COUNT(*), SUM(effectiveness), SUM(experience), SUM(simplicity), SUM(recommendation)
+FROM feedback_forms
+GROUP BY program_id;
+
 INSERT INTO locations VALUES
 ('64360696-6664-6369-0692-39a4a1a2a7a6', 'organization', 'b2f4a96d-9618-4f5f-8687-0519b20fbb4c', 'physical', '123 Main Street', 'Suite 100', 'Chicago', 'Illinois', '60601', 'United States', TRUE, '2024-01-05 10:30:00', '2024-01-05 10:30:00'),
 ('53259585-5553-5258-9581-28a3a0a1a6a5', 'organization', '5c17cb90-6c3f-47f3-9893-8d00c75a8bb4', 'physical', '456 Oak Avenue', 'Building B', 'Atlanta', 'Georgia', '30301', 'United States', TRUE, '2024-01-06 11:30:00', '2024-01-06 11:30:00'),
@@ -300,3 +380,38 @@ INSERT INTO program_categories VALUES
 INSERT INTO organization_locations VALUES
 ('b2f4a96d-9618-4f5f-8687-0519b20fbb4c', '64360696-6664-6369-0692-39a4a1a2a7a6'),
 ('5c17cb90-6c3f-47f3-9893-8d00c75a8bb4', '53259585-5553-5258-9581-28a3a0a1a6a5');
+
+INSERT INTO program_application_trends (program_id, category_id, application_month, application_count, approved_count, rejected_count)
+SELECT a.program_id, pc.category_id, DATE_FORMAT(a.applied_at, '%Y-%m'), COUNT(*), SUM(a.status = 'approved'), SUM(a.status = 'rejected')
+FROM applications a
+INNER JOIN program_categories pc ON a.program_id = pc.program_id
+GROUP BY a.program_id, pc.category_id, DATE_FORMAT(a.applied_at, '%Y-%m');
+
+INSERT INTO user_retention_stats (user_id, application_count, feedback_count, sum_effectiveness, sum_experience, sum_simplicity, sum_recommendation)
+SELECT u.id, COALESCE(a.application_count, 0), COALESCE(f.feedback_count, 0),
+       COALESCE(f.sum_effectiveness, 0), COALESCE(f.sum_experience, 0), COALESCE(f.sum_simplicity, 0), COALESCE(f.sum_recommendation, 0)
+FROM users u
+LEFT JOIN (SELECT user_id, COUNT(*) AS application_count FROM applications GROUP BY user_id) a ON a.user_id = u.id
+LEFT JOIN (
+    SELECT user_id, COUNT(*) AS feedback_count, SUM(effectiveness) AS sum_effectiveness, SUM(experience) AS sum_experience,
+           SUM(simplicity) AS sum_simplicity, SUM(recommendation) AS sum_recommendation
+    FROM feedback_forms
+    GROUP BY user_id
+) f ON f.user_id = u.id
+WHERE a.user_id IS NOT NULL OR f.user_id IS NOT NULL;
+
+INSERT INTO retention_stats (user_type) VALUES ('One-time users'), ('Returned users');
+
+UPDATE retention_stats b
+INNER JOIN (
+    SELECT CASE WHEN application_count > 1 THEN 'Returned users' ELSE 'One-time users' END AS user_type,
+           COUNT(*) AS user_count, SUM(feedback_count) AS feedback_count,
+           SUM(sum_effectiveness) AS sum_effectiveness, SUM(sum_experience) AS sum_experience,
+           SUM(sum_simplicity) AS sum_simplicity, SUM(sum_recommendation) AS sum_recommendation
+    FROM user_retention_stats
+    WHERE application_count > 0 AND feedback_count > 0
+    GROUP BY user_type
+) u ON b.user_type = u.user_type
+SET b.user_count = u.user_count, b.feedback_count = u.feedback_count,
+    b.sum_effectiveness = u.sum_effectiveness, b.sum_experience = u.sum_experience,
+    b.sum_simplicity = u.sum_simplicity, b.sum_recommendation = u.sum_recommendation;